@@ -0,0 +1,168 @@
+"""
+Scenarios per second of the REST runner over the HTTP/1.1 and HTTP/2 transports,
+against local echo stub servers answering after a fixed latency.
+
+Requires the http2 extra: `pip install httpx[http2]`.
+
+    python benchmarks/http2_transport.py --scenarios 200 --turns 5 --workers 32
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import perf_counter, sleep
+
+from h2.config import H2Configuration
+from h2.connection import H2Connection
+from h2.events import DataReceived, RequestReceived, StreamEnded
+
+from rasa_integration_testing.common.configuration import (
+    Configuration,
+    DependencyInjector,
+)
+from rasa_integration_testing.interaction import Interaction, InteractionTurn
+from rasa_integration_testing.rest_runner import RestRunner
+from rasa_integration_testing.scenario import Scenario
+
+HOST = "127.0.0.1"
+CONFIG = """
+[runner]
+ignored_result_keys = sender
+
+[protocol]
+type = rest
+url = http://{host}:{port}/
+transport = {transport}
+"""
+TURN = '{"message": "hello"}'
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def http1_stub(latency: float) -> HTTPServer:
+    class EchoHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer((HOST, 0), EchoHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def http2_stub(latency: float) -> int:
+    """
+    Cleartext HTTP/2 echo server with prior knowledge, returns its port.
+    """
+    loop = asyncio.new_event_loop()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = H2Connection(H2Configuration(client_side=False))
+        connection.initiate_connection()
+        writer.write(connection.data_to_send())
+        bodies = {}
+
+        async def respond(stream_id: int, body: bytes) -> None:
+            await asyncio.sleep(latency)
+            connection.send_headers(
+                stream_id,
+                [
+                    (":status", "200"),
+                    ("content-type", "application/json"),
+                    ("content-length", str(len(body))),
+                ],
+            )
+            connection.send_data(stream_id, body, end_stream=True)
+            writer.write(connection.data_to_send())
+
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            for event in connection.receive_data(data):
+                if isinstance(event, RequestReceived):
+                    bodies[event.stream_id] = b""
+                elif isinstance(event, DataReceived):
+                    bodies[event.stream_id] += event.data
+                    connection.acknowledge_received_data(
+                        event.flow_controlled_length, event.stream_id
+                    )
+                elif isinstance(event, StreamEnded):
+                    loop.create_task(
+                        respond(event.stream_id, bodies.pop(event.stream_id))
+                    )
+            writer.write(connection.data_to_send())
+        writer.close()
+
+    server = loop.run_until_complete(asyncio.start_server(handle, HOST, 0))
+    Thread(target=loop.run_forever, daemon=True).start()
+    return server.sockets[0].getsockname()[1]
+
+
+def scenarios_per_second(
+    tests_path: Path, transport: str, port: int, args: argparse.Namespace
+) -> float:
+    tests_path.joinpath("config.ini").write_text(
+        CONFIG.format(host=HOST, port=port, transport=transport)
+    )
+    injector = DependencyInjector(
+        Configuration(tests_path / "config.ini"), {"tests_path": tests_path}
+    )
+    interaction = Interaction(InteractionTurn("hello"), InteractionTurn("hello"))
+    scenarios = [
+        Scenario(f"scenario_{index}", [interaction] * args.turns)
+        for index in range(args.scenarios)
+    ]
+
+    def run(scenario: Scenario) -> None:
+        if injector.autowire(RestRunner).run(scenario) is not None:
+            raise AssertionError(f"Scenario '{scenario.name}' failed")
+
+    with ThreadPoolExecutor(args.workers) as executor:
+        list(executor.map(run, scenarios[: args.workers]))  # Warm up connections.
+        start = perf_counter()
+        list(executor.map(run, scenarios))
+        return len(scenarios) / (perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenarios", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds.")
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as folder:
+        tests_path = Path(folder)
+        for actor in ("user", "bot"):
+            actor_path = tests_path / "interactions" / actor
+            actor_path.mkdir(parents=True)
+            actor_path.joinpath("hello.jinja").write_text(TURN)
+
+        http1_port = http1_stub(args.latency).server_port
+        http2_port = http2_stub(args.latency)
+        for transport, port in (("http1", http1_port), ("http2", http2_port)):
+            rate = scenarios_per_second(tests_path, transport, port, args)
+            print(f"{transport}: {rate:.1f} scenarios/s")
+
+
+if __name__ == "__main__":
+    main()
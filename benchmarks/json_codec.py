@@ -0,0 +1,89 @@
+"""
+Encoding and decoding time of the installed JSON codecs on bot payloads of
+increasing size, from a short text answer to a large custom payload.
+
+    python benchmarks/json_codec.py --repeat 5
+"""
+
+import argparse
+from timeit import repeat
+from typing import Callable, Dict, List
+
+from rasa_integration_testing.common.json_codec import available_codecs
+
+MICROSECONDS = 1_000_000
+
+
+def bot_turn(custom_items: int) -> List[Dict]:
+    return [
+        {
+            "recipient_id": "ITEST_host1234_1602000000.0_pay_bill/videotron",
+            "text": "Quel compte voulez-vous utiliser pour payer votre facture?",
+            "buttons": [
+                {"title": "Chèque", "payload": '/inform{"account": "checking"}'},
+                {"title": "Épargne", "payload": '/inform{"account": "savings"}'},
+            ],
+        },
+        {
+            "recipient_id": "ITEST_host1234_1602000000.0_pay_bill/videotron",
+            "custom": {
+                "speech": {"confidenceLevel": 0.6, "maxSpeechTimeout": 4000},
+                "noinputTimeout": 5000,
+                "accounts": [
+                    {
+                        "id": f"{index:08}",
+                        "type": "checking" if index % 2 else "savings",
+                        "balance": index * 12.34,
+                        "owner": {"name": "John Johnson", "language": "en-US"},
+                        "active": index % 7 != 0,
+                        "tags": ["primary", "online"] if index % 3 else [],
+                    }
+                    for index in range(custom_items)
+                ],
+            },
+        },
+    ]
+
+
+PAYLOADS = {
+    "short turn": bot_turn(0),
+    "custom payload": bot_turn(50),
+    "large custom payload": bot_turn(10_000),
+}
+
+
+def best_time(function: Callable[[], object], number: int, repeats: int) -> float:
+    return min(repeat(function, number=number, repeat=repeats)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    codecs = available_codecs()
+    for payload_name, payload in PAYLOADS.items():
+        encoded = codecs[-1].dumpb(payload)
+        number = max(1, 200_000 // len(encoded))
+        print(f"{payload_name} ({len(encoded):,} bytes):")
+        for codec in codecs:
+            timings = {
+                "loads": best_time(lambda: codec.loads(encoded), number, args.repeat),
+                "dumpb": best_time(lambda: codec.dumpb(payload), number, args.repeat),
+                "dumps sorted, indented": best_time(
+                    lambda: codec.dumps(payload, sort_keys=True, indent=True),
+                    number,
+                    args.repeat,
+                ),
+            }
+            print(
+                f"  {codec.name:>6}: "
+                + ", ".join(
+                    f"{operation} {timing * MICROSECONDS:,.1f} µs"
+                    for operation, timing in timings.items()
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
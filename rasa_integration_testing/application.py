@@ -1,28 +1,52 @@
 import logging
+import os
 import sys
+from concurrent.futures import Executor
 from concurrent.futures.thread import ThreadPoolExecutor
 from enum import Enum
+from functools import partial
+from importlib import import_module
 from pathlib import Path
 from queue import Queue
 from threading import Thread
-from typing import Callable, Dict, List, Optional
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
 
 import click
-import coloredlogs
 
+from .cassette import RECORD_MODE, REPLAY_MODE, Cassette
 from .common.configuration import Configuration, DependencyInjector, configure
-from .rest_runner import IvrRunner, RestRunner
-from .runner import FailedInteraction, ScenarioRunner
-from .scenario import Scenario, load_scenarios
-from .socketio_runner import SocketIORunner
+from .common.utils import bounded_map
+
+if TYPE_CHECKING:
+    from .deduplication import ConversationDeduplicator
+    from .history import TimingHistory
+    from .reporting import FailureRenderer
+    from .runner import FailedInteraction, ScenarioRunner
+    from .scenario import Scenario
+    from .sharding import Shard
+    from .watch import SuiteWatcher
 
-SCENARIOS_FOLDER = "scenarios"
-SCENARIOS_GLOB = "*.yml"
 DEFAULT_MAX_WORKERS = 8
+PENDING_SCENARIOS_PER_WORKER = 2
+WATCH_POLL_INTERVAL = 0.2
+DEFAULT_PROXY_PORT = 5006
+DEFAULT_IDLE_TIMEOUT = 300.0
+PROXY_HOST = "localhost"
+DEFAULT_COORDINATOR_PORT = 5007
+DEFAULT_LEASE_TIMEOUT = 300.0
+DEFAULT_DAEMON_PORT = 5008
+DEFAULT_HISTORY_LIMIT = 20
+DEFAULT_HISTORY_RUNS = 30
+DEFAULT_GROWTH_THRESHOLD = 20.0
+BUNDLE_FILENAME = "suite.bundle"
+MILLISECONDS = 1000
 
 RUNNER_CONFIG_SECTION = "runner"
 TEST_CONFIG_FILE = "config.ini"
 TESTS_PATH_ARGUMENT = "tests_path"
+RUN_COMMAND = "run"
+TARGETS_SEPARATOR = ","
 
 EXIT_SUCCESS = 0
 EXIT_FAILURE = 1
@@ -34,14 +58,39 @@ COLOR_WARNING = "yellow"
 MESSAGE_KEY = "message"
 FOREGROUND_COLOR_KEY = "fg"
 
-logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+RUNNERS_ENTRY_POINT_GROUP = "rasa_integration_testing.runners"
+
+ScenarioResult = Tuple["Scenario", Optional["FailedInteraction"]]
+
 logger = logging.getLogger(__name__)
-coloredlogs.install(level="INFO", logger=logger)
 
 output_queue: Queue = Queue()
 
 
-@click.command()
+class DefaultCommandGroup(click.Group):
+    """
+    Command group falling back to the run command when no known command is given.
+    """
+
+    def parse_args(self, context: click.Context, args: List[str]) -> List[str]:
+        if (
+            args
+            and args[0] not in self.commands
+            and args[0] not in context.help_option_names
+        ):
+            args.insert(0, RUN_COMMAND)
+        return super().parse_args(context, args)
+
+
+@click.group(cls=DefaultCommandGroup)
+def cli() -> None:
+    import coloredlogs
+
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    coloredlogs.install(level="INFO", logger=logger)
+
+
+@cli.command(name=RUN_COMMAND)
 @click.argument(TESTS_PATH_ARGUMENT, type=click.Path(exists=True))
 @click.option(
     "-k",
@@ -50,31 +99,802 @@ output_queue: Queue = Queue()
     default=DEFAULT_MAX_WORKERS,
     help="Amount of simultaenous workers.",
 )
-@click.argument("scenarios_glob", required=False, default=SCENARIOS_GLOB)
-def cli(tests_path: str, max_workers: int, scenarios_glob: str) -> None:
+@click.option(
+    "--bundle",
+    "bundle_path",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Run the scenarios of a bundle created with the compile command.",
+)
+@click.option(
+    "--deduplicate",
+    is_flag=True,
+    help="Run scenarios rendering to the same conversation only once.",
+)
+@click.option(
+    "--history",
+    "history_path",
+    type=click.Path(dir_okay=False),
+    help="SQLite file keeping the duration and outcome of past runs of scenarios.",
+)
+@click.option(
+    "--longest-first",
+    is_flag=True,
+    help="Start the scenarios which took the longest in past runs first.",
+)
+@click.option(
+    "--failed-first",
+    is_flag=True,
+    help="Start the scenarios which failed their last run first.",
+)
+@click.option(
+    "--rerun-failures",
+    type=click.IntRange(min=0),
+    default=0,
+    help="Rerun failed scenarios up to this many times, those passing are flaky.",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Keep running, rerun the scenarios affected by each change of TESTS_PATH.",
+)
+@click.option(
+    "--artifacts",
+    "artifacts_path",
+    type=click.Path(file_okay=False),
+    help="Folder to write the full failed interaction of each scenario to.",
+)
+@click.option(
+    "--max-output-length",
+    type=click.IntRange(min=1),
+    help="Maximum length of the payloads of failed interactions shown.",
+)
+@click.option(
+    "--shard",
+    callback=lambda context, parameter, value: _parse_shard(value),
+    help="Run only the i-th of N shards balanced by expected duration, e.g. 2/16.",
+)
+@click.option(
+    "--skip-check",
+    is_flag=True,
+    help="Don't check the scenarios and their templates before running them.",
+)
+@click.option(
+    "--record-cassette",
+    "record_cassette_path",
+    type=click.Path(dir_okay=False),
+    help="Record the responses of the bot into a cassette file.",
+)
+@click.option(
+    "--replay-cassette",
+    "replay_cassette_path",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Replay the responses recorded in a cassette file instead of the bot's.",
+)
+@click.option(
+    "--differential",
+    is_flag=True,
+    help="Compare the responses of each target with those of the first target.",
+)
+@click.argument("scenarios_glob", required=False)
+def run(
+    tests_path: str,
+    max_workers: int,
+    bundle_path: Optional[str],
+    deduplicate: bool,
+    history_path: Optional[str],
+    longest_first: bool,
+    failed_first: bool,
+    rerun_failures: int,
+    watch: bool,
+    artifacts_path: Optional[str],
+    max_output_length: Optional[int],
+    shard: Optional["Shard"],
+    skip_check: bool,
+    record_cassette_path: Optional[str],
+    replay_cassette_path: Optional[str],
+    differential: bool,
+    scenarios_glob: Optional[str],
+) -> None:
+    """Run the integration tests found in TESTS_PATH."""
+    # Templates and YAML files are only loaded once a command runs.
+    from .history import TimingHistory
+    from .interaction import InteractionLoader
+    from .reporting import DEFAULT_MAX_VALUE_LENGTH, FailureRenderer
+    from .scenario import (
+        SCENARIOS_FOLDER,
+        SCENARIOS_GLOB,
+        ScenarioFragmentLoader,
+        iter_scenarios,
+    )
+    from .sharding import scenario_weights
+    from .watch import SuiteWatcher
+
     folder_path = Path(tests_path)
+    if bundle_path is not None and scenarios_glob is not None:
+        raise click.UsageError("Scenarios are selected when compiling a bundle.")
+    scenarios_glob = scenarios_glob or SCENARIOS_GLOB
+    if bundle_path is None and not watch and not skip_check:
+        _check_suite(folder_path, scenarios_glob, max_workers, False)
+
     configuration = Configuration(folder_path / TEST_CONFIG_FILE)
     injector = DependencyInjector(configuration, {TESTS_PATH_ARGUMENT: folder_path})
-    scenarios_path = folder_path / SCENARIOS_FOLDER
-    scenarios: List[Scenario] = load_scenarios(scenarios_path, scenarios_glob)
+
+    scenarios: Iterable[Scenario]
+    watcher: Optional[SuiteWatcher] = None
+    if watch:
+        if bundle_path is not None:
+            raise click.UsageError("Bundles cannot be watched, watch TESTS_PATH.")
+        watcher = SuiteWatcher(
+            folder_path,
+            scenarios_glob,
+            injector.autowire(ScenarioFragmentLoader),
+            injector.autowire(InteractionLoader),
+        )
+        scenarios = watcher.scenarios
+    elif bundle_path is None:
+        scenarios = iter_scenarios(folder_path / SCENARIOS_FOLDER, scenarios_glob)
+    else:
+        from .bundle import SuiteBundle
+
+        bundle = SuiteBundle.read(Path(bundle_path))
+        if bundle.is_stale(folder_path):
+            raise click.ClickException(
+                f"Bundle '{bundle_path}' is out of date, compile it again."
+            )
+        injector.register(InteractionLoader, bundle.interaction_loader())
+        injector.register(ScenarioFragmentLoader, bundle.scenario_fragment_loader())
+        scenarios = bundle.scenarios
+
+    if record_cassette_path is not None and replay_cassette_path is not None:
+        raise click.UsageError("A run either records or replays a cassette.")
+    if record_cassette_path is not None:
+        injector.register(
+            Cassette, Cassette.constructor(record_cassette_path, RECORD_MODE)
+        )
+    elif replay_cassette_path is not None:
+        injector.register(
+            Cassette, Cassette.constructor(replay_cassette_path, REPLAY_MODE)
+        )
+    # Options take precedence over the cassette section of the configuration.
+    cassette: Cassette = injector.autowire(Cassette)
+
+    history: Optional[TimingHistory] = None
+    if history_path is not None:
+        history = TimingHistory(Path(history_path))
+
+    if shard is not None:
+        if watcher is not None:
+            raise click.UsageError("Shards cannot be watched, watch TESTS_PATH.")
+        scenarios = list(scenarios)
+        durations = (
+            {name: duration for name, (duration, _) in history.timings.items()}
+            if history is not None
+            else {}
+        )
+        scenarios = shard.select(
+            scenarios,
+            scenario_weights(
+                scenarios, injector.autowire(ScenarioFragmentLoader), durations
+            ),
+        )
+        if not scenarios:
+            # More shards than scenarios, the other shards run them all.
+            click.secho(
+                f"Shard {shard.index}/{shard.count} has no scenarios to run.",
+                fg=COLOR_WARNING,
+            )
+            sys.exit(EXIT_SUCCESS)
+
+    if history is not None:
+        if longest_first or failed_first:
+            scenarios = history.schedule(scenarios, longest_first, failed_first)
+    elif longest_first or failed_first:
+        raise click.UsageError("Scheduling from past runs requires --history.")
+
+    targets: List[str] = injector.autowire(target_selector)
+    if len(targets) > 1:
+        if deduplicate or history is not None or rerun_failures or watch:
+            raise click.UsageError(
+                "Runs against several targets cannot be deduplicated, recorded in a "
+                "history, rerun or watched."
+            )
+    elif differential:
+        raise click.UsageError(
+            "Differential runs compare several targets, separate the urls of "
+            f"protocol.url with '{TARGETS_SEPARATOR}'."
+        )
 
     runner_type: Callable[..., ScenarioRunner] = injector.autowire(runner_selector)
-    runner: ScenarioRunner = injector.autowire(runner_type)
+    failure_renderer = FailureRenderer(
+        Path(artifacts_path) if artifacts_path is not None else None,
+        max_output_length or DEFAULT_MAX_VALUE_LENGTH,
+    )
 
     output_thread = Thread(target=write_queue_output, daemon=True)
     output_thread.start()
 
-    failed_interactions: List[FailedInteraction] = _run_scenarios(
-        runner, scenarios, max_workers
+    if len(targets) > 1:
+        with ThreadPoolExecutor(max_workers) as executor:
+            exit_code = _run_targets(
+                injector,
+                runner_type,
+                executor,
+                max_workers,
+                targets,
+                differential,
+                failure_renderer,
+                scenarios,
+            )
+        injector.close()
+        _save_cassette(cassette)
+        sys.exit(exit_code)
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        run_suite = partial(
+            _run_suite,
+            injector,
+            runner_type,
+            executor,
+            max_workers,
+            deduplicate,
+            rerun_failures,
+            failure_renderer,
+        )
+        exit_code = run_suite(history, scenarios)
+        if watcher is not None:
+            # Reruns of the scenarios affected by a change aren't runs of the suite.
+            _watch(watcher, partial(run_suite, None))
+            exit_code = EXIT_SUCCESS
+
+    injector.close()
+    _save_cassette(cassette)
+    sys.exit(exit_code)
+
+
+@cli.command(name="check")
+@click.argument(TESTS_PATH_ARGUMENT, type=click.Path(exists=True))
+@click.option(
+    "-k",
+    "--max-workers",
+    type=click.INT,
+    default=DEFAULT_MAX_WORKERS,
+    help="Amount of simultaenous checkers.",
+)
+@click.argument("scenarios_glob", required=False)
+def check(tests_path: str, max_workers: int, scenarios_glob: Optional[str]) -> None:
+    """Check the scenarios and templates found in TESTS_PATH without running them."""
+    from .scenario import SCENARIOS_GLOB
+
+    _check_suite(Path(tests_path), scenarios_glob or SCENARIOS_GLOB, max_workers, True)
+    click.secho(f"No problems found in '{tests_path}'.", fg=COLOR_SUCCESS)
+
+
+@cli.command(name="compile")
+@click.argument(TESTS_PATH_ARGUMENT, type=click.Path(exists=True))
+@click.option(
+    "-o",
+    "--output",
+    type=click.Path(dir_okay=False),
+    help=f"Bundle file to write, defaults to TESTS_PATH/{BUNDLE_FILENAME}.",
+)
+@click.argument("scenarios_glob", required=False)
+def compile_bundle(
+    tests_path: str, output: Optional[str], scenarios_glob: Optional[str]
+) -> None:
+    """Compile the integration tests found in TESTS_PATH into a single bundle."""
+    from .bundle import SuiteBundle
+    from .scenario import SCENARIOS_GLOB
+
+    folder_path = Path(tests_path)
+    bundle_path = Path(output) if output else folder_path / BUNDLE_FILENAME
+    bundle = SuiteBundle.compile(folder_path, scenarios_glob or SCENARIOS_GLOB)
+    bundle.write(bundle_path)
+    click.secho(
+        f"Compiled {len(bundle.scenarios)} scenarios into '{bundle_path}'.",
+        fg=COLOR_SUCCESS,
+    )
+
+
+@cli.command(name="record")
+@click.argument("output_path", type=click.Path(file_okay=False))
+@click.option("--target", required=True, help="URL of the Rasa server.")
+@click.option(
+    "-p", "--port", type=click.INT, default=DEFAULT_PROXY_PORT, help="Proxy port."
+)
+@click.option(
+    "--idle-timeout",
+    type=click.FLOAT,
+    default=DEFAULT_IDLE_TIMEOUT,
+    help="Seconds without messages after which a conversation is written.",
+)
+def record(output_path: str, target: str, port: int, idle_timeout: float) -> None:
+    """Record conversations sent through a proxy to a Rasa server as scenarios."""
+    from .recorder import ConversationRecorder, RecordingProxy
+
+    os.makedirs(output_path, exist_ok=True)
+    recorder = ConversationRecorder(output_path, idle_timeout)
+    proxy = RecordingProxy((PROXY_HOST, port), target, recorder)
+    click.secho(
+        f"Recording conversations sent to http://{PROXY_HOST}:{port} into "
+        f"'{output_path}', press Ctrl+C to stop.",
+        fg=COLOR_WARNING,
+    )
+    try:
+        proxy.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.server_close()
+        recorder.close()
+
+
+@cli.command(name="convert")
+@click.argument("export_path", type=click.Path(exists=True, dir_okay=False))
+@click.argument("output_path", type=click.Path(file_okay=False))
+@click.option(
+    "-k",
+    "--max-workers",
+    type=click.INT,
+    default=DEFAULT_MAX_WORKERS,
+    help="Amount of simultaenous writers.",
+)
+def convert(export_path: str, output_path: str, max_workers: int) -> None:
+    """Convert the conversations of a tracker store export into scenarios."""
+    from .tracker_export import TrackerExportConverter
+
+    converter = TrackerExportConverter(Path(output_path), max_workers)
+    converter.convert(Path(export_path))
+    click.secho(
+        f"Converted {converter.conversation_count} conversations into "
+        f"{converter.scenario_count} scenarios.",
+        fg=COLOR_SUCCESS,
     )
 
+
+@cli.command(name="coordinate")
+@click.argument(TESTS_PATH_ARGUMENT, type=click.Path(exists=True))
+@click.option(
+    "--host",
+    default=PROXY_HOST,
+    help="Address to listen on, use 0.0.0.0 to accept workers of other hosts.",
+)
+@click.option(
+    "-p",
+    "--port",
+    type=click.INT,
+    default=DEFAULT_COORDINATOR_PORT,
+    help="Coordinator port.",
+)
+@click.option(
+    "--lease-timeout",
+    type=click.FLOAT,
+    default=DEFAULT_LEASE_TIMEOUT,
+    help="Seconds after which a scenario not reported by its worker is run again.",
+)
+@click.argument("scenarios_glob", required=False)
+def coordinate(
+    tests_path: str,
+    host: str,
+    port: int,
+    lease_timeout: float,
+    scenarios_glob: Optional[str],
+) -> None:
+    """Hand out the integration tests found in TESTS_PATH to workers."""
+    from .distributed import Coordinator, CoordinatorServer, WorkResult
+    from .reporting import FailureRenderer
+    from .scenario import (
+        SCENARIOS_FOLDER,
+        SCENARIOS_GLOB,
+        ScenarioFragmentLoader,
+        iter_scenarios,
+    )
+
+    folder_path = Path(tests_path)
+    scenarios = iter_scenarios(
+        folder_path / SCENARIOS_FOLDER, scenarios_glob or SCENARIOS_GLOB
+    )
+
+    def report_result(result: WorkResult) -> None:
+        if result.successful:
+            output_queue.put(
+                {
+                    MESSAGE_KEY: f"+++ {result.worker} successfully ran scenario "
+                    f"'{result.scenario_name}'!",
+                    FOREGROUND_COLOR_KEY: COLOR_SUCCESS,
+                }
+            )
+        else:
+            output_queue.put(
+                _format_message(
+                    f"--- Scenario '{result.scenario_name}' failed on {result.worker}."
+                )
+            )
+
+    coordinator = Coordinator(
+        scenarios, ScenarioFragmentLoader(folder_path), lease_timeout, report_result
+    )
+    server = CoordinatorServer((host, port), coordinator)
+    Thread(target=server.serve_forever, daemon=True).start()
+    Thread(target=write_queue_output, daemon=True).start()
+    click.secho(
+        f"Waiting for workers on http://{host}:{server.server_port}.",
+        fg=COLOR_WARNING,
+    )
+
+    try:
+        coordinator.wait()
+    finally:
+        server.shutdown()
+        server.server_close()
+
     output_queue.join()
-    if failed_interactions:
-        click.secho(f"{len(failed_interactions)} tests failed!", fg=COLOR_FAILURE)
+    failed_results = [result for result in coordinator.results if not result.successful]
+    for result in failed_results:
+        output_queue.put(
+            _format_message(
+                f"--- Scenario '{result.scenario_name}' ran on {result.worker}:"
+            )
+        )
+        if result.failed_interaction is not None:
+            _print_failed_interaction(
+                FailureRenderer(), result.scenario_name, result.failed_interaction
+            )
+        else:
+            output_queue.put(_format_message(f"{result.error}"))
+            output_queue.put(_format_message("---"))
+    output_queue.join()
+
+    workers = sorted({result.worker for result in coordinator.results})
+    for worker in workers:
+        worker_count = sum(result.worker == worker for result in coordinator.results)
+        click.secho(f"{worker} ran {worker_count} tests.")
+
+    scenario_count = len(coordinator.results)
+    if failed_results:
+        click.secho(f"{len(failed_results)} tests failed!", fg=COLOR_FAILURE)
     else:
-        click.secho(f"{len(scenarios)} tests ran successfully.", fg=COLOR_SUCCESS)
+        click.secho(
+            f"{scenario_count} tests ran successfully on {len(workers)} workers.",
+            fg=COLOR_SUCCESS,
+        )
+
+    sys.exit(EXIT_FAILURE if failed_results or not scenario_count else EXIT_SUCCESS)
 
-    sys.exit(EXIT_FAILURE if failed_interactions or not scenarios else EXIT_SUCCESS)
+
+@cli.command(name="work")
+@click.argument("coordinator_url")
+@click.argument(TESTS_PATH_ARGUMENT, type=click.Path(exists=True))
+@click.option(
+    "-k",
+    "--max-workers",
+    type=click.INT,
+    default=DEFAULT_MAX_WORKERS,
+    help="Amount of simultaenous workers.",
+)
+def work(coordinator_url: str, tests_path: str, max_workers: int) -> None:
+    """Run the integration tests handed out by a coordinator.
+
+    TESTS_PATH holds the interactions and configuration used by this worker."""
+    from .distributed import Worker
+
+    folder_path = Path(tests_path)
+    configuration = Configuration(folder_path / TEST_CONFIG_FILE)
+    injector = DependencyInjector(configuration, {TESTS_PATH_ARGUMENT: folder_path})
+    runner_type: Callable[..., ScenarioRunner] = injector.autowire(runner_selector)
+
+    worker = Worker(coordinator_url, injector, runner_type, max_workers)
+    try:
+        scenario_count = worker.run()
+    finally:
+        injector.close()
+    click.secho(f"{worker.name} ran {scenario_count} tests.", fg=COLOR_SUCCESS)
+
+
+@cli.command(name="serve")
+@click.argument(TESTS_PATH_ARGUMENT, type=click.Path(exists=True))
+@click.option("--host", default=PROXY_HOST, help="Address to listen on.")
+@click.option(
+    "-p", "--port", type=click.INT, default=DEFAULT_DAEMON_PORT, help="Daemon port."
+)
+@click.option(
+    "-k",
+    "--max-workers",
+    type=click.INT,
+    default=DEFAULT_MAX_WORKERS,
+    help="Amount of simultaenous workers.",
+)
+def serve(tests_path: str, host: str, port: int, max_workers: int) -> None:
+    """Keep the integration tests found in TESTS_PATH loaded and run them on demand."""
+    from .daemon import DaemonServer, RunDaemon
+    from .interaction import InteractionLoader
+    from .reporting import FailureRenderer
+    from .scenario import SCENARIOS_GLOB, ScenarioFragmentLoader
+    from .watch import SuiteWatcher
+
+    folder_path = Path(tests_path)
+    configuration = Configuration(folder_path / TEST_CONFIG_FILE)
+    injector = DependencyInjector(configuration, {TESTS_PATH_ARGUMENT: folder_path})
+    runner_type: Callable[..., ScenarioRunner] = injector.autowire(runner_selector)
+    watcher = SuiteWatcher(
+        folder_path,
+        SCENARIOS_GLOB,
+        injector.autowire(ScenarioFragmentLoader),
+        injector.autowire(InteractionLoader),
+    )
+
+    Thread(target=write_queue_output, daemon=True).start()
+    with ThreadPoolExecutor(max_workers) as executor:
+        daemon = RunDaemon(
+            watcher,
+            partial(
+                _run_interaction,
+                injector,
+                runner_type,
+                None,
+                None,
+                FailureRenderer(),
+            ),
+            executor,
+            max_workers * PENDING_SCENARIOS_PER_WORKER,
+        )
+        server = DaemonServer((host, port), daemon)
+        click.secho(
+            f"Serving runs of {len(watcher.scenarios)} scenarios on "
+            f"http://{host}:{server.server_port}, press Ctrl+C to stop.",
+            fg=COLOR_WARNING,
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    injector.close()
+
+
+@cli.group(name="history")
+def history_command() -> None:
+    """Query the past runs kept in a history file with run --history."""
+
+
+@history_command.command(name="slowest")
+@click.argument("history_path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "-n",
+    "--limit",
+    type=click.INT,
+    default=DEFAULT_HISTORY_LIMIT,
+    help="Amount of scenarios to list.",
+)
+@click.option(
+    "--runs",
+    type=click.INT,
+    default=DEFAULT_HISTORY_RUNS,
+    help="Amount of most recent runs to consider.",
+)
+def history_slowest(history_path: str, limit: int, runs: int) -> None:
+    """List the scenarios with the longest mean duration over the last runs."""
+    from .history import TimingHistory
+
+    history = TimingHistory(Path(history_path))
+    for statistics in history.slowest(limit, runs):
+        turn_latency = (
+            f"{statistics.mean_turn_latency_p95 * MILLISECONDS:.0f} ms"
+            if statistics.mean_turn_latency_p95 is not None
+            else "-"
+        )
+        click.echo(
+            f"{statistics.mean_duration * MILLISECONDS:10.0f} ms mean, "
+            f"{statistics.max_duration * MILLISECONDS:.0f} ms max, "
+            f"{turn_latency} p95 turn latency, "
+            f"{statistics.failure_count}/{statistics.run_count} failed: "
+            f"{statistics.name}"
+        )
+
+
+@history_command.command(name="growth")
+@click.argument("history_path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--threshold",
+    type=click.FLOAT,
+    default=DEFAULT_GROWTH_THRESHOLD,
+    help="Minimum growth of the 95th percentile, in percent.",
+)
+@click.option(
+    "--runs",
+    type=click.INT,
+    default=DEFAULT_HISTORY_RUNS,
+    help="Amount of most recent runs, compared to as many runs before them.",
+)
+def history_growth(history_path: str, threshold: float, runs: int) -> None:
+    """List the scenarios whose 95th percentile duration grew over the last runs."""
+    from .history import TimingHistory
+
+    history = TimingHistory(Path(history_path))
+    for growth in history.percentile_growth(threshold / 100, runs):
+        click.echo(
+            f"{growth.previous_duration * MILLISECONDS:10.0f} ms -> "
+            f"{growth.recent_duration * MILLISECONDS:.0f} ms: {growth.name}"
+        )
+
+
+def _run_suite(
+    injector: DependencyInjector,
+    runner_type: Callable[..., "ScenarioRunner"],
+    executor: Executor,
+    max_workers: int,
+    deduplicate: bool,
+    rerun_failures: int,
+    failure_renderer: "FailureRenderer",
+    history: Optional["TimingHistory"],
+    scenarios: Iterable["Scenario"],
+) -> int:
+    """
+    Run scenarios and report their results, returns the exit code.
+    """
+    from .deduplication import ConversationDeduplicator
+
+    deduplicator = ConversationDeduplicator() if deduplicate else None
+
+    scenario_count, failures = _run_scenarios(
+        injector,
+        runner_type,
+        scenarios,
+        max_workers,
+        deduplicator,
+        history,
+        executor,
+        failure_renderer,
+    )
+    output_queue.join()
+    if history is not None:
+        history.save()
+
+    flaky_scenarios: List[Tuple[Scenario, int]] = []
+    if failures and rerun_failures:
+        failures, flaky_scenarios = _rerun_failures(
+            injector,
+            runner_type,
+            failures,
+            max_workers,
+            rerun_failures,
+            executor,
+            failure_renderer,
+        )
+        output_queue.join()
+
+    if deduplicator is not None:
+        click.secho(
+            f"{deduplicator.saved_count} conversations saved by deduplication.",
+            fg=COLOR_WARNING,
+        )
+    for scenario, rerun in flaky_scenarios:
+        click.secho(
+            f"Scenario '{scenario.name}' is flaky, it passed on rerun {rerun}.",
+            fg=COLOR_WARNING,
+        )
+    for scenario, _ in failures if rerun_failures else []:
+        click.secho(
+            f"Scenario '{scenario.name}' failed consistently.", fg=COLOR_FAILURE
+        )
+
+    if failures:
+        click.secho(f"{len(failures)} tests failed!", fg=COLOR_FAILURE)
+    else:
+        flaky_count = f" ({len(flaky_scenarios)} flaky)" if flaky_scenarios else ""
+        click.secho(
+            f"{scenario_count} tests ran successfully{flaky_count}.",
+            fg=COLOR_SUCCESS,
+        )
+
+    return EXIT_FAILURE if failures or not scenario_count else EXIT_SUCCESS
+
+
+def _run_targets(
+    injector: DependencyInjector,
+    runner_type: Callable[..., "ScenarioRunner"],
+    executor: Executor,
+    max_workers: int,
+    targets: List[str],
+    differential: bool,
+    failure_renderer: "FailureRenderer",
+    scenarios: Iterable["Scenario"],
+) -> int:
+    """
+    Run each scenario against all the targets and report the results of each
+    target, returns the exit code.
+    """
+    # Imported once selected, like the runners.
+    from .rest_runner import AbstractRestRunner
+    from .targets import MultiTargetRunner, TargetReport
+    from .transport import HttpTransport
+
+    if not issubclass(
+        getattr(runner_type, "constructor", runner_type), AbstractRestRunner
+    ):
+        raise click.UsageError("Only REST and IVR runs can have several targets.")
+
+    multi_target_runner = MultiTargetRunner(
+        targets, injector.autowire(HttpTransport), differential, max_workers
+    )
+    report = TargetReport(targets)
+
+    def run_scenario(scenario: "Scenario") -> None:
+        output_queue.put(
+            _format_message(f"Running scenario '{scenario.name}'...", COLOR_WARNING)
+        )
+        with injector.scenario_scope():
+            runner: AbstractRestRunner = injector.autowire(runner_type)
+            results = multi_target_runner.run(runner, scenario)
+        report.record(results)
+
+        failed_results = [result for result in results if result.failed]
+        if not failed_results:
+            output_queue.put(
+                _format_message(
+                    f"+++ Successfully ran scenario '{scenario.name}' on all targets!",
+                    COLOR_SUCCESS,
+                )
+            )
+        for result in failed_results:
+            output_queue.put(
+                _format_message(
+                    f"--- Scenario '{scenario.name}' failed the following "
+                    f"interaction on '{result.target}'."
+                )
+            )
+            _print_failed_interaction(
+                failure_renderer,
+                f"{scenario.name}@{result.target}",
+                result.failed_interaction,
+            )
+
+    try:
+        scenario_count = sum(
+            1
+            for _ in bounded_map(
+                executor,
+                run_scenario,
+                scenarios,
+                max_workers * PENDING_SCENARIOS_PER_WORKER,
+            )
+        )
+    finally:
+        multi_target_runner.close()
+    output_queue.join()
+
+    for statistics in report.statistics:
+        baseline = (
+            " (baseline)" if differential and statistics.target == targets[0] else ""
+        )
+        latencies = (
+            f", turn latency mean {statistics.mean_turn_latency * MILLISECONDS:.0f}ms"
+            f", p95 {statistics.turn_latency_p95 * MILLISECONDS:.0f}ms"
+            if statistics.turn_latencies
+            else ""
+        )
+        click.secho(
+            f"'{statistics.target}'{baseline}: "
+            f"{statistics.scenario_count - statistics.failure_count}/"
+            f"{statistics.scenario_count} tests passed{latencies}.",
+            fg=COLOR_FAILURE if statistics.failure_count else COLOR_SUCCESS,
+        )
+
+    return EXIT_FAILURE if report.failed or not scenario_count else EXIT_SUCCESS
+
+
+def _watch(
+    watcher: "SuiteWatcher", run_suite: Callable[[Iterable["Scenario"]], int]
+) -> None:
+    click.secho("Watching for changes, press Ctrl+C to stop.", fg=COLOR_WARNING)
+    try:
+        while True:
+            sleep(WATCH_POLL_INTERVAL)
+            scenarios = watcher.poll()
+            if scenarios:
+                run_suite(scenarios)
+    except KeyboardInterrupt:
+        pass
 
 
 def write_queue_output():
@@ -84,59 +904,183 @@ def write_queue_output():
 
 
 def _run_scenarios(
-    runner: ScenarioRunner, scenarios: List[Scenario], max_workers: int
-) -> List[FailedInteraction]:
-    with ThreadPoolExecutor(max_workers) as executor:
-        return [
-            result
-            for result in executor.map(
-                _run_interaction, [runner] * len(scenarios), scenarios
+    injector: DependencyInjector,
+    runner_type: Callable[..., "ScenarioRunner"],
+    scenarios: Iterable["Scenario"],
+    max_workers: int,
+    deduplicator: Optional["ConversationDeduplicator"] = None,
+    history: Optional["TimingHistory"] = None,
+    executor: Optional[Executor] = None,
+    failure_renderer: Optional["FailureRenderer"] = None,
+) -> Tuple[int, List[ScenarioResult]]:
+    from .reporting import FailureRenderer
+
+    if executor is None:
+        with ThreadPoolExecutor(max_workers) as run_executor:
+            return _run_scenarios(
+                injector,
+                runner_type,
+                scenarios,
+                max_workers,
+                deduplicator,
+                history,
+                run_executor,
+                failure_renderer,
             )
-            if result is not None
-        ]
+
+    run_interaction = partial(
+        _run_interaction,
+        injector,
+        runner_type,
+        deduplicator,
+        history,
+        failure_renderer or FailureRenderer(),
+    )
+
+    def run_scenario(scenario: "Scenario") -> ScenarioResult:
+        return scenario, run_interaction(scenario)
+
+    scenario_count = 0
+    failures: List[ScenarioResult] = []
+    for scenario, result in bounded_map(
+        executor,
+        run_scenario,
+        scenarios,
+        max_workers * PENDING_SCENARIOS_PER_WORKER,
+    ):
+        scenario_count += 1
+        if result is not None:
+            failures.append((scenario, result))
+
+    return scenario_count, failures
+
+
+def _rerun_failures(
+    injector: DependencyInjector,
+    runner_type: Callable[..., "ScenarioRunner"],
+    failures: List[ScenarioResult],
+    max_workers: int,
+    rerun_count: int,
+    executor: Optional[Executor] = None,
+    failure_renderer: Optional["FailureRenderer"] = None,
+) -> Tuple[List[ScenarioResult], List[Tuple["Scenario", int]]]:
+    """
+    Rerun the failed scenarios concurrently until they pass or failed every rerun.
+    Returns the scenarios which kept failing, and the flaky scenarios with the rerun
+    they passed on.
+    """
+    flaky_scenarios: List[Tuple[Scenario, int]] = []
+    for rerun in range(1, rerun_count + 1):
+        if not failures:
+            break
+        output_queue.put(
+            _format_message(
+                f"Rerunning {len(failures)} failed scenarios ({rerun}/{rerun_count})...",
+                COLOR_WARNING,
+            )
+        )
+        _, rerun_failures = _run_scenarios(
+            injector,
+            runner_type,
+            [scenario for scenario, _ in failures],
+            max_workers,
+            executor=executor,
+            failure_renderer=failure_renderer,
+        )
+        still_failing = {scenario for scenario, _ in rerun_failures}
+        flaky_scenarios.extend(
+            (scenario, rerun)
+            for scenario, _ in failures
+            if scenario not in still_failing
+        )
+        failures = rerun_failures
+
+    return failures, flaky_scenarios
 
 
 def _run_interaction(
-    runner: ScenarioRunner, scenario: Scenario
-) -> Optional[FailedInteraction]:
+    injector: DependencyInjector,
+    runner_type: Callable[..., "ScenarioRunner"],
+    deduplicator: Optional["ConversationDeduplicator"],
+    history: Optional["TimingHistory"],
+    failure_renderer: "FailureRenderer",
+    scenario: "Scenario",
+) -> Optional["FailedInteraction"]:
     output_queue.put(
         {
             MESSAGE_KEY: f"Running scenario '{scenario.name}'...",
             FOREGROUND_COLOR_KEY: COLOR_WARNING,
         }
     )
-    result: Optional[FailedInteraction] = runner.run(scenario)
+    shared_scenario_name: Optional[str] = None
+    start = perf_counter()
+    with injector.scenario_scope():
+        runner: ScenarioRunner = injector.autowire(runner_type)
+        result: Optional[FailedInteraction]
+        if deduplicator is None:
+            result = runner.run(scenario)
+        else:
+            shared_scenario_name, result = deduplicator.run(runner, scenario)
 
+    # Scenarios sharing the run of another one only waited for it.
+    if history is not None and shared_scenario_name is None:
+        history.record(
+            scenario.name,
+            perf_counter() - start,
+            result is not None,
+            runner.turn_latencies,
+        )
+
+    shared_run = (
+        f" (same conversation as '{shared_scenario_name}')"
+        if shared_scenario_name is not None
+        else ""
+    )
     if result is None:
         output_queue.put(
             {
-                MESSAGE_KEY: f"+++ Successfully ran scenario '{scenario.name}'!",
+                MESSAGE_KEY: f"+++ Successfully ran scenario '{scenario.name}'{shared_run}!",
                 FOREGROUND_COLOR_KEY: COLOR_SUCCESS,
             }
         )
     else:
         output_queue.put(
             {
-                MESSAGE_KEY: f"--- Scenario '{scenario.name}' failed the following interaction.",
+                MESSAGE_KEY: f"--- Scenario '{scenario.name}'{shared_run} failed the following interaction.",
                 FOREGROUND_COLOR_KEY: COLOR_FAILURE,
             }
         )
-        _print_failed_interaction(result)
+        _print_failed_interaction(failure_renderer, scenario.name, result)
 
     return result
 
 
-def _print_failed_interaction(failed_interaction: FailedInteraction) -> None:
+def _print_failed_interaction(
+    failure_renderer: "FailureRenderer",
+    scenario_name: str,
+    failed_interaction: "FailedInteraction",
+) -> None:
+    from .reporting import EXTRA_SIGN
+
+    # Called from the scenario threads, the output thread only prints bounded text.
+    artifact_path = failure_renderer.write_artifact(scenario_name, failed_interaction)
+
     output_queue.put({MESSAGE_KEY: "User sent:"})
-    output_queue.put({MESSAGE_KEY: f"{failed_interaction.user_input}"})
+    output_queue.put(
+        {MESSAGE_KEY: failure_renderer.format_value(failed_interaction.user_input)}
+    )
     output_queue.put(
         {MESSAGE_KEY: "Expected output:", FOREGROUND_COLOR_KEY: COLOR_WARNING}
     )
-    output_queue.put({MESSAGE_KEY: f"{failed_interaction.expected_output}"})
+    output_queue.put(
+        {MESSAGE_KEY: failure_renderer.format_value(failed_interaction.expected_output)}
+    )
     output_queue.put(
         {MESSAGE_KEY: "Actual output:", FOREGROUND_COLOR_KEY: COLOR_WARNING}
     )
-    output_queue.put({MESSAGE_KEY: f"{failed_interaction.actual_output}"})
+    output_queue.put(
+        {MESSAGE_KEY: failure_renderer.format_value(failed_interaction.actual_output)}
+    )
     output_queue.put(
         {
             MESSAGE_KEY: "Bot output was different than expected:",
@@ -144,48 +1088,128 @@ def _print_failed_interaction(failed_interaction: FailedInteraction) -> None:
         }
     )
 
-    if failed_interaction.output_diff.missing_entries:
-        for key, value in failed_interaction.output_diff.missing_entries.items():
-            output_queue.put(_format_message(f" - {key}: {value}"))
-            if key in failed_interaction.output_diff.extra_entries:
-                extra_value = failed_interaction.output_diff.extra_entries.pop(key)
-                output_queue.put(
-                    _format_message(f" + {key}: {extra_value}", COLOR_EXTRA)
-                )
-
-    if failed_interaction.output_diff.extra_entries:
-        for key, value in failed_interaction.output_diff.extra_entries.items():
-            output_queue.put(_format_message(f" + {key}: {value}", COLOR_EXTRA))
+    diff_lines, omitted_count = failure_renderer.diff_lines(
+        failed_interaction.output_diff
+    )
+    for sign, key, value in diff_lines:
+        output_queue.put(
+            _format_message(
+                f" {sign} {key}: {value}",
+                COLOR_EXTRA if sign == EXTRA_SIGN else None,
+            )
+        )
+    if omitted_count:
+        output_queue.put(_format_message(f" ... {omitted_count} more differences"))
+    if artifact_path is not None:
+        output_queue.put(
+            _format_message(
+                f"Full failed interaction written to '{artifact_path}'.",
+                COLOR_WARNING,
+            )
+        )
 
     output_queue.put(_format_message("---"))
 
 
+def _check_suite(
+    tests_path: Path, scenarios_glob: str, max_workers: int, all_templates: bool
+) -> None:
+    from .validation import SuiteValidator
+
+    problems = SuiteValidator(tests_path, max_workers).validate(
+        scenarios_glob, all_templates
+    )
+    for problem in problems:
+        click.secho(str(problem), fg=COLOR_FAILURE)
+    if problems:
+        raise click.ClickException(f"Found {len(problems)} problems in '{tests_path}'.")
+
+
+def _save_cassette(cassette: Cassette) -> None:
+    if cassette.recording:
+        saved_count = cassette.save()
+        click.secho(
+            f"{saved_count} responses recorded into cassette '{cassette.path}'.",
+            fg=COLOR_WARNING,
+        )
+
+
+def _parse_shard(value: Optional[str]) -> Optional["Shard"]:
+    if value is None:
+        return None
+    from .sharding import Shard
+
+    try:
+        return Shard.from_string(value)
+    except ValueError as error:
+        raise click.BadParameter(str(error))
+
+
 def _format_message(message: str, color: str = None) -> Dict:
     return {MESSAGE_KEY: message, FOREGROUND_COLOR_KEY: color or COLOR_FAILURE}
 
 
 class RunnerType(Enum):
-    REST = ("rest", RestRunner)
-    IVR = ("ivr", IvrRunner)
-    SOCKETIO = ("socketio", SocketIORunner)
+    """
+    Built-in runners, imported only once selected so that a run doesn't pay for the
+    protocol stacks it doesn't use.
+    """
 
-    def __init__(self, key: str, runner_constructor: Callable):
+    REST = ("rest", "rest_runner", "RestRunner")
+    IVR = ("ivr", "rest_runner", "IvrRunner")
+    SOCKETIO = ("socketio", "socketio_runner", "SocketIORunner")
+
+    def __init__(self, key: str, module_name: str, runner_name: str):
         self.key = key
-        self.runner_constructor = runner_constructor
+        self.module_name = module_name
+        self.runner_name = runner_name
 
-    @classmethod
-    def to_dict(cls) -> Dict[str, Callable]:
-        return {entry.key: entry.runner_constructor for entry in cls}
+    @property
+    def runner_constructor(self) -> Callable[..., "ScenarioRunner"]:
+        module = import_module(f".{self.module_name}", __package__)
+        return getattr(module, self.runner_name)
 
     @classmethod
-    def from_string(cls, runner_type: str) -> Callable[..., ScenarioRunner]:
-        selector_callables: Dict[str, Callable] = cls.to_dict()
-        if runner_type in selector_callables:
-            return selector_callables[runner_type]
+    def from_string(cls, runner_type: str) -> Callable[..., "ScenarioRunner"]:
+        for entry in cls:
+            if entry.key == runner_type:
+                return entry.runner_constructor
+
+        runner_constructor = _entry_point_runner(runner_type)
+        if runner_constructor is not None:
+            return runner_constructor
 
         raise Exception(f"'{runner_type}' isn't a valid runner type.")
 
 
+def _entry_point_runner(runner_type: str) -> Optional[Callable[..., "ScenarioRunner"]]:
+    """
+    Look up runners registered by other packages under the
+    `rasa_integration_testing.runners` entry point group.
+    """
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        return None
+
+    all_entry_points = entry_points()
+    runner_entry_points = (
+        all_entry_points.select(group=RUNNERS_ENTRY_POINT_GROUP)
+        if hasattr(all_entry_points, "select")
+        else all_entry_points.get(RUNNERS_ENTRY_POINT_GROUP, [])
+    )
+    for entry_point in runner_entry_points:
+        if entry_point.name == runner_type:
+            return entry_point.load()
+
+    return None
+
+
+@configure("protocol.url")
+def target_selector(url: str) -> List[str]:
+    return [target.strip() for target in url.split(TARGETS_SEPARATOR) if target.strip()]
+
+
 @configure("protocol.type")
-def runner_selector(protocol_type: str) -> Callable[..., ScenarioRunner]:
+def runner_selector(protocol_type: str) -> Callable[..., "ScenarioRunner"]:
     return RunnerType.from_string(protocol_type)
@@ -0,0 +1,283 @@
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Mapping
+
+import jinja2
+from jinja2 import (
+    BaseLoader,
+    Environment,
+    FileSystemLoader,
+    TemplateNotFound,
+    meta,
+    select_autoescape,
+)
+
+from .common import json_codec
+from .common.variables import EMPTY_VARIABLES
+from .interaction import (
+    BOT_FOLDER,
+    INTERACTION_TURN_EXTENSION,
+    INTERACTIONS_FOLDER,
+    Interaction,
+    InteractionLoader,
+    InteractionTurn,
+    template_filename,
+)
+from .matcher import NO_RULES, RULES_EXTENSION, MatcherRules, read_rules, rules_filename
+from .scenario import (
+    SCENARIO_FRAGMENTS_FOLDER,
+    SCENARIOS_FOLDER,
+    Scenario,
+    ScenarioFragmentLoader,
+    load_scenarios,
+)
+
+BUNDLE_FORMAT = "rasa-integration-testing-bundle"
+BUNDLE_VERSION = 4
+
+FORMAT_KEY = "format"
+VERSION_KEY = "version"
+JINJA_VERSION_KEY = "jinja_version"
+HASHES_KEY = "hashes"
+SCENARIOS_KEY = "scenarios"
+TEMPLATES_KEY = "templates"
+STATIC_TURNS_KEY = "static_turns"
+RULES_KEY = "rules"
+NAME_KEY = "name"
+VARIABLES_KEY = "variables"
+INTERACTIONS_KEY = "interactions"
+
+HASHED_FOLDERS = (SCENARIOS_FOLDER, SCENARIO_FRAGMENTS_FOLDER, INTERACTIONS_FOLDER)
+
+
+class BundleError(Exception):
+    def __init__(self, message: str, path: Path):
+        super().__init__(f"{message}: {path}")
+
+
+class SuiteBundle:
+    """
+    A test suite with its scenario fragments resolved and its interaction templates
+    compiled ahead of time, so that a run can skip YAML parsing and Jinja compilation.
+
+    Compiled templates are Python source generated by Jinja, they are only loaded by
+    the Jinja version that compiled them.
+    """
+
+    def __init__(
+        self,
+        scenarios: List[Scenario],
+        templates: Dict[str, str],
+        static_turns: Dict[str, str],
+        hashes: Dict[str, str],
+        rules: Dict[str, dict],
+    ):
+        self.scenarios = scenarios
+        self.templates = templates
+        self.static_turns = static_turns
+        self.hashes = hashes
+        self.rules = rules
+
+    @classmethod
+    def compile(cls, tests_path: Path, scenarios_glob: str) -> "SuiteBundle":
+        scenario_fragment_loader = ScenarioFragmentLoader(tests_path)
+        scenarios = [
+            Scenario(
+                scenario.name,
+                list(scenario_fragment_loader.resolve_interactions(scenario)),
+                scenario.variables,
+            )
+            for scenario in load_scenarios(
+                tests_path / SCENARIOS_FOLDER, scenarios_glob
+            )
+        ]
+
+        interactions_path = tests_path / INTERACTIONS_FOLDER
+        environment = _template_environment(FileSystemLoader(str(interactions_path)))
+        templates: Dict[str, str] = {}
+        static_turns: Dict[str, str] = {}
+        for template_path in sorted(
+            interactions_path.rglob(f"*.{INTERACTION_TURN_EXTENSION}")
+        ):
+            name = template_path.relative_to(interactions_path).as_posix()
+            source = template_path.read_text()
+            templates[name] = environment.compile(source, name, name, raw=True)
+
+            syntax_tree = environment.parse(source)
+            if not meta.find_undeclared_variables(syntax_tree) and not list(
+                meta.find_referenced_templates(syntax_tree)
+            ):
+                rendered_template = environment.get_template(name).render()
+                try:
+                    json_codec.loads(rendered_template)
+                except ValueError as error:
+                    raise BundleError(f"Invalid JSON template ({error})", template_path)
+                static_turns[name] = rendered_template
+
+        rules: Dict[str, dict] = {}
+        for rules_path in sorted(interactions_path.rglob(f"*.{RULES_EXTENSION}")):
+            with open(rules_path) as rules_file:
+                rules_data = read_rules(rules_file)
+            MatcherRules.from_dict(rules_data, rules_path)
+            rules[rules_path.relative_to(interactions_path).as_posix()] = rules_data
+
+        return cls(
+            scenarios, templates, static_turns, content_hashes(tests_path), rules
+        )
+
+    @classmethod
+    def read(cls, bundle_path: Path) -> "SuiteBundle":
+        with open(bundle_path, "rb") as bundle_file:
+            data = json_codec.loads(bundle_file.read())
+
+        if (
+            not isinstance(data, dict)
+            or data.get(FORMAT_KEY) != BUNDLE_FORMAT
+            or data.get(VERSION_KEY) != BUNDLE_VERSION
+        ):
+            raise BundleError("Unsupported bundle format or version", bundle_path)
+        if data.get(JINJA_VERSION_KEY) != jinja2.__version__:
+            raise BundleError(
+                f"Bundle compiled with Jinja {data.get(JINJA_VERSION_KEY)}, compile "
+                f"it again with Jinja {jinja2.__version__}",
+                bundle_path,
+            )
+
+        return cls(
+            [deserialize_scenario(scenario) for scenario in data[SCENARIOS_KEY]],
+            data[TEMPLATES_KEY],
+            data[STATIC_TURNS_KEY],
+            data[HASHES_KEY],
+            data[RULES_KEY],
+        )
+
+    def write(self, bundle_path: Path) -> None:
+        with open(bundle_path, "wb") as bundle_file:
+            bundle_file.write(
+                json_codec.dumpb(
+                    {
+                        FORMAT_KEY: BUNDLE_FORMAT,
+                        VERSION_KEY: BUNDLE_VERSION,
+                        JINJA_VERSION_KEY: jinja2.__version__,
+                        HASHES_KEY: self.hashes,
+                        SCENARIOS_KEY: [
+                            serialize_scenario(scenario) for scenario in self.scenarios
+                        ],
+                        TEMPLATES_KEY: self.templates,
+                        STATIC_TURNS_KEY: self.static_turns,
+                        RULES_KEY: self.rules,
+                    }
+                )
+            )
+
+    def is_stale(self, tests_path: Path) -> bool:
+        return content_hashes(tests_path) != self.hashes
+
+    def interaction_loader(self) -> InteractionLoader:
+        return BundledInteractionLoader(self.templates, self.static_turns, self.rules)
+
+    def scenario_fragment_loader(self) -> ScenarioFragmentLoader:
+        return BundledScenarioFragmentLoader()
+
+
+class BundledInteractionLoader(InteractionLoader.constructor):  # type: ignore
+    def __init__(
+        self,
+        templates: Dict[str, str],
+        static_turns: Dict[str, str],
+        rules: Dict[str, dict],
+    ):
+        self._template_environment = _template_environment(PrecompiledLoader(templates))
+        self._static_turns = static_turns
+        self._rules = {
+            name: MatcherRules.from_dict(rules_data, Path(name))
+            for name, rules_data in rules.items()
+        }
+
+    def bot_turn_rules(self, bot_turn: InteractionTurn) -> MatcherRules:
+        return self._rules.get(
+            rules_filename(template_filename(bot_turn, BOT_FOLDER)), NO_RULES
+        )
+
+    def _render_turn(
+        self, turn: InteractionTurn, folder: str, variables: Mapping = EMPTY_VARIABLES
+    ) -> dict:
+        static_turn = self._static_turns.get(template_filename(turn, folder))
+        if static_turn is None:
+            return super()._render_turn(turn, folder, variables)
+        return json_codec.loads(static_turn)
+
+
+class BundledScenarioFragmentLoader(ScenarioFragmentLoader.constructor):  # type: ignore
+    """
+    Bundled scenarios are already resolved, there are no fragments left to load.
+    """
+
+    def __init__(self):
+        self._scenario_fragments: Dict[str, List[Interaction]] = {}
+
+
+class PrecompiledLoader(BaseLoader):
+    def __init__(self, templates: Dict[str, str]):
+        self._templates = templates
+
+    def load(self, environment: Environment, name: str, globals: dict = None):
+        if name not in self._templates:
+            raise TemplateNotFound(name)
+
+        code = compile(self._templates[name], name, "exec")
+        return environment.template_class.from_code(
+            environment, code, environment.make_globals(globals), lambda: True
+        )
+
+
+def content_hashes(tests_path: Path) -> Dict[str, str]:
+    return {
+        path.relative_to(tests_path).as_posix(): _file_hash(path)
+        for folder in HASHED_FOLDERS
+        for path in sorted((tests_path / folder).rglob("*"))
+        if path.is_file()
+    }
+
+
+def _file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _template_environment(loader: BaseLoader) -> Environment:
+    return Environment(loader=loader, autoescape=select_autoescape(["json"]))
+
+
+def serialize_scenario(scenario: Scenario) -> dict:
+    """
+    Serialize a scenario whose fragments were resolved.
+    """
+    return {
+        NAME_KEY: scenario.name,
+        VARIABLES_KEY: scenario.variables,
+        INTERACTIONS_KEY: [
+            [
+                interaction.user.template,
+                interaction.user.variables,
+                interaction.bot.template,
+                interaction.bot.variables,
+            ]
+            for interaction in scenario.steps
+        ],
+    }
+
+
+def deserialize_scenario(data: dict) -> Scenario:
+    return Scenario(
+        data[NAME_KEY],
+        [
+            Interaction(
+                InteractionTurn(user_template, user_variables),
+                InteractionTurn(bot_template, bot_variables),
+            )
+            for user_template, user_variables, bot_template, bot_variables in data[
+                INTERACTIONS_KEY
+            ]
+        ],
+        data[VARIABLES_KEY],
+    )
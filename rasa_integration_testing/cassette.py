@@ -0,0 +1,232 @@
+import sqlite3
+import zlib
+from contextlib import contextmanager
+from hashlib import blake2b
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .common import json_codec
+from .common.configuration import configure
+
+OFF_MODE = "off"
+RECORD_MODE = "record"
+REPLAY_MODE = "replay"
+CASSETTE_MODES = (OFF_MODE, RECORD_MODE, REPLAY_MODE)
+
+# Stands for the sender or session id of the conversation in the recorded exchanges.
+CONVERSATION_ID_PLACEHOLDER = "cassette-conversation"
+KEY_DIGEST_SIZE = 16
+TARGET_SEPARATOR = b"\0"
+EVENT_KEY = "event"
+DATA_KEY = "data"
+
+CREATE_TABLES = """
+CREATE TABLE IF NOT EXISTS exchanges (
+    key BLOB PRIMARY KEY,
+    status INTEGER,
+    content BLOB NOT NULL
+) WITHOUT ROWID;
+"""
+SELECT_EXCHANGES = "SELECT key, status, content FROM exchanges"
+UPSERT_EXCHANGE = """
+INSERT OR REPLACE INTO exchanges (key, status, content) VALUES (?, ?, ?)
+"""
+
+# HTTP status of a response, None for Socket.IO messages, and compressed content.
+Exchange = Tuple[Optional[int], bytes]
+
+
+@configure("cassette.path", "cassette.mode")
+class Cassette:
+    """
+    Responses of the bot to each request of the runners, kept in a SQLite file so
+    that suites can be evaluated again offline, without waiting on a bot.
+
+    A request is keyed by a digest of its conversation up to and including it, with
+    the id of the conversation replaced by a placeholder. Scenarios thus replay
+    whatever sender or session id they are given, a request changed since the
+    recording misses the cassette, and identical conversations are kept once.
+
+    Recorded exchanges are kept in memory from any thread and saved at once, the
+    exchanges of a replayed cassette are all loaded when it is opened.
+    """
+
+    def __init__(self, path: str = "", mode: str = OFF_MODE):
+        if mode not in CASSETTE_MODES:
+            raise Exception(
+                f"'{mode}' isn't a valid cassette mode, use one of "
+                f"{', '.join(CASSETTE_MODES)}."
+            )
+        if mode != OFF_MODE and not path:
+            raise Exception(f"The {mode} cassette mode requires a cassette path.")
+        self.path = Path(path)
+        self.mode = mode
+        self._exchanges: Dict[bytes, Exchange] = {}
+        self._recorded: Dict[bytes, Exchange] = {}
+        # Key of the last request of each conversation.
+        self._conversation_keys: Dict[Tuple[str, str], bytes] = {}
+        self._lock = Lock()
+        if mode == REPLAY_MODE:
+            if not self.path.is_file():
+                raise Exception(f"Cassette '{path}' doesn't exist, record it first.")
+            with self._connect() as connection:
+                self._exchanges = {
+                    key: (status, content)
+                    for key, status, content in connection.execute(SELECT_EXCHANGES)
+                }
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == RECORD_MODE
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == REPLAY_MODE
+
+    def next_key(
+        self, target: str, conversation_id: Optional[str], request: bytes
+    ) -> bytes:
+        """
+        Key of the next request of a conversation with the target. Requests without
+        a conversation id are keyed on their own.
+        """
+        if conversation_id is None:
+            return _digest(b"", target, request)
+
+        conversation = (target, conversation_id)
+        normalized_request = request.replace(
+            conversation_id.encode(), CONVERSATION_ID_PLACEHOLDER.encode()
+        )
+        with self._lock:
+            key = _digest(
+                self._conversation_keys.get(conversation, b""),
+                target,
+                normalized_request,
+            )
+            self._conversation_keys[conversation] = key
+        return key
+
+    def end_conversation(self, target: str, conversation_id: str) -> None:
+        with self._lock:
+            self._conversation_keys.pop((target, conversation_id), None)
+
+    def record(
+        self,
+        key: bytes,
+        status: Optional[int],
+        content: bytes,
+        conversation_id: Optional[str] = None,
+    ) -> None:
+        if conversation_id is not None:
+            content = content.replace(
+                conversation_id.encode(), CONVERSATION_ID_PLACEHOLDER.encode()
+            )
+        with self._lock:
+            self._recorded[key] = (status, zlib.compress(content))
+
+    def replay(
+        self, key: bytes, conversation_id: Optional[str] = None
+    ) -> Optional[Tuple[Optional[int], bytes]]:
+        """
+        Status and content recorded for the request, None when it wasn't recorded.
+        """
+        exchange = self._exchanges.get(key)
+        if exchange is None:
+            return None
+        status, content = exchange
+        content = zlib.decompress(content)
+        if conversation_id is not None:
+            content = content.replace(
+                CONVERSATION_ID_PLACEHOLDER.encode(), conversation_id.encode()
+            )
+        return status, content
+
+    def stream(self, target: str, conversation_id: str) -> "CassetteStream":
+        return CassetteStream(self, target, conversation_id)
+
+    def save(self) -> int:
+        """
+        Add the exchanges recorded since the last save to the cassette, replacing
+        the ones recorded again. Returns the amount of exchanges saved.
+        """
+        with self._lock:
+            recorded, self._recorded = self._recorded, {}
+        if not recorded:
+            return 0
+
+        with self._connect() as connection, connection:
+            connection.executemany(
+                UPSERT_EXCHANGE,
+                [(key, status, content) for key, (status, content) in recorded.items()],
+            )
+        return len(recorded)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        Connection closed when leaving the context, use the connection itself as a
+        context to commit.
+        """
+        connection = sqlite3.connect(str(self.path))
+        try:
+            connection.executescript(CREATE_TABLES)
+            yield connection
+        finally:
+            connection.close()
+
+
+class CassetteStream:
+    """
+    Exchanges of an event based conversation, where the messages received after an
+    event was emitted, up to the next one, are recorded as its response.
+    """
+
+    def __init__(self, cassette: Cassette, target: str, conversation_id: str):
+        self.cassette = cassette
+        self.target = target
+        self.conversation_id = conversation_id
+        self._key: Optional[bytes] = None
+        self._messages: List[Any] = []
+
+    def emitted(self, event: str, data: Any = None) -> List[Any]:
+        """
+        Messages replayed in response to the event, none when recording.
+        """
+        self._record_messages()
+        self._key = self.cassette.next_key(
+            self.target,
+            self.conversation_id,
+            json_codec.dumpb({EVENT_KEY: event, DATA_KEY: data}),
+        )
+        if not self.cassette.replaying:
+            return []
+
+        exchange = self.cassette.replay(self._key, self.conversation_id)
+        return [] if exchange is None else json_codec.loads(exchange[1])
+
+    def received(self, message: Any) -> None:
+        if self.cassette.recording:
+            self._messages.append(message)
+
+    def close(self) -> None:
+        self._record_messages()
+        self.cassette.end_conversation(self.target, self.conversation_id)
+
+    def _record_messages(self) -> None:
+        if self.cassette.recording and self._key is not None:
+            self.cassette.record(
+                self._key,
+                None,
+                json_codec.dumpb(self._messages),
+                self.conversation_id,
+            )
+        self._messages = []
+
+
+def _digest(previous_key: bytes, target: str, request: bytes) -> bytes:
+    digest = blake2b(previous_key, digest_size=KEY_DIGEST_SIZE)
+    digest.update(target.encode())
+    digest.update(TARGET_SEPARATOR)
+    digest.update(request)
+    return digest.digest()
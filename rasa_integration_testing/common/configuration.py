@@ -1,9 +1,14 @@
 import os
 import re
 from configparser import ConfigParser
-from inspect import signature
+from contextlib import contextmanager
+from enum import Enum
+from inspect import Parameter, Signature, signature
 from pathlib import Path
-from typing import Any, Callable, Dict, Type, TypeVar, Union
+from threading import RLock, local
+from typing import Any, Callable, Dict, Iterator, List, Type, TypeVar, Union
+
+from .utils import lazy_property
 
 CONFIGURE_OPTIONS_PATTERN = r"\s*(\w+)\.(\w+)\s*"
 SECTION_CAPTURE = 1
@@ -11,6 +16,26 @@ OPTION_CAPTURE = 2
 T = TypeVar("T")
 
 
+class Scope(Enum):
+    """
+    Lifetime of autowired objects.
+    """
+
+    SINGLETON = "singleton"
+    PROCESS = "process"
+    THREAD = "thread"
+    SCENARIO = "scenario"
+
+
+# Objects cannot depend on objects of a scope with a greater lifetime rank.
+SCOPE_LIFETIME_RANKS = {
+    Scope.SINGLETON: 0,
+    Scope.PROCESS: 0,
+    Scope.THREAD: 1,
+    Scope.SCENARIO: 2,
+}
+
+
 class Configuration(ConfigParser):
     def __init__(self, configuration_path: Path):
         super().__init__(os.environ)
@@ -19,8 +44,15 @@ class Configuration(ConfigParser):
 
 
 class Configured:
-    def __init__(self, constructor: Callable, *parameters, **key_parameters):
+    def __init__(
+        self,
+        constructor: Callable,
+        *parameters,
+        scope: Scope = Scope.SINGLETON,
+        **key_parameters,
+    ):
         self._constructor = constructor
+        self._scope = scope
         self._parameters = parameters
         self._key_parameters = key_parameters
         self.__name__ = constructor.__name__
@@ -42,6 +74,14 @@ class Configured:
     def constructor(self) -> Callable:
         return self._constructor
 
+    @property
+    def scope(self) -> Scope:
+        return self._scope
+
+    @lazy_property
+    def signature(self) -> Signature:
+        return signature(self._constructor)
+
     @property
     def parameters(self) -> tuple:
         return self._parameters
@@ -51,26 +91,35 @@ class Configured:
         return self._key_parameters
 
 
-def configure(*parameters, **key_parameters) -> Callable:
+def configure(
+    *parameters, scope: Scope = Scope.SINGLETON, **key_parameters
+) -> Callable:
     """
     Decorator for classes to map objects to configuration, default values or other
-    configured objects.
+    configured objects. The scope tells for how long an autowired object is reused.
     """
 
     def decorate(constructor: Callable) -> Configured:
-        return Configured(constructor, *parameters, **key_parameters)
+        return Configured(constructor, *parameters, scope=scope, **key_parameters)
 
     return decorate
 
 
 class DependencyInjector:
     """
-    Keeps track of singleton configuration objects.
+    Keeps track of configuration objects for the lifetime of their scope.
+
+    Looking up an already built object doesn't lock, building one does so that
+    singleton and process objects are only built once.
     """
 
     def __init__(self, configuration: ConfigParser, variables: Dict[Any, Any] = {}):
         self._configuration = configuration
+        self._registered_objects: Dict[Configured, Any] = {}
         self._wired_objects: Dict[Configured, Any] = {}
+        self._process_objects: Dict[int, Dict[Configured, Any]] = {}
+        self._thread_objects = local()
+        self._lock = RLock()
         self.variables = variables
         self.variables.update(os.environ)
 
@@ -78,13 +127,96 @@ class DependencyInjector:
         """
         Pass configured object constructor, returns instance of object.
         """
-        if isinstance(configured, Configured):
-            if configured not in self._wired_objects:
-                self._wired_objects[configured] = self._map_constructor(configured)
-            return self._wired_objects[configured]
-        raise Exception(
-            f"Tried to autowire non-configured object {configured.__name__}"
-        )
+        if not isinstance(configured, Configured):
+            raise Exception(
+                f"Tried to autowire non-configured object {configured.__name__}"
+            )
+
+        if configured in self._registered_objects:
+            return self._registered_objects[configured]
+
+        wired_objects = self._scoped_objects(configured.scope)
+        if configured in wired_objects:
+            return wired_objects[configured]
+
+        if configured.scope in (Scope.SINGLETON, Scope.PROCESS):
+            with self._lock:
+                if configured not in wired_objects:
+                    wired_objects[configured] = self._map_constructor(configured)
+        else:
+            wired_objects[configured] = self._map_constructor(configured)
+        return wired_objects[configured]
+
+    def register(self, configured: Callable, instance: Any) -> None:
+        """
+        Use an already built instance for a configured object instead of autowiring it.
+        """
+        if not isinstance(configured, Configured):
+            raise Exception(
+                f"Tried to register non-configured object {configured.__name__}"
+            )
+        self._registered_objects[configured] = instance
+
+    def close(self) -> None:
+        """
+        Close the singleton and process objects built so far which can be closed, in
+        the reverse order of their creation. Registered objects are left to their
+        owner.
+        """
+        with self._lock:
+            wired_objects = [
+                *self._wired_objects.values(),
+                *(
+                    wired_object
+                    for process_objects in self._process_objects.values()
+                    for wired_object in process_objects.values()
+                ),
+            ]
+        for wired_object in reversed(wired_objects):
+            close = getattr(wired_object, "close", None)
+            if callable(close):
+                close()
+
+    @contextmanager
+    def scenario_scope(self) -> Iterator[None]:
+        """
+        Objects with the scenario scope autowired within this context are reused
+        until it exits. Scenario scopes belong to the current thread.
+        """
+        scenario_stack = self._scenario_stack()
+        scenario_stack.append({})
+        try:
+            yield
+        finally:
+            scenario_stack.pop()
+
+    def _scoped_objects(self, scope: Scope) -> Dict[Configured, Any]:
+        if scope is Scope.SINGLETON:
+            return self._wired_objects
+
+        if scope is Scope.PROCESS:
+            process_objects = self._process_objects.get(os.getpid())
+            if process_objects is None:
+                with self._lock:
+                    process_objects = self._process_objects.setdefault(os.getpid(), {})
+            return process_objects
+
+        if scope is Scope.THREAD:
+            thread_objects = getattr(self._thread_objects, "wired_objects", None)
+            if thread_objects is None:
+                thread_objects = self._thread_objects.wired_objects = {}
+            return thread_objects
+
+        scenario_stack = self._scenario_stack()
+        if not scenario_stack:
+            raise Exception("Tried to autowire a scenario object outside a scenario")
+        return scenario_stack[-1]
+
+    def _scenario_stack(self) -> List[Dict[Configured, Any]]:
+        scenario_stack = getattr(self._thread_objects, "scenario_stack", None)
+        if scenario_stack is None:
+            scenario_stack = self._thread_objects.scenario_stack = []
+        return scenario_stack
 
     def _map_constructor(self, configured: Configured) -> T:
         return configured.constructor(
@@ -93,23 +225,20 @@ class DependencyInjector:
         )
 
     def _resolve_parameters(self, configured: Configured):
-        constructor = configured.constructor
-        constructor_signature = signature(constructor)
+        constructor_signature = configured.signature
         indexable_parameters = list(constructor_signature.parameters.values())
         if len(configured.parameters) > len(indexable_parameters):
             raise Exception(
                 f"{configured.__name__} configure decorator has too many arguments"
             )
         return [
-            self._resolve_argument(
-                constructor, arg, indexable_parameters[index].annotation
-            )
+            self._resolve_argument(configured, arg, indexable_parameters[index])
             for index, arg in enumerate(configured.parameters)
         ]
 
     def _resolve_keyword_parameters(self, configured: Configured):
         constructor = configured.constructor
-        constructor_signature = signature(constructor)
+        constructor_signature = configured.signature
         for key, arg in configured.key_parameters.items():
             if key not in constructor_signature.parameters:
                 raise Exception(
@@ -119,27 +248,44 @@ class DependencyInjector:
 
         return {
             key: self._resolve_argument(
-                constructor, arg, constructor_signature.parameters[key].annotation
+                configured, arg, constructor_signature.parameters[key]
             )
             for key, arg in configured.key_parameters.items()
         }
 
     def _resolve_argument(
-        self, constructor: Callable, argument: Any, annotation: Type
+        self, configured: Configured, argument: Any, parameter: Parameter
     ) -> Any:
         if isinstance(argument, str):
-            return self._get_option(constructor, argument, annotation)
+            return self._get_option(configured.constructor, argument, parameter)
         if isinstance(argument, Configured):
+            if (
+                SCOPE_LIFETIME_RANKS[argument.scope]
+                > SCOPE_LIFETIME_RANKS[configured.scope]
+            ):
+                raise Exception(
+                    f"{configured.__name__} with {configured.scope.name} scope cannot "
+                    f"depend on {argument.__name__} with {argument.scope.name} scope"
+                )
             return self.autowire(argument)
         return argument
 
     def _get_option(
-        self, constructor: Callable, option: str, annotation: Type
+        self, constructor: Callable, option: str, parameter: Parameter
     ) -> Union[str, bool, float, int]:
+        """
+        Options missing from the configuration fall back to the default value of
+        their parameter, when it has one.
+        """
         capture = re.match(CONFIGURE_OPTIONS_PATTERN, option)
+        annotation: Type = parameter.annotation
 
         if capture:
             section_option = (capture[SECTION_CAPTURE], capture[OPTION_CAPTURE])
+            if parameter.default is not Parameter.empty and not (
+                self._configuration.has_option(*section_option)
+            ):
+                return parameter.default
             if annotation is int:
                 return self._configuration.getint(*section_option)
             if annotation is bool:
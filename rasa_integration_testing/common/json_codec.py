@@ -0,0 +1,127 @@
+"""
+JSON encoding and decoding of the hot paths: rendered turns, bot requests and
+responses, bundles and written interactions. The fastest installed backend among
+orjson and ujson is used, falling back to the standard library.
+
+Decoding errors are ValueError subclasses with every backend. Encoded text may hold
+non-ASCII characters, so encode it as UTF-8. Digests must not depend on the
+installed backend and keep using the standard library.
+"""
+
+import json
+from typing import Any, List, Union
+
+INDENT = 2
+# Builtin types of the scalar subclasses that fast backends reject, e.g. the
+# floats of YAML documents.
+SCALAR_TYPES = (float, int, str)
+
+
+class StandardJsonCodec:
+    name = "json"
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, value: Any, sort_keys: bool = False, indent: bool = False) -> str:
+        return json.dumps(
+            value,
+            sort_keys=sort_keys,
+            indent=INDENT if indent else None,
+            ensure_ascii=False,
+        )
+
+    def dumpb(self, value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False).encode()
+
+
+class OrjsonCodec:
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+        self._default_option = orjson.OPT_NON_STR_KEYS
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._orjson.loads(data)
+
+    def dumps(self, value: Any, sort_keys: bool = False, indent: bool = False) -> str:
+        option = self._default_option
+        if sort_keys:
+            option |= self._orjson.OPT_SORT_KEYS
+        if indent:
+            option |= self._orjson.OPT_INDENT_2
+        return self._orjson.dumps(
+            value, default=_builtin_scalar, option=option
+        ).decode()
+
+    def dumpb(self, value: Any) -> bytes:
+        return self._orjson.dumps(
+            value, default=_builtin_scalar, option=self._default_option
+        )
+
+
+class UjsonCodec:
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+
+        self._ujson = ujson
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return self._ujson.loads(data)
+
+    def dumps(self, value: Any, sort_keys: bool = False, indent: bool = False) -> str:
+        return self._ujson.dumps(
+            value,
+            sort_keys=sort_keys,
+            indent=INDENT if indent else 0,
+            ensure_ascii=False,
+            escape_forward_slashes=False,
+        )
+
+    def dumpb(self, value: Any) -> bytes:
+        return self.dumps(value).encode()
+
+
+JsonCodec = Union[StandardJsonCodec, OrjsonCodec, UjsonCodec]
+FAST_CODECS = (OrjsonCodec, UjsonCodec)
+
+
+def available_codecs() -> List[JsonCodec]:
+    """
+    Installed codecs, fastest first.
+    """
+    codecs: List[JsonCodec] = []
+    for codec_type in FAST_CODECS:
+        try:
+            codecs.append(codec_type())
+        except ImportError:
+            pass
+    codecs.append(StandardJsonCodec())
+    return codecs
+
+
+def _builtin_scalar(value: Any) -> Any:
+    for scalar_type in SCALAR_TYPES:
+        if isinstance(value, scalar_type):
+            return scalar_type(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _fastest_codec() -> JsonCodec:
+    for codec_type in FAST_CODECS:
+        try:
+            return codec_type()
+        except ImportError:
+            pass
+    return StandardJsonCodec()
+
+
+codec: JsonCodec = _fastest_codec()
+loads = codec.loads
+dumps = codec.dumps
+dumpb = codec.dumpb
@@ -1,8 +1,11 @@
+from collections import deque
+from concurrent.futures import Executor, Future
 from os import getpid
 from socket import gethostname
-from typing import Any, Callable, TypeVar
+from typing import Any, Callable, Deque, Iterable, Iterator, TypeVar
 
 T = TypeVar("T")
+R = TypeVar("R")
 TRACKER_ID_SIGNATURE = "ITEST"
 
 
@@ -30,3 +33,24 @@ def lazy_property(function: Callable) -> Any:
         return getattr(self, attr_name)
 
     return _lazyprop
+
+
+def bounded_map(
+    executor: Executor,
+    function: Callable[[T], R],
+    iterable: Iterable[T],
+    max_pending: int,
+) -> Iterator[R]:
+    """Like Executor.map, but only consumes the iterable as results are consumed.
+
+    At most max_pending calls are submitted ahead of the results already yielded,
+    so that streams too large for memory can be mapped."""
+
+    pending: Deque[Future] = deque()
+    for item in iterable:
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+        pending.append(executor.submit(function, item))
+
+    while pending:
+        yield pending.popleft().result()
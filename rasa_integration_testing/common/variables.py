@@ -0,0 +1,42 @@
+from collections.abc import Mapping
+from typing import Any, Iterator
+from typing import Mapping as TypeMapping
+
+
+class VariableContext(Mapping):
+    """
+    Immutable template variables made of layers, looked up from the first layer to
+    the last one. Adding a layer references the existing ones instead of copying them.
+    """
+
+    def __init__(self, *layers: TypeMapping[str, Any]):
+        self._layers = layers
+
+    def with_defaults(self, variables: TypeMapping[str, Any]) -> "VariableContext":
+        """
+        Variables only used when the existing layers don't define them.
+        """
+        if not variables:
+            return self
+        return self.__class__(*self._layers, variables)
+
+    def __getitem__(self, key: str) -> Any:
+        for layer in self._layers:
+            if key in layer:
+                return layer[key]
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return any(key in layer for layer in self._layers)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(set().union(*self._layers))
+
+    def __len__(self) -> int:
+        return len(set().union(*self._layers))
+
+    def __repr__(self) -> str:
+        return f"<VariableContext: layers={self._layers}>"
+
+
+EMPTY_VARIABLES = VariableContext()
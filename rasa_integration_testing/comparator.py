@@ -1,12 +1,29 @@
-from typing import Any, Dict, List, Union
+import json
+from itertools import chain
+from typing import Any, Callable, Dict, List, Tuple, Union
 
 from .common.configuration import configure
 from .common.identifier import Identifier
 from .common.utils import lazy_property
+from .matcher import (
+    IGNORE_RULE,
+    NO_RULES,
+    SUBSET_RULE,
+    UNORDERED_RULE,
+    MatcherRules,
+    MatcherState,
+)
 
 IGNORED_KEYS_SEPARATOR = ","
+MAX_ALIGNED_DIFFERENCES = 1000
 INDEX_KEY_PREFIX = "_"
 
+# Path, matcher state, value and canonical content of a list entry.
+ListEntry = Tuple["JsonPath", MatcherState, Any, str]
+
+MISSING_ENTRIES_KEY = "missing_entries"
+EXTRA_ENTRIES_KEY = "extra_entries"
+
 
 class JsonPath(Identifier):
     @lazy_property
@@ -32,6 +49,22 @@ class JsonDiff:
     def identical(self) -> bool:
         return len(self.missing_entries) == 0 and len(self.extra_entries) == 0
 
+    def to_dict(self) -> dict:
+        """
+        JSON serializable form, paths are kept as lists of elements.
+        """
+        return {
+            MISSING_ENTRIES_KEY: _serialize_entries(self.missing_entries),
+            EXTRA_ENTRIES_KEY: _serialize_entries(self.extra_entries),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "JsonDiff":
+        return cls(
+            _deserialize_entries(data[MISSING_ENTRIES_KEY]),
+            _deserialize_entries(data[EXTRA_ENTRIES_KEY]),
+        )
+
     def __repr__(self) -> str:
         return (
             f"<JsonDiff, Missing Entries: {self.missing_entries}, "
@@ -53,33 +86,350 @@ class JsonDataComparator:
         variables={},
     ) -> Dict[JsonPath, Any]:
         resolved_json_data: Dict[JsonPath, Any] = {}
+        self._flatten(
+            node, json_path, NO_RULES, NO_RULES.initial_state, resolved_json_data
+        )
+        return resolved_json_data
+
+    def compare(
+        self,
+        expected_json_data: Union[dict, list],
+        actual_json_data: Union[dict, list],
+        rules: MatcherRules = NO_RULES,
+    ) -> JsonDiff:
+        """
+        Walk both outputs at once, applying the matcher rules of the expected output
+        to the paths they match along the way.
+        """
+        missing_entries: Dict[JsonPath, Any] = {}
+        extra_entries: Dict[JsonPath, Any] = {}
+        self._compare(
+            expected_json_data,
+            actual_json_data,
+            JsonPath(),
+            rules,
+            rules.initial_state,
+            missing_entries,
+            extra_entries,
+        )
+        return JsonDiff(missing_entries, extra_entries)
+
+    def _compare(
+        self,
+        expected: Any,
+        actual: Any,
+        json_path: JsonPath,
+        rules: MatcherRules,
+        state: MatcherState,
+        missing_entries: Dict[JsonPath, Any],
+        extra_entries: Dict[JsonPath, Any],
+    ) -> None:
+        if self._check_if_ignored(json_path):
+            return
+
+        rule = rules.rule(state)
+        if rule is not None:
+            if rule.kind == IGNORE_RULE:
+                return
+            if rule.matches_subtree:
+                if not rule.matches(expected, actual):
+                    self._flatten(expected, json_path, rules, state, missing_entries)
+                    self._flatten(actual, json_path, rules, state, extra_entries)
+                return
+        subset = rule is not None and rule.kind == SUBSET_RULE
+
+        if isinstance(expected, dict) and isinstance(actual, dict):
+            for key, value in expected.items():
+                entry_path = JsonPath(*json_path, key)
+                entry_state = rules.advance(state, key)
+                if key in actual:
+                    self._compare(
+                        value,
+                        actual[key],
+                        entry_path,
+                        rules,
+                        entry_state,
+                        missing_entries,
+                        extra_entries,
+                    )
+                else:
+                    self._flatten(
+                        value, entry_path, rules, entry_state, missing_entries
+                    )
+            if not subset:
+                for key, value in actual.items():
+                    if key not in expected:
+                        self._flatten(
+                            value,
+                            JsonPath(*json_path, key),
+                            rules,
+                            rules.advance(state, key),
+                            extra_entries,
+                        )
+        elif (
+            isinstance(expected, list)
+            and isinstance(actual, list)
+            and rule is not None
+            and rule.kind == UNORDERED_RULE
+        ):
+            self._compare_unordered(
+                expected,
+                actual,
+                json_path,
+                rules,
+                state,
+                missing_entries,
+                extra_entries,
+            )
+        elif isinstance(expected, list) and isinstance(actual, list):
+            self._compare_aligned(
+                expected,
+                actual,
+                json_path,
+                rules,
+                state,
+                subset,
+                missing_entries,
+                extra_entries,
+            )
+        elif isinstance(expected, (dict, list)) or isinstance(actual, (dict, list)):
+            # Different structures are compared by their flattened entries, which may
+            # still share paths.
+            expected_entries: Dict[JsonPath, Any] = {}
+            actual_entries: Dict[JsonPath, Any] = {}
+            self._flatten(expected, json_path, rules, state, expected_entries)
+            self._flatten(actual, json_path, rules, state, actual_entries)
+            missing_entries.update(_get_diff(expected_entries, actual_entries))
+            extra_entries.update(_get_diff(actual_entries, expected_entries))
+        elif expected != actual:
+            missing_entries[json_path] = expected
+            extra_entries[json_path] = actual
+
+    def _compare_unordered(
+        self,
+        expected: list,
+        actual: list,
+        json_path: JsonPath,
+        rules: MatcherRules,
+        state: MatcherState,
+        missing_entries: Dict[JsonPath, Any],
+        extra_entries: Dict[JsonPath, Any],
+    ) -> None:
+        """
+        Entries are paired by their canonical content in linear time, regardless of
+        their positions. Only when matcher rules apply within the entries are the
+        ones left over paired with the first entry the rules accept. Entries still
+        left over are missing or extra as a whole, at their own positions.
+        """
+        expected_entries = self._list_entries(expected, json_path, rules, state)
+        actual_entries = self._list_entries(actual, json_path, rules, state)
+
+        # Positions are kept in reverse order to pair the first ones by popping.
+        candidates: Dict[str, List[int]] = {}
+        for position in reversed(range(len(actual_entries))):
+            candidates.setdefault(actual_entries[position][3], []).append(position)
+
+        paired_positions = set()
+        unpaired_expected: List[ListEntry] = []
+        for entry in expected_entries:
+            positions = candidates.get(entry[3])
+            if positions:
+                paired_positions.add(positions.pop())
+            else:
+                unpaired_expected.append(entry)
+        unpaired_actual = [
+            entry
+            for position, entry in enumerate(actual_entries)
+            if position not in paired_positions
+        ]
+
+        if any(entry[1] for entry in unpaired_expected):
+            unpaired_expected = [
+                entry
+                for entry in unpaired_expected
+                if not self._pop_accepted_entry(entry, unpaired_actual, rules)
+            ]
+
+        for entry_path, entry_state, value, _ in unpaired_expected:
+            self._flatten(value, entry_path, rules, entry_state, missing_entries)
+        for entry_path, entry_state, value, _ in unpaired_actual:
+            self._flatten(value, entry_path, rules, entry_state, extra_entries)
+
+    def _list_entries(
+        self,
+        node: list,
+        json_path: JsonPath,
+        rules: MatcherRules,
+        state: MatcherState,
+    ) -> List[ListEntry]:
+        list_entries: List[ListEntry] = []
+        for index, value in enumerate(node, 1):
+            element = f"{INDEX_KEY_PREFIX}{index}"
+            entry_path = JsonPath(*json_path, element)
+            entry_state = rules.advance(state, element)
+            entries: Dict[JsonPath, Any] = {}
+            self._flatten(value, entry_path, rules, entry_state, entries)
+            canonical_content = json.dumps(
+                sorted(
+                    (path.elements[len(entry_path) :], leaf)
+                    for path, leaf in entries.items()
+                )
+            )
+            list_entries.append((entry_path, entry_state, value, canonical_content))
+        return list_entries
+
+    def _compare_aligned(
+        self,
+        expected: list,
+        actual: list,
+        json_path: JsonPath,
+        rules: MatcherRules,
+        state: MatcherState,
+        subset: bool,
+        missing_entries: Dict[JsonPath, Any],
+        extra_entries: Dict[JsonPath, Any],
+    ) -> None:
+        """
+        Entries are aligned on the longest sequence of equal entries, so that an
+        inserted or removed entry doesn't shift all the entries following it. The
+        entries replaced between aligned ones are compared in order, those left over
+        are missing or extra as a whole.
+        """
+        expected_entries = self._list_entries(expected, json_path, rules, state)
+        actual_entries = self._list_entries(actual, json_path, rules, state)
+
+        def equal(expected_position: int, actual_position: int) -> bool:
+            expected_entry = expected_entries[expected_position]
+            actual_entry = actual_entries[actual_position]
+            return expected_entry[3] == actual_entry[3] or (
+                bool(expected_entry[1])
+                and self._accepts(expected_entry, actual_entry[2], rules)
+            )
+
+        expected_start = actual_start = 0
+        aligned_positions = _align(len(expected_entries), len(actual_entries), equal)
+        for expected_end, actual_end in chain(
+            aligned_positions, [(len(expected_entries), len(actual_entries))]
+        ):
+            replaced_expected = expected_entries[expected_start:expected_end]
+            replaced_actual = actual_entries[actual_start:actual_end]
+            for expected_entry, actual_entry in zip(replaced_expected, replaced_actual):
+                self._compare_entries(
+                    expected_entry, actual_entry, rules, missing_entries, extra_entries
+                )
+            for entry_path, entry_state, value, _ in replaced_expected[
+                len(replaced_actual) :
+            ]:
+                self._flatten(value, entry_path, rules, entry_state, missing_entries)
+            if not subset:
+                for entry_path, entry_state, value, _ in replaced_actual[
+                    len(replaced_expected) :
+                ]:
+                    self._flatten(value, entry_path, rules, entry_state, extra_entries)
+            expected_start, actual_start = expected_end + 1, actual_end + 1
+
+    def _compare_entries(
+        self,
+        expected_entry: ListEntry,
+        actual_entry: ListEntry,
+        rules: MatcherRules,
+        missing_entries: Dict[JsonPath, Any],
+        extra_entries: Dict[JsonPath, Any],
+    ) -> None:
+        """
+        Extra entries are reported under the position of the actual entry.
+        """
+        entry_path, entry_state, expected_value, _ = expected_entry
+        actual_path, _, actual_value, _ = actual_entry
+        if actual_path == entry_path:
+            self._compare(
+                expected_value,
+                actual_value,
+                entry_path,
+                rules,
+                entry_state,
+                missing_entries,
+                extra_entries,
+            )
+            return
+
+        entry_extra_entries: Dict[JsonPath, Any] = {}
+        self._compare(
+            expected_value,
+            actual_value,
+            entry_path,
+            rules,
+            entry_state,
+            missing_entries,
+            entry_extra_entries,
+        )
+        for path, value in entry_extra_entries.items():
+            extra_entries[actual_path + path[len(actual_path) :]] = value
+
+    def _pop_accepted_entry(
+        self,
+        expected_entry: ListEntry,
+        actual_entries: List[ListEntry],
+        rules: MatcherRules,
+    ) -> bool:
+        for position, (_, _, actual_value, _) in enumerate(actual_entries):
+            if self._accepts(expected_entry, actual_value, rules):
+                del actual_entries[position]
+                return True
+        return False
+
+    def _accepts(
+        self, expected_entry: ListEntry, actual_value: Any, rules: MatcherRules
+    ) -> bool:
+        entry_path, entry_state, expected_value, _ = expected_entry
+        missing_entries: Dict[JsonPath, Any] = {}
+        extra_entries: Dict[JsonPath, Any] = {}
+        self._compare(
+            expected_value,
+            actual_value,
+            entry_path,
+            rules,
+            entry_state,
+            missing_entries,
+            extra_entries,
+        )
+        return not missing_entries and not extra_entries
 
+    def _flatten(
+        self,
+        node: Any,
+        json_path: JsonPath,
+        rules: MatcherRules,
+        state: MatcherState,
+        entries: Dict[JsonPath, Any],
+    ) -> None:
         if self._check_if_ignored(json_path):
-            return resolved_json_data
+            return
+        rule = rules.rule(state)
+        if rule is not None and rule.kind == IGNORE_RULE:
+            return
 
         if isinstance(node, dict):
             for key, value in node.items():
-                resolved_json_data.update(
-                    self.flatten_json(value, JsonPath(*json_path, key))
+                self._flatten(
+                    value,
+                    JsonPath(*json_path, key),
+                    rules,
+                    rules.advance(state, key),
+                    entries,
                 )
         elif isinstance(node, list):
             for index, entry in enumerate(node, 1):
-                entry_id = JsonPath(*json_path, f"{INDEX_KEY_PREFIX}{index}")
-                resolved_json_data.update(self.flatten_json(entry, entry_id))
+                element = f"{INDEX_KEY_PREFIX}{index}"
+                self._flatten(
+                    entry,
+                    JsonPath(*json_path, element),
+                    rules,
+                    rules.advance(state, element),
+                    entries,
+                )
         else:
-            resolved_json_data[json_path] = node
-
-        return resolved_json_data
-
-    def compare(
-        self, expected_json_data: Union[dict, list], actual_json_data: Union[dict, list]
-    ) -> JsonDiff:
-        expected: Dict[JsonPath, Any] = self.flatten_json(expected_json_data)
-        actual: Dict[JsonPath, Any] = self.flatten_json(actual_json_data)
-
-        missing_entries: Dict[JsonPath, Any] = _get_diff(expected, actual)
-        extra_entries: Dict[JsonPath, Any] = _get_diff(actual, expected)
-        return JsonDiff(missing_entries, extra_entries)
+            entries[json_path] = node
 
     def _check_if_ignored(self, json_path: JsonPath) -> bool:
         for ignored_key in self._ignored_result_keys:
@@ -99,3 +449,90 @@ def _get_diff(expected_dict: dict, actual_dict: dict) -> dict:
             diff[key] = value
 
     return diff
+
+
+def _align(
+    expected_length: int, actual_length: int, equal: Callable[[int, int], bool]
+) -> List[Tuple[int, int]]:
+    """
+    Positions of the entries paired by a longest common subsequence, found with the
+    greedy algorithm of Myers in O((N + M) D) time for D inserted or removed entries.
+    Lists differing by more entries than the maximum aren't aligned, their entries
+    are all paired in order.
+    """
+    offset = expected_length + actual_length + 1
+    # Furthest expected position reached on each diagonal, the expected position
+    # minus the actual one, before each step.
+    furthest = [0] * (2 * offset + 1)
+    steps: List[List[int]] = []
+    for differences in range(min(offset, MAX_ALIGNED_DIFFERENCES + 1)):
+        # Only the diagonals the step can come from are kept.
+        steps.append(furthest[offset - differences - 1 : offset + differences + 2])
+        for diagonal in range(-differences, differences + 1, 2):
+            if diagonal == -differences or (
+                diagonal != differences
+                and furthest[offset + diagonal - 1] < furthest[offset + diagonal + 1]
+            ):
+                expected_position = furthest[offset + diagonal + 1]
+            else:
+                expected_position = furthest[offset + diagonal - 1] + 1
+            actual_position = expected_position - diagonal
+            while (
+                expected_position < expected_length
+                and actual_position < actual_length
+                and equal(expected_position, actual_position)
+            ):
+                expected_position += 1
+                actual_position += 1
+            furthest[offset + diagonal] = expected_position
+            if (
+                expected_position >= expected_length
+                and actual_position >= actual_length
+            ):
+                return _aligned_positions(steps, expected_length, actual_length)
+    return []
+
+
+def _aligned_positions(
+    steps: List[List[int]], expected_position: int, actual_position: int
+) -> List[Tuple[int, int]]:
+    """
+    Walks the steps of the alignment back from the end, collecting the positions
+    of the equal entries along the way.
+    """
+    positions: List[Tuple[int, int]] = []
+    for differences in reversed(range(len(steps))):
+        furthest = steps[differences]
+        offset = differences + 1
+        diagonal = expected_position - actual_position
+        if differences == 0:
+            snake_expected_position = 0
+        else:
+            if diagonal == -differences or (
+                diagonal != differences
+                and furthest[offset + diagonal - 1] < furthest[offset + diagonal + 1]
+            ):
+                previous_diagonal = diagonal + 1
+                snake_expected_position = furthest[offset + previous_diagonal]
+            else:
+                previous_diagonal = diagonal - 1
+                snake_expected_position = furthest[offset + previous_diagonal] + 1
+
+        while expected_position > snake_expected_position:
+            expected_position -= 1
+            actual_position -= 1
+            positions.append((expected_position, actual_position))
+
+        if differences > 0:
+            expected_position = furthest[offset + previous_diagonal]
+            actual_position = expected_position - previous_diagonal
+    positions.reverse()
+    return positions
+
+
+def _serialize_entries(entries: Dict[JsonPath, Any]) -> List[list]:
+    return [[list(path.elements), value] for path, value in entries.items()]
+
+
+def _deserialize_entries(entries: List[list]) -> Dict[JsonPath, Any]:
+    return {JsonPath(*elements): value for elements, value in entries}
@@ -0,0 +1,173 @@
+import logging
+from concurrent.futures import Executor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from threading import Lock
+from time import perf_counter
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .common import json_codec
+from .common.utils import bounded_map
+from .runner import FailedInteraction
+from .scenario import SCENARIOS_GLOB, Scenario
+from .watch import SuiteWatcher
+
+logger = logging.getLogger(__name__)
+
+RUN_PATH = "/run"
+STATUS_OK = 200
+STATUS_BAD_REQUEST = 400
+STATUS_NOT_FOUND = 404
+
+CONTENT_LENGTH_HEADER = "Content-Length"
+CONTENT_TYPE_HEADER = "Content-Type"
+JSON_LINES_CONTENT_TYPE = "application/x-ndjson"
+
+GLOB_KEY = "glob"
+SCENARIOS_KEY = "scenarios"
+SCENARIO_KEY = "scenario"
+STATUS_KEY = "status"
+DURATION_KEY = "duration"
+FAILED_INTERACTION_KEY = "failed_interaction"
+ERROR_KEY = "error"
+SUMMARY_KEY = "summary"
+PASSED_KEY = "passed"
+FAILED_KEY = "failed"
+ERRORS_KEY = "errors"
+
+STATUS_PASSED = "passed"
+STATUS_FAILED = "failed"
+STATUS_ERROR = "error"
+
+ScenarioRunFunction = Callable[[Scenario], Optional[FailedInteraction]]
+
+
+class RunDaemon:
+    """
+    Keeps a test folder loaded and its runners connected between runs. Each run
+    first picks up the files changed since the previous one, so that only the bot
+    round trips are paid for.
+    """
+
+    def __init__(
+        self,
+        watcher: SuiteWatcher,
+        run_scenario: ScenarioRunFunction,
+        executor: Executor,
+        max_pending: int,
+    ):
+        self._watcher = watcher
+        self._run_scenario = run_scenario
+        self._executor = executor
+        self._max_pending = max_pending
+        self._watcher_lock = Lock()
+
+    def select(
+        self, scenarios_glob: Optional[str], scenario_names: Optional[List[str]]
+    ) -> List[Scenario]:
+        with self._watcher_lock:
+            self._watcher.poll()
+            scenarios = self._watcher.select(scenarios_glob or SCENARIOS_GLOB)
+        if scenario_names is not None:
+            names = set(scenario_names)
+            scenarios = [scenario for scenario in scenarios if scenario.name in names]
+        return scenarios
+
+    def run(self, scenarios: List[Scenario]) -> Iterator[dict]:
+        """
+        Stream the result of each scenario, in the requested order, followed by a
+        summary.
+        """
+        counts = {PASSED_KEY: 0, FAILED_KEY: 0, ERRORS_KEY: 0}
+        for result in bounded_map(
+            self._executor, self._timed_run, scenarios, self._max_pending
+        ):
+            counts[
+                {
+                    STATUS_PASSED: PASSED_KEY,
+                    STATUS_FAILED: FAILED_KEY,
+                    STATUS_ERROR: ERRORS_KEY,
+                }[result[STATUS_KEY]]
+            ] += 1
+            yield result
+        yield {SUMMARY_KEY: {SCENARIOS_KEY: len(scenarios), **counts}}
+
+    def _timed_run(self, scenario: Scenario) -> dict:
+        result: dict = {SCENARIO_KEY: scenario.name}
+        start = perf_counter()
+        try:
+            failed_interaction = self._run_scenario(scenario)
+        except Exception as error:
+            logger.exception(f"Scenario '{scenario.name}' could not be run")
+            result[STATUS_KEY] = STATUS_ERROR
+            result[ERROR_KEY] = f"{error.__class__.__name__}: {error}"
+        else:
+            if failed_interaction is None:
+                result[STATUS_KEY] = STATUS_PASSED
+            else:
+                result[STATUS_KEY] = STATUS_FAILED
+                result[FAILED_INTERACTION_KEY] = failed_interaction.to_dict()
+        result[DURATION_KEY] = perf_counter() - start
+        return result
+
+
+class DaemonServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, server_address: Tuple[str, int], daemon: RunDaemon):
+        super().__init__(server_address, DaemonRequestHandler)
+        self.daemon = daemon
+
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    """
+    Runs requested with a JSON object holding a `glob` and/or a list of `scenarios`
+    names. Results are streamed as JSON lines until the connection closes.
+    """
+
+    server: DaemonServer
+
+    def do_POST(self) -> None:
+        if self.path != RUN_PATH:
+            self._respond_error(STATUS_NOT_FOUND, f"Unknown path {self.path}")
+            return
+
+        try:
+            request = json_codec.loads(
+                self.rfile.read(int(self.headers.get(CONTENT_LENGTH_HEADER, 0)))
+                or b"{}"
+            )
+            scenario_names = request.get(SCENARIOS_KEY)
+            scenarios_glob = request.get(GLOB_KEY)
+            if scenario_names is not None and not isinstance(scenario_names, list):
+                raise ValueError(f"'{SCENARIOS_KEY}' must be a list of names")
+            if scenarios_glob is not None and not isinstance(scenarios_glob, str):
+                raise ValueError(f"'{GLOB_KEY}' must be a string")
+        except (ValueError, AttributeError) as error:
+            self._respond_error(STATUS_BAD_REQUEST, f"Invalid run request: {error}")
+            return
+
+        try:
+            scenarios = self.server.daemon.select(scenarios_glob, scenario_names)
+        except (NotImplementedError, ValueError) as error:
+            # Raised by pathlib for absolute or malformed globs.
+            self._respond_error(STATUS_BAD_REQUEST, f"Invalid glob: {error}")
+            return
+
+        self.send_response(STATUS_OK)
+        self.send_header(CONTENT_TYPE_HEADER, JSON_LINES_CONTENT_TYPE)
+        self.end_headers()
+        for result in self.server.daemon.run(scenarios):
+            self.wfile.write(json_codec.dumpb(result) + b"\n")
+            self.wfile.flush()
+
+    def _respond_error(self, status: int, message: str) -> None:
+        data = json_codec.dumpb({ERROR_KEY: message})
+        self.send_response(status)
+        self.send_header(CONTENT_TYPE_HEADER, JSON_LINES_CONTENT_TYPE)
+        self.send_header(CONTENT_LENGTH_HEADER, str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format, *args)
@@ -0,0 +1,64 @@
+import hashlib
+import json
+from concurrent.futures import Future
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from .runner import FailedInteraction, ScenarioRunner
+from .scenario import Scenario
+
+DIGEST_SIZE = 16
+
+ScenarioResult = Optional[FailedInteraction]
+
+
+class ConversationDeduplicator:
+    """
+    Runs scenarios rendering to the same conversation only once. Scenarios sharing
+    the conversation of a scenario already started wait for its result instead of
+    having the same conversation with the bot.
+
+    Only the digest of each distinct conversation is kept along with its result.
+    """
+
+    def __init__(self):
+        self._runs: Dict[bytes, Tuple[str, Future]] = {}
+        self._lock = Lock()
+        self.saved_count = 0
+
+    def run(
+        self, runner: ScenarioRunner, scenario: Scenario
+    ) -> Tuple[Optional[str], ScenarioResult]:
+        """
+        Returns the name of the scenario whose result is shared, if any, along with
+        the result.
+        """
+        digest = conversation_digest(runner, scenario)
+        with self._lock:
+            shared_run = self._runs.get(digest)
+            if shared_run is None:
+                future: Future = Future()
+                self._runs[digest] = (scenario.name, future)
+            else:
+                self.saved_count += 1
+
+        if shared_run is not None:
+            shared_scenario_name, shared_future = shared_run
+            return shared_scenario_name, shared_future.result()
+
+        try:
+            result = runner.run(scenario)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        future.set_result(result)
+        return None, result
+
+
+def conversation_digest(runner: ScenarioRunner, scenario: Scenario) -> bytes:
+    canonical_conversation = json.dumps(
+        runner.render_conversation(scenario), sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.blake2b(
+        canonical_conversation.encode(), digest_size=DIGEST_SIZE
+    ).digest()
@@ -0,0 +1,308 @@
+import logging
+from collections import deque
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from os import getpid
+from socket import gethostname
+from socketserver import ThreadingMixIn
+from threading import Event, Lock, Thread
+from time import monotonic, sleep
+from typing import Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from requests import RequestException, Session
+
+from .bundle import NAME_KEY, deserialize_scenario, serialize_scenario
+from .common import json_codec
+from .common.configuration import DependencyInjector
+from .runner import FailedInteraction, ScenarioRunner
+from .scenario import Scenario, ScenarioFragmentLoader
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_TIMEOUT = 300.0
+WORK_POLL_INTERVAL = 0.5
+
+LEASE_PATH = "/lease"
+RESULT_PATH = "/result"
+STATUS_WORK = 200
+STATUS_WAIT = 204
+STATUS_DONE = 410
+STATUS_NOT_FOUND = 404
+
+CONTENT_LENGTH_HEADER = "Content-Length"
+CONTENT_TYPE_HEADER = "Content-Type"
+JSON_CONTENT_TYPE = "application/json"
+
+WORKER_KEY = "worker"
+UNIT_KEY = "unit"
+SCENARIO_KEY = "scenario"
+FAILED_INTERACTION_KEY = "failed_interaction"
+ERROR_KEY = "error"
+
+
+class WorkResult:
+    def __init__(
+        self,
+        scenario_name: str,
+        worker: str,
+        failed_interaction: Optional[FailedInteraction] = None,
+        error: Optional[str] = None,
+    ):
+        self.scenario_name = scenario_name
+        self.worker = worker
+        self.failed_interaction = failed_interaction
+        self.error = error
+
+    @property
+    def successful(self) -> bool:
+        return self.failed_interaction is None and self.error is None
+
+    def __repr__(self) -> str:
+        return (
+            f"<WorkResult, scenario: {self.scenario_name}, worker: {self.worker}, "
+            f"failed interaction: {self.failed_interaction}, error: {self.error}>"
+        )
+
+
+class Lease:
+    def __init__(self, unit: int, scenario: dict, worker: str, deadline: float):
+        self.unit = unit
+        self.scenario = scenario
+        self.worker = worker
+        self.deadline = deadline
+
+
+class Coordinator:
+    """
+    Hands out the scenarios to run to workers pulling them one at a time, so that
+    faster workers take more of the load. A scenario whose worker didn't report back
+    before its lease expired is handed out again, the first result reported wins.
+
+    Scenarios are only read from the iterable as they are leased.
+    """
+
+    def __init__(
+        self,
+        scenarios: Iterable[Scenario],
+        scenario_fragment_loader: ScenarioFragmentLoader,
+        lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+        on_result: Optional[Callable[[WorkResult], None]] = None,
+    ):
+        self._scenarios: Iterator[Scenario] = iter(scenarios)
+        self._scenario_fragment_loader = scenario_fragment_loader
+        self._lease_timeout = lease_timeout
+        self._on_result = on_result
+        self._leases: Dict[int, Lease] = {}
+        self._expired_leases: Deque[Lease] = deque()
+        self._scenarios_exhausted = False
+        self._unit_count = 0
+        self._lock = Lock()
+        self._done = Event()
+        self.results: List[WorkResult] = []
+
+    def lease(self, worker: str) -> Tuple[int, Optional[Lease]]:
+        """
+        Returns the status telling the worker to run the leased scenario, to ask again
+        later, or that all scenarios were run.
+        """
+        with self._lock:
+            self._expire_leases()
+            if self._expired_leases:
+                expired_lease = self._expired_leases.popleft()
+                unit, scenario = expired_lease.unit, expired_lease.scenario
+            else:
+                next_scenario = None
+                if not self._scenarios_exhausted:
+                    next_scenario = next(self._scenarios, None)
+                    self._scenarios_exhausted = next_scenario is None
+                if next_scenario is None:
+                    self._check_done()
+                    return (STATUS_DONE if self._done.is_set() else STATUS_WAIT), None
+                unit, scenario = self._unit_count, self._serialize(next_scenario)
+                self._unit_count += 1
+
+            lease = Lease(unit, scenario, worker, monotonic() + self._lease_timeout)
+            self._leases[unit] = lease
+            return STATUS_WORK, lease
+
+    def complete(self, unit: int, result: WorkResult) -> bool:
+        """
+        Record the result of a leased scenario, returns whether the unit was known.
+        """
+        with self._lock:
+            lease = self._leases.pop(unit, None)
+            if lease is None:
+                expired_lease = next(
+                    (lease for lease in self._expired_leases if lease.unit == unit),
+                    None,
+                )
+                if expired_lease is None:
+                    return False
+                self._expired_leases.remove(expired_lease)
+
+            self.results.append(result)
+            self._check_done()
+
+        if self._on_result is not None:
+            self._on_result(result)
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def _expire_leases(self) -> None:
+        now = monotonic()
+        for unit, lease in list(self._leases.items()):
+            if lease.deadline <= now:
+                logger.warning(
+                    f"Lease of '{lease.scenario[NAME_KEY]}' by "
+                    f"{lease.worker} expired, handing it out again."
+                )
+                del self._leases[unit]
+                self._expired_leases.append(lease)
+
+    def _check_done(self) -> None:
+        if self._scenarios_exhausted and not self._leases and not self._expired_leases:
+            self._done.set()
+
+    def _serialize(self, scenario: Scenario) -> dict:
+        return serialize_scenario(
+            Scenario(
+                scenario.name,
+                list(self._scenario_fragment_loader.resolve_interactions(scenario)),
+                scenario.variables,
+            )
+        )
+
+
+class CoordinatorServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, server_address: Tuple[str, int], coordinator: Coordinator):
+        super().__init__(server_address, CoordinatorRequestHandler)
+        self.coordinator = coordinator
+
+
+class CoordinatorRequestHandler(BaseHTTPRequestHandler):
+    server: CoordinatorServer
+
+    def do_POST(self) -> None:
+        body = json_codec.loads(
+            self.rfile.read(int(self.headers.get(CONTENT_LENGTH_HEADER, 0)))
+        )
+        if self.path == LEASE_PATH:
+            status, lease = self.server.coordinator.lease(body[WORKER_KEY])
+            self._respond(
+                status,
+                (
+                    None
+                    if lease is None
+                    else {UNIT_KEY: lease.unit, SCENARIO_KEY: lease.scenario}
+                ),
+            )
+        elif self.path == RESULT_PATH:
+            failed_interaction = body.get(FAILED_INTERACTION_KEY)
+            known_unit = self.server.coordinator.complete(
+                body[UNIT_KEY],
+                WorkResult(
+                    body[SCENARIO_KEY],
+                    body[WORKER_KEY],
+                    (
+                        None
+                        if failed_interaction is None
+                        else FailedInteraction.from_dict(failed_interaction)
+                    ),
+                    body.get(ERROR_KEY),
+                ),
+            )
+            self._respond(STATUS_WORK if known_unit else STATUS_NOT_FOUND)
+        else:
+            self._respond(STATUS_NOT_FOUND)
+
+    def _respond(self, status: int, content: Optional[dict] = None) -> None:
+        data = b"" if content is None else json_codec.dumpb(content)
+        self.send_response(status)
+        self.send_header(CONTENT_TYPE_HEADER, JSON_CONTENT_TYPE)
+        self.send_header(CONTENT_LENGTH_HEADER, str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format, *args)
+
+
+class Worker:
+    """
+    Runs scenarios pulled from a coordinator with the runners of the local
+    configuration, until the coordinator has no more scenarios or goes away.
+    """
+
+    def __init__(
+        self,
+        coordinator_url: str,
+        injector: DependencyInjector,
+        runner_type: Callable[..., ScenarioRunner],
+        max_workers: int,
+    ):
+        self._coordinator_url = coordinator_url.rstrip("/")
+        self._injector = injector
+        self._runner_type = runner_type
+        self._max_workers = max_workers
+        self.name = f"{gethostname()}-{getpid()}-{id(self)}"
+        self.scenario_count = 0
+        self._count_lock = Lock()
+
+    def run(self) -> int:
+        """
+        Returns the number of scenarios run.
+        """
+        threads = [
+            Thread(target=self._run_leases, daemon=True)
+            for _ in range(self._max_workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.scenario_count
+
+    def _run_leases(self) -> None:
+        session = Session()
+        while True:
+            try:
+                response = session.post(
+                    f"{self._coordinator_url}{LEASE_PATH}", json={WORKER_KEY: self.name}
+                )
+            except RequestException as error:
+                logger.warning(f"Coordinator unreachable, stopping: {error}")
+                return
+
+            if response.status_code == STATUS_WAIT:
+                sleep(WORK_POLL_INTERVAL)
+                continue
+            if response.status_code != STATUS_WORK:
+                return
+
+            work = response.json()
+            scenario = deserialize_scenario(work[SCENARIO_KEY])
+            result = {
+                WORKER_KEY: self.name,
+                UNIT_KEY: work[UNIT_KEY],
+                SCENARIO_KEY: scenario.name,
+            }
+            try:
+                with self._injector.scenario_scope():
+                    runner: ScenarioRunner = self._injector.autowire(self._runner_type)
+                    failed_interaction = runner.run(scenario)
+                if failed_interaction is not None:
+                    result[FAILED_INTERACTION_KEY] = failed_interaction.to_dict()
+            except Exception as error:
+                logger.exception(f"Scenario '{scenario.name}' could not be run")
+                result[ERROR_KEY] = f"{error.__class__.__name__}: {error}"
+
+            with self._count_lock:
+                self.scenario_count += 1
+            try:
+                session.post(f"{self._coordinator_url}{RESULT_PATH}", json=result)
+            except RequestException as error:
+                logger.warning(f"Coordinator unreachable, stopping: {error}")
+                return
@@ -0,0 +1,273 @@
+import sqlite3
+from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .scenario import Scenario
+
+# Weight of the latest duration in the smoothed duration of a scenario.
+DURATION_SMOOTHING = 0.5
+PERCENTILE = 95
+
+CREATE_TABLES = """
+CREATE TABLE IF NOT EXISTS scenario_timings (
+    name TEXT PRIMARY KEY,
+    duration REAL NOT NULL,
+    failed INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scenario_runs (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    name TEXT NOT NULL,
+    duration REAL NOT NULL,
+    failed INTEGER NOT NULL,
+    turn_count INTEGER NOT NULL,
+    turn_latency_p95 REAL
+);
+CREATE INDEX IF NOT EXISTS scenario_runs_run_id ON scenario_runs (run_id);
+CREATE INDEX IF NOT EXISTS scenario_runs_name ON scenario_runs (name);
+"""
+SELECT_TIMINGS = "SELECT name, duration, failed FROM scenario_timings"
+# Upserts need SQLite 3.24, a new timing is inserted then smoothed with itself.
+INSERT_TIMING = """
+INSERT OR IGNORE INTO scenario_timings (name, duration, failed) VALUES (?, ?, ?)
+"""
+UPDATE_TIMING = """
+UPDATE scenario_timings SET duration = ? * ? + (1 - ?) * duration, failed = ?
+WHERE name = ?
+"""
+INSERT_RUN = "INSERT INTO runs (started) VALUES (?)"
+INSERT_SCENARIO_RUN = """
+INSERT INTO scenario_runs
+    (run_id, name, duration, failed, turn_count, turn_latency_p95)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+# Id of the oldest of the last runs, or of the oldest run when there are fewer.
+SELECT_OLDEST_RUN_ID = """
+SELECT MIN(id) FROM (SELECT id FROM runs ORDER BY id DESC LIMIT ?)
+"""
+SELECT_SLOWEST = """
+SELECT
+    name,
+    AVG(duration),
+    MAX(duration),
+    AVG(turn_latency_p95),
+    COUNT(*),
+    SUM(failed)
+FROM scenario_runs
+WHERE run_id >= ?
+GROUP BY name
+ORDER BY AVG(duration) DESC
+LIMIT ?
+"""
+# Durations of each scenario over the recent runs and over the runs before them,
+# sorted for their percentiles to be computed without window functions, which
+# need SQLite 3.25.
+SELECT_PERIOD_DURATIONS = """
+SELECT name, run_id >= ? AS recent, duration
+FROM scenario_runs
+WHERE run_id >= ?
+ORDER BY name, recent, duration
+"""
+
+
+class ScenarioStatistics:
+    def __init__(
+        self,
+        name: str,
+        mean_duration: float,
+        max_duration: float,
+        mean_turn_latency_p95: Optional[float],
+        run_count: int,
+        failure_count: int,
+    ):
+        self.name = name
+        self.mean_duration = mean_duration
+        self.max_duration = max_duration
+        self.mean_turn_latency_p95 = mean_turn_latency_p95
+        self.run_count = run_count
+        self.failure_count = failure_count
+
+    def __repr__(self) -> str:
+        return (
+            f"<ScenarioStatistics, name: {self.name}, "
+            f"mean duration: {self.mean_duration}, runs: {self.run_count}>"
+        )
+
+
+class PercentileGrowth:
+    def __init__(self, name: str, previous_duration: float, recent_duration: float):
+        self.name = name
+        self.previous_duration = previous_duration
+        self.recent_duration = recent_duration
+
+    @property
+    def ratio(self) -> float:
+        if not self.previous_duration:
+            return float("inf")
+        return self.recent_duration / self.previous_duration
+
+    def __repr__(self) -> str:
+        return (
+            f"<PercentileGrowth, name: {self.name}, "
+            f"from {self.previous_duration} to {self.recent_duration}>"
+        )
+
+
+class TimingHistory:
+    """
+    Duration, outcome and turn latencies of the past runs of each scenario, kept in
+    a SQLite file.
+
+    Runs are recorded in memory from any thread and saved at once, so that the
+    scenarios don't wait on the database.
+    """
+
+    def __init__(self, path: Path):
+        self._path = path
+        self._recorded: List[Tuple[str, float, bool, int, Optional[float]]] = []
+        self._lock = Lock()
+        self._started = time()
+        with self._connect() as connection:
+            self.timings: Dict[str, Tuple[float, bool]] = {
+                name: (duration, bool(failed))
+                for name, duration, failed in connection.execute(SELECT_TIMINGS)
+            }
+
+    def record(
+        self,
+        scenario_name: str,
+        duration: float,
+        failed: bool,
+        turn_latencies: Sequence[float] = (),
+    ) -> None:
+        turn_latency_p95 = (
+            percentile(sorted(turn_latencies), PERCENTILE) if turn_latencies else None
+        )
+        with self._lock:
+            self._recorded.append(
+                (scenario_name, duration, failed, len(turn_latencies), turn_latency_p95)
+            )
+
+    def save(self) -> None:
+        with self._lock:
+            recorded, self._recorded = self._recorded, []
+            started, self._started = self._started, time()
+        if not recorded:
+            return
+
+        with self._connect() as connection, connection:
+            run_id = connection.execute(INSERT_RUN, (started,)).lastrowid
+            connection.executemany(
+                INSERT_SCENARIO_RUN, [(run_id, *values) for values in recorded]
+            )
+            connection.executemany(
+                INSERT_TIMING,
+                [(name, duration, failed) for name, duration, failed, _, _ in recorded],
+            )
+            connection.executemany(
+                UPDATE_TIMING,
+                [
+                    (DURATION_SMOOTHING, duration, DURATION_SMOOTHING, failed, name)
+                    for name, duration, failed, _, _ in recorded
+                ],
+            )
+
+    def schedule(
+        self, scenarios: Iterable[Scenario], longest_first: bool, failed_first: bool
+    ) -> List[Scenario]:
+        """
+        Order scenarios so that the longest ones start first, which shortens the
+        total run when they are run in parallel, and/or so that the ones which failed
+        their last run start first. Scenarios without history are assumed to be
+        long.
+        """
+        unknown_duration = max(
+            (duration for duration, _ in self.timings.values()), default=0.0
+        )
+
+        def priority(scenario: Scenario) -> Tuple[bool, float]:
+            duration, failed = self.timings.get(
+                scenario.name, (unknown_duration, False)
+            )
+            return (
+                failed_first and failed,
+                duration if longest_first else 0.0,
+            )
+
+        return sorted(scenarios, key=priority, reverse=True)
+
+    def slowest(self, limit: int, run_count: int) -> List[ScenarioStatistics]:
+        """
+        Scenarios with the longest mean duration over the last runs.
+        """
+        with self._connect() as connection:
+            oldest_run_id = _oldest_run_id(connection, run_count)
+            if oldest_run_id is None:
+                return []
+            return [
+                ScenarioStatistics(*row)
+                for row in connection.execute(SELECT_SLOWEST, (oldest_run_id, limit))
+            ]
+
+    def percentile_growth(
+        self, threshold: float, run_count: int, percent: int = PERCENTILE
+    ) -> List[PercentileGrowth]:
+        """
+        Scenarios whose duration percentile over the last runs grew by more than the
+        threshold ratio compared to as many runs before them, largest growth first.
+        """
+        with self._connect() as connection:
+            recent_run_id = _oldest_run_id(connection, run_count)
+            previous_run_id = _oldest_run_id(connection, run_count * 2)
+            if recent_run_id is None or recent_run_id == previous_run_id:
+                return []
+
+            durations: Dict[str, Dict[bool, float]] = {}
+            rows = connection.execute(
+                SELECT_PERIOD_DURATIONS, (recent_run_id, previous_run_id)
+            )
+            for (name, recent), period_rows in groupby(rows, key=itemgetter(0, 1)):
+                durations.setdefault(name, {})[bool(recent)] = percentile(
+                    [duration for _, _, duration in period_rows], percent
+                )
+
+        growths = [
+            PercentileGrowth(name, periods[False], periods[True])
+            for name, periods in durations.items()
+            if len(periods) == 2 and periods[True] > periods[False] * (1 + threshold)
+        ]
+        return sorted(growths, key=lambda growth: growth.ratio, reverse=True)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        Connection closed when leaving the context, use the connection itself as a
+        context to commit.
+        """
+        connection = sqlite3.connect(str(self._path))
+        try:
+            connection.executescript(CREATE_TABLES)
+            yield connection
+        finally:
+            connection.close()
+
+
+def _oldest_run_id(connection: sqlite3.Connection, run_count: int) -> Optional[int]:
+    (run_id,) = connection.execute(SELECT_OLDEST_RUN_ID, (run_count,)).fetchone()
+    return run_id
+
+
+def percentile(sorted_values: Sequence[float], percent: int) -> float:
+    """
+    Nearest rank percentile of values sorted in ascending order, one of the values.
+    """
+    rank = (len(sorted_values) * percent + 99) // 100
+    return sorted_values[max(rank, 1) - 1]
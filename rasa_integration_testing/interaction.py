@@ -1,9 +1,12 @@
-import json
 from pathlib import Path
+from typing import Dict, Mapping
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
-from .common.configuration import configure
+from .common import json_codec
+from .common.configuration import Scope, configure
+from .common.variables import EMPTY_VARIABLES, VariableContext
+from .matcher import NO_RULES, MatcherRules, rules_filename
 
 INTERACTIONS_FOLDER = "interactions"
 INTERACTION_TURN_EXTENSION = "jinja"
@@ -66,32 +69,68 @@ class Interaction:
         return hash((self.user, self.bot))
 
 
-@configure("tests_path")
+@configure("tests_path", scope=Scope.PROCESS)
 class InteractionLoader:
     def __init__(self, tests_path: Path):
-        interactions_path = tests_path / INTERACTIONS_FOLDER
+        self._interactions_path = tests_path / INTERACTIONS_FOLDER
         self._template_environment = Environment(
-            loader=FileSystemLoader(str(interactions_path)),
+            loader=FileSystemLoader(str(self._interactions_path)),
             autoescape=select_autoescape(["json"]),
         )
+        self._bot_turn_rules: Dict[str, MatcherRules] = {}
 
     def render_user_turn(
-        self, user_turn: InteractionTurn, env_variables: dict = {}
+        self, user_turn: InteractionTurn, variables: Mapping = EMPTY_VARIABLES
     ) -> dict:
-        return self._render_turn(user_turn, USER_FOLDER, env_variables)
+        return self._render_turn(user_turn, USER_FOLDER, variables)
 
     def render_bot_turn(
-        self, bot_turn: InteractionTurn, env_variables: dict = {}
+        self, bot_turn: InteractionTurn, variables: Mapping = EMPTY_VARIABLES
     ) -> dict:
-        return self._render_turn(bot_turn, BOT_FOLDER, env_variables)
+        return self._render_turn(bot_turn, BOT_FOLDER, variables)
+
+    def bot_turn_rules(self, bot_turn: InteractionTurn) -> MatcherRules:
+        """
+        Matcher rules of a bot turn template, or no rules when it has no rules file.
+        Rules are compiled once, until reloaded.
+        """
+        filename = rules_filename(template_filename(bot_turn, BOT_FOLDER))
+        rules = self._bot_turn_rules.get(filename)
+        if rules is None:
+            rules_path = self._interactions_path / filename
+            rules = (
+                MatcherRules.from_file(rules_path) if rules_path.is_file() else NO_RULES
+            )
+            self._bot_turn_rules[filename] = rules
+        return rules
+
+    def reload_rules(self) -> None:
+        """
+        Forget the compiled rules, for rules files changed since they were compiled.
+        """
+        self._bot_turn_rules = {}
 
     def _render_turn(
-        self, turn: InteractionTurn, folder: str, env_variables: dict = {}
+        self, turn: InteractionTurn, folder: str, variables: Mapping = EMPTY_VARIABLES
     ) -> dict:
-        template_filename = f"{folder}/{turn.template}.{INTERACTION_TURN_EXTENSION}"
-        template = self._template_environment.get_template(template_filename)
+        """
+        Variables given by the runner take precedence over the ones of the turn.
+        """
+        template = self._template_environment.get_template(
+            template_filename(turn, folder)
+        )
+
+        context = (
+            variables
+            if isinstance(variables, VariableContext)
+            else VariableContext(variables)
+        )
+        rendered_template: str = template.render(
+            {"vars": context.with_defaults(turn.variables)}
+        )
+
+        return json_codec.loads(rendered_template)
 
-        variables = {**turn.variables, **env_variables}
-        rendered_template: str = template.render({"vars": variables})
 
-        return json.loads(rendered_template)
+def template_filename(turn: InteractionTurn, folder: str) -> str:
+    return f"{folder}/{turn.template}.{INTERACTION_TURN_EXTENSION}"
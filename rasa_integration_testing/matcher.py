@@ -0,0 +1,262 @@
+import re
+from copy import copy
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from ruamel.yaml import YAML
+
+RULES_EXTENSION = "rules.yml"
+PATH_SEPARATOR = "."
+WILDCARD = "*"
+RECURSIVE_WILDCARD = "**"
+
+IGNORE_RULE = "ignore"
+REGEX_RULE = "regex"
+TYPE_RULE = "type"
+TOLERANCE_RULE = "tolerance"
+SUBSET_RULE = "subset"
+UNORDERED_RULE = "unordered"
+RULE_KINDS = (
+    IGNORE_RULE,
+    REGEX_RULE,
+    TYPE_RULE,
+    TOLERANCE_RULE,
+    SUBSET_RULE,
+    UNORDERED_RULE,
+)
+# Rules taking no argument other than true.
+FLAG_RULES = (IGNORE_RULE, SUBSET_RULE, UNORDERED_RULE)
+
+JSON_TYPES: Dict[str, tuple] = {
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "null": (type(None),),
+    "list": (list,),
+    "object": (dict,),
+}
+
+MatcherState = FrozenSet[int]
+
+
+class MatcherRulesError(Exception):
+    def __init__(self, message: str, path: Path):
+        super().__init__(f"{message}: {path}")
+
+
+class MatcherRule:
+    """
+    How the value at a path of the bot output is matched instead of with equality.
+    """
+
+    def __init__(self, kind: str, argument: Any):
+        self.kind = kind
+        self.argument = argument
+        self._pattern = re.compile(argument) if kind == REGEX_RULE else None
+
+    @property
+    def matches_subtree(self) -> bool:
+        """
+        Whether the rule decides alone for the value and all of its children.
+        """
+        return self.kind in (REGEX_RULE, TYPE_RULE, TOLERANCE_RULE)
+
+    def matches(self, expected: Any, actual: Any) -> bool:
+        if self.kind == REGEX_RULE:
+            return (
+                isinstance(actual, str) and self._pattern.fullmatch(actual) is not None
+            )
+        if self.kind == TYPE_RULE:
+            return isinstance(actual, JSON_TYPES[self.argument]) and (
+                self.argument in ("boolean", "null") or not isinstance(actual, bool)
+            )
+        if self.kind == TOLERANCE_RULE:
+            return (
+                _is_number(expected)
+                and _is_number(actual)
+                and abs(expected - actual) <= self.argument
+            )
+        return True
+
+    def __repr__(self) -> str:
+        return f"<MatcherRule {self.kind}: {self.argument}>"
+
+
+class MatcherRules:
+    """
+    Matcher rules of a bot turn template, keyed by paths of the bot output. Path
+    elements are separated by dots, list entries are `_1`, `_2` and so on, `*` matches
+    any one element and `**` any number of elements. The first rule declared wins
+    when several match.
+
+    Patterns are compiled into a trie walked as a non-deterministic automaton, whose
+    states are built lazily and cached, so that the comparator advances a single
+    state per element while walking the outputs.
+    """
+
+    def __init__(self, rules: Mapping[str, MatcherRule] = {}):
+        self._patterns: List[str] = list(rules)
+        self._rules: List[MatcherRule] = list(rules.values())
+        self._children: List[Dict[str, int]] = []
+        self._wildcards: List[Optional[int]] = []
+        self._recursive_wildcards: List[Optional[int]] = []
+        self._is_recursive: List[bool] = []
+        self._rule_indexes: List[Optional[int]] = []
+        self._literals: set = set()
+        self._transitions: Dict[Tuple[MatcherState, Optional[str]], MatcherState] = {}
+        self._state_rules: Dict[MatcherState, Optional[MatcherRule]] = {}
+
+        root = self._add_node(False)
+        for rule_index, pattern in enumerate(rules):
+            node = root
+            for element in pattern.split(PATH_SEPARATOR):
+                node = self._child(node, element)
+            if self._rule_indexes[node] is None:
+                self._rule_indexes[node] = rule_index
+
+        self.initial_state: MatcherState = (
+            self._closure(root) if self._rules else frozenset()
+        )
+
+    @classmethod
+    def from_dict(cls, data: Any, path: Path) -> "MatcherRules":
+        if not isinstance(data, dict):
+            raise MatcherRulesError("Invalid matcher rules format", path)
+        return cls(
+            {
+                str(pattern): _create_rule(rule, pattern, path)
+                for pattern, rule in data.items()
+            }
+        )
+
+    @classmethod
+    def from_file(cls, path: Path) -> "MatcherRules":
+        with open(path) as rules_file:
+            return cls.from_dict(read_rules(rules_file), path)
+
+    def declared_rules(self) -> List[Tuple[str, str, Any]]:
+        """
+        Pattern, kind and argument of each rule, in the order they were declared.
+        """
+        return [
+            (pattern, rule.kind, rule.argument)
+            for pattern, rule in zip(self._patterns, self._rules)
+        ]
+
+    def child(self, element: str) -> "MatcherRules":
+        """
+        The rules of the value at an element of the output, sharing the automaton.
+        """
+        child_rules = copy(self)
+        child_rules.initial_state = self.advance(self.initial_state, element)
+        return child_rules
+
+    def advance(self, state: MatcherState, element: str) -> MatcherState:
+        if not state:
+            return state
+
+        key = element if element in self._literals else None
+        next_state = self._transitions.get((state, key))
+        if next_state is None:
+            nodes: set = set()
+            for node in state:
+                if key is not None and key in self._children[node]:
+                    nodes |= self._closure(self._children[node][key])
+                if self._wildcards[node] is not None:
+                    nodes |= self._closure(self._wildcards[node])
+                if self._is_recursive[node]:
+                    nodes |= self._closure(node)
+            next_state = frozenset(nodes)
+            self._transitions[(state, key)] = next_state
+        return next_state
+
+    def rule(self, state: MatcherState) -> Optional[MatcherRule]:
+        if not state:
+            return None
+
+        if state not in self._state_rules:
+            rule_indexes = [
+                self._rule_indexes[node]
+                for node in state
+                if self._rule_indexes[node] is not None
+            ]
+            self._state_rules[state] = (
+                self._rules[min(rule_indexes)] if rule_indexes else None
+            )
+        return self._state_rules[state]
+
+    def _add_node(self, is_recursive: bool) -> int:
+        self._children.append({})
+        self._wildcards.append(None)
+        self._recursive_wildcards.append(None)
+        self._is_recursive.append(is_recursive)
+        self._rule_indexes.append(None)
+        return len(self._children) - 1
+
+    def _child(self, node: int, element: str) -> int:
+        if element == RECURSIVE_WILDCARD:
+            if self._recursive_wildcards[node] is None:
+                self._recursive_wildcards[node] = self._add_node(True)
+            return self._recursive_wildcards[node]
+        if element == WILDCARD:
+            if self._wildcards[node] is None:
+                self._wildcards[node] = self._add_node(False)
+            return self._wildcards[node]
+
+        self._literals.add(element)
+        if element not in self._children[node]:
+            self._children[node][element] = self._add_node(False)
+        return self._children[node][element]
+
+    def _closure(self, node: int) -> MatcherState:
+        """
+        The node along with the recursive wildcards following it, which can match
+        no element at all.
+        """
+        nodes = {node}
+        while self._recursive_wildcards[node] is not None:
+            node = self._recursive_wildcards[node]
+            nodes.add(node)
+        return frozenset(nodes)
+
+
+NO_RULES = MatcherRules()
+
+
+def rules_filename(template_filename: str) -> str:
+    """
+    Matcher rules are kept next to their template, `welcome.jinja` rules being in
+    `welcome.rules.yml`.
+    """
+    stem, _, _ = template_filename.rpartition(PATH_SEPARATOR)
+    return f"{stem}{PATH_SEPARATOR}{RULES_EXTENSION}"
+
+
+def read_rules(rules_file) -> Any:
+    return YAML(typ="safe").load(rules_file)
+
+
+def _create_rule(rule: Any, pattern: str, path: Path) -> MatcherRule:
+    if not isinstance(rule, dict) or len(rule) != 1:
+        raise MatcherRulesError(f"Invalid rule for '{pattern}'", path)
+
+    ((kind, argument),) = rule.items()
+    if kind not in RULE_KINDS:
+        raise MatcherRulesError(f"Unknown rule '{kind}' for '{pattern}'", path)
+    if kind in FLAG_RULES and argument is not True:
+        raise MatcherRulesError(f"Rule '{kind}' of '{pattern}' must be true", path)
+    if kind == TYPE_RULE and argument not in JSON_TYPES:
+        raise MatcherRulesError(f"Unknown type '{argument}' for '{pattern}'", path)
+    if kind == TOLERANCE_RULE and not _is_number(argument):
+        raise MatcherRulesError(f"Tolerance of '{pattern}' must be a number", path)
+    if kind == REGEX_RULE:
+        try:
+            re.compile(argument)
+        except (re.error, TypeError) as error:
+            raise MatcherRulesError(f"Invalid regex for '{pattern}' ({error})", path)
+    return MatcherRule(kind, argument)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -0,0 +1,214 @@
+import logging
+import os
+import re
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from queue import Queue
+from socketserver import ThreadingMixIn
+from threading import Event, Lock, Thread, local
+from time import monotonic
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from requests import RequestException, Session
+
+from .common import json_codec
+from .rest_runner import SENDER_ID_KEY, SENDER_KEY
+from .test_writer import write_conversation
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDLE_TIMEOUT = 300.0
+IDLE_SESSIONS_CHECK_INTERVAL = 1.0
+
+SENDER_KEYS = (SENDER_KEY, SENDER_ID_KEY)
+CONTENT_LENGTH_HEADER = "Content-Length"
+CONTENT_TYPE_HEADER = "Content-Type"
+BAD_GATEWAY_STATUS = 502
+# Headers only meaningful for a single connection, as well as the ones set again
+# when the proxy sends the request or the response.
+UNFORWARDED_HEADERS = frozenset(
+    header.lower()
+    for header in (
+        "Connection",
+        "Keep-Alive",
+        "Proxy-Authenticate",
+        "Proxy-Authorization",
+        "TE",
+        "Trailers",
+        "Transfer-Encoding",
+        "Upgrade",
+        "Host",
+        "Date",
+        "Server",
+        "Content-Encoding",
+        CONTENT_LENGTH_HEADER,
+    )
+)
+SESSION_NAME_INVALID_CHARACTERS = r"[^\w.-]"
+
+
+class ConversationRecorder:
+    """
+    Keeps the conversation of each sender in memory and writes it as a scenario once
+    its session ends, either explicitly or after being idle for too long. Scenarios
+    are written by a background thread so that recording doesn't slow down traffic.
+    """
+
+    def __init__(
+        self, output_directory: str, idle_timeout: float = DEFAULT_IDLE_TIMEOUT
+    ):
+        self._output_directory = output_directory
+        self._idle_timeout = idle_timeout
+        self._conversations: Dict[str, List[Tuple[dict, dict]]] = {}
+        self._last_activities: Dict[str, float] = {}
+        self._lock = Lock()
+        self._write_queue: Queue = Queue()
+        self._closed = Event()
+        Thread(target=self._write_sessions, daemon=True).start()
+        Thread(target=self._end_idle_sessions, daemon=True).start()
+
+    def record(self, sender_id: str, user_input: dict, bot_output: dict) -> None:
+        with self._lock:
+            self._conversations.setdefault(sender_id, []).append(
+                (user_input, bot_output)
+            )
+            self._last_activities[sender_id] = monotonic()
+
+    def end_session(self, sender_id: str) -> None:
+        with self._lock:
+            self._end_session(sender_id)
+
+    def close(self) -> None:
+        """
+        End all sessions and wait until they are written.
+        """
+        self._closed.set()
+        with self._lock:
+            for sender_id in list(self._conversations):
+                self._end_session(sender_id)
+        self._write_queue.join()
+
+    def _end_session(self, sender_id: str) -> None:
+        interactions = self._conversations.pop(sender_id, None)
+        self._last_activities.pop(sender_id, None)
+        if interactions:
+            self._write_queue.put((sender_id, interactions))
+
+    def _end_idle_sessions(self) -> None:
+        while not self._closed.wait(IDLE_SESSIONS_CHECK_INTERVAL):
+            idle_since = monotonic() - self._idle_timeout
+            with self._lock:
+                for sender_id, last_activity in list(self._last_activities.items()):
+                    if last_activity <= idle_since:
+                        self._end_session(sender_id)
+
+    def _write_sessions(self) -> None:
+        while True:
+            sender_id, interactions = self._write_queue.get()
+            try:
+                write_conversation(
+                    self._output_directory,
+                    self._session_name(sender_id),
+                    interactions,
+                )
+            except Exception:
+                logger.exception(f"Could not write the session of {sender_id}")
+            finally:
+                self._write_queue.task_done()
+
+    def _session_name(self, sender_id: str) -> str:
+        # Only the writer thread creates sessions, so the name cannot be taken
+        # between this check and the write.
+        session_name = re.sub(SESSION_NAME_INVALID_CHARACTERS, "_", sender_id)
+        session_index = 1
+        available_name = session_name
+        while os.path.exists(os.path.join(self._output_directory, available_name)):
+            session_index += 1
+            available_name = f"{session_name}_{session_index}"
+        return available_name
+
+
+class RecordingProxy(ThreadingMixIn, HTTPServer):
+    """
+    Reverse proxy forwarding requests to a Rasa server and recording each JSON user
+    input along with the bot output it got.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        target_url: str,
+        recorder: ConversationRecorder,
+    ):
+        super().__init__(server_address, RecordingRequestHandler)
+        self.target_url = target_url.rstrip("/")
+        self.recorder = recorder
+        self._sessions = local()
+
+    @property
+    def session(self) -> Session:
+        """
+        Session of the current handler thread, sessions aren't thread safe.
+        """
+        session: Optional[Session] = getattr(self._sessions, "session", None)
+        if session is None:
+            session = self._sessions.session = Session()
+        return session
+
+
+class RecordingRequestHandler(BaseHTTPRequestHandler):
+    server: RecordingProxy
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get(CONTENT_LENGTH_HEADER, 0)))
+        try:
+            response = self.server.session.post(
+                f"{self.server.target_url}{self.path}",
+                data=body,
+                headers=_forwarded_headers(self.headers.items()),
+            )
+        except RequestException as error:
+            logger.warning(f"Could not forward {self.path} to the target: {error}")
+            self.send_error(BAD_GATEWAY_STATUS, explain=str(error))
+            return
+
+        self.send_response(response.status_code)
+        for header, value in _forwarded_headers(response.headers.items()).items():
+            self.send_header(header, value)
+        self.send_header(CONTENT_LENGTH_HEADER, str(len(response.content)))
+        self.end_headers()
+        self.wfile.write(response.content)
+
+        if response.status_code == 200:
+            self._record(body, response.content)
+
+    def _record(self, body: bytes, response_content: bytes) -> None:
+        try:
+            user_input = json_codec.loads(body)
+            bot_output = json_codec.loads(response_content)
+        except ValueError:
+            return
+
+        sender_id = _pop_sender_id(user_input)
+        if sender_id is not None:
+            self.server.recorder.record(sender_id, user_input, bot_output)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format, *args)
+
+
+def _forwarded_headers(headers: Iterable[Tuple[str, str]]) -> Dict[str, str]:
+    return {
+        header: value
+        for header, value in headers
+        if header.lower() not in UNFORWARDED_HEADERS
+    }
+
+
+def _pop_sender_id(user_input: dict) -> Optional[str]:
+    if isinstance(user_input, dict):
+        for sender_key in SENDER_KEYS:
+            if sender_key in user_input:
+                return str(user_input.pop(sender_key))
+    return None
@@ -0,0 +1,105 @@
+import re
+from itertools import islice
+from pathlib import Path
+from reprlib import Repr
+from typing import Any, Iterator, List, Optional, Tuple
+
+from .common import json_codec
+from .comparator import JsonDiff, JsonPath
+from .runner import FailedInteraction
+
+DEFAULT_MAX_VALUE_LENGTH = 1000
+DEFAULT_MAX_DIFF_ENTRIES = 20
+MAX_NESTING = 6
+MAX_ITEMS = 20
+TRUNCATION_MARK = "..."
+
+ARTIFACT_EXTENSION = ".json"
+SCENARIO_KEY = "scenario"
+# Characters of scenario names kept in artifact file names, subfolders included.
+# Variant parameters are values of the scenarios, they can't name folders.
+UNSAFE_FILENAME_CHARACTERS = re.compile(r"[^\w\-.,=\[\]/]")
+UNSAFE_VARIANT_CHARACTERS = re.compile(r"[^\w\-.,=\[\]]|\.\.")
+UNSAFE_FILENAME_REPLACEMENT = "_"
+VARIANT_START = "["
+
+MISSING_SIGN = "-"
+EXTRA_SIGN = "+"
+
+DiffLine = Tuple[str, JsonPath, str]
+
+
+class FailureRenderer:
+    """
+    Renders failed interactions for the console within size caps, so that a huge bot
+    payload or many failures at once don't stall the output. Values are formatted
+    with bounded depth, items and string lengths instead of being formatted in full
+    and cut afterwards.
+
+    The full failed interactions can be written to one artifact file per scenario.
+    """
+
+    def __init__(
+        self,
+        artifacts_path: Optional[Path] = None,
+        max_value_length: int = DEFAULT_MAX_VALUE_LENGTH,
+        max_diff_entries: int = DEFAULT_MAX_DIFF_ENTRIES,
+    ):
+        self._artifacts_path = artifacts_path
+        self._max_value_length = max_value_length
+        self._max_diff_entries = max_diff_entries
+        self._repr = Repr()
+        self._repr.maxlevel = MAX_NESTING
+        self._repr.maxdict = self._repr.maxlist = self._repr.maxtuple = MAX_ITEMS
+        self._repr.maxstring = self._repr.maxother = max_value_length
+
+    def format_value(self, value: Any) -> str:
+        formatted_value = self._repr.repr(value)
+        if len(formatted_value) <= self._max_value_length:
+            return formatted_value
+        return formatted_value[: self._max_value_length] + TRUNCATION_MARK
+
+    def diff_lines(self, output_diff: JsonDiff) -> Tuple[List[DiffLine], int]:
+        """
+        Missing entries each followed by the extra entry of the same path, then the
+        other extra entries, up to the maximum amount of entries. Returns the lines
+        and the amount of entries left out.
+        """
+        lines = list(islice(self._iter_diff_lines(output_diff), self._max_diff_entries))
+        entry_count = len(output_diff.missing_entries) + len(output_diff.extra_entries)
+        return lines, entry_count - len(lines)
+
+    def write_artifact(
+        self, scenario_name: str, failed_interaction: FailedInteraction
+    ) -> Optional[Path]:
+        if self._artifacts_path is None:
+            return None
+
+        name, variant_start, variant = scenario_name.partition(VARIANT_START)
+        artifact_path = self._artifacts_path / (
+            UNSAFE_FILENAME_CHARACTERS.sub(UNSAFE_FILENAME_REPLACEMENT, name)
+            + variant_start
+            + UNSAFE_VARIANT_CHARACTERS.sub(UNSAFE_FILENAME_REPLACEMENT, variant)
+            + ARTIFACT_EXTENSION
+        )
+        artifact_path.parent.mkdir(parents=True, exist_ok=True)
+        artifact_path.write_text(
+            json_codec.dumps(
+                {SCENARIO_KEY: scenario_name, **failed_interaction.to_dict()},
+                indent=True,
+            ),
+            encoding="utf-8",
+        )
+        return artifact_path
+
+    def _iter_diff_lines(self, output_diff: JsonDiff) -> Iterator[DiffLine]:
+        missing_entries = output_diff.missing_entries
+        extra_entries = output_diff.extra_entries
+        for key, value in missing_entries.items():
+            yield MISSING_SIGN, key, self.format_value(value)
+            if key in extra_entries:
+                yield EXTRA_SIGN, key, self.format_value(extra_entries[key])
+
+        for key, value in extra_entries.items():
+            if key not in missing_entries:
+                yield EXTRA_SIGN, key, self.format_value(value)
@@ -1,17 +1,15 @@
-import json
-import os
-from json import JSONDecodeError
-from time import time
-from typing import List, Optional
+from time import perf_counter, time
+from typing import Iterator, List, Mapping, Optional, Tuple
 
-from requests import Response, post
-
-from .common.configuration import configure
+from .common import json_codec
+from .common.configuration import Scope, configure
 from .common.utils import generate_tracker_id_from_scenario_name
+from .common.variables import VariableContext
 from .comparator import JsonDataComparator, JsonDiff
-from .interaction import Interaction, InteractionLoader
-from .runner import FailedInteraction, ScenarioRunner
+from .interaction import Interaction, InteractionLoader, InteractionTurn
+from .runner import FIRST_STEP, FailedInteraction, ScenarioRunner
 from .scenario import Scenario, ScenarioFragmentLoader
+from .transport import HttpTransport, PostFunction
 
 SENDER_KEY = "sender"
 SENDER_ID_KEY = "senderId"
@@ -24,30 +22,49 @@ class RestProtocolException(Exception):
 
 
 class AbstractRestRunner(ScenarioRunner):
+    """
+    REST runners keep their connections alive between requests, they are meant to be
+    autowired with the thread scope since HTTP/1.1 sessions cannot be shared between
+    threads.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        interaction_loader: InteractionLoader,
+        scenario_fragment_loader: ScenarioFragmentLoader,
+        comparator: JsonDataComparator,
+        transport: HttpTransport,
+    ):
+        super().__init__(url, interaction_loader, scenario_fragment_loader, comparator)
+        self._transport = transport
+        self._post = transport.post_function()
+
     def senderKey(self):
         pass
 
     def createVars(self, i):
         return {}
 
-    def run(self, scenario: Scenario) -> Optional[FailedInteraction]:
-        sender_id = generate_tracker_id_from_scenario_name(time(), scenario.name)
-        interactions: List[Interaction] = self.resolve_interactions(scenario)
-
-        i = 1
-        for interaction in interactions:
-            i += 1
-            vars = self.createVars(i)
-            vars.update({SENDER_ID_ENV_VARIABLE: sender_id})
-
-            vars.update(os.environ)
+    def scenario_variables(self, scenario: Scenario, sender_id: str) -> VariableContext:
+        return VariableContext(
+            {SENDER_ID_ENV_VARIABLE: sender_id}, scenario.variables
+        ).with_defaults(self.run_variables)
 
-            user_input = {self.senderKey(): sender_id}
+    def interaction_variables(self, variables: VariableContext, step: int) -> Mapping:
+        return variables.with_defaults(self.createVars(step))
 
-            user_input.update(
-                self.interaction_loader.render_user_turn(interaction.user, vars)
-            )
+    def run(self, scenario: Scenario) -> Optional[FailedInteraction]:
+        sender_id = generate_tracker_id_from_scenario_name(time(), scenario.name)
+        self._reset_turn_latencies()
+        try:
+            return self._run(scenario, sender_id)
+        finally:
+            self._transport.end_conversation(self.url, sender_id)
 
+    def _run(self, scenario: Scenario, sender_id: str) -> Optional[FailedInteraction]:
+        for user_input, bot_turn, variables in self.user_inputs(scenario, sender_id):
+            sent_at = perf_counter()
             try:
                 actual_output: dict = self._send_input(user_input)
             except RestProtocolException as error:
@@ -55,13 +72,16 @@ class AbstractRestRunner(ScenarioRunner):
                     f'"{scenario}": failed sending user input "{user_input}", '
                     f'protocol error: "{error}"'
                 )
+            self._record_turn_latency(perf_counter() - sent_at)
 
             expected_output = self.interaction_loader.render_bot_turn(
-                interaction.bot, vars
+                bot_turn, variables
             )
 
             json_diff: JsonDiff = self.comparator.compare(
-                expected_output, actual_output
+                expected_output,
+                actual_output,
+                self.interaction_loader.bot_turn_rules(bot_turn),
             )
 
             if not json_diff.identical:
@@ -72,23 +92,37 @@ class AbstractRestRunner(ScenarioRunner):
 
         return None
 
-    def _send_input(self, json_input: dict) -> dict:
-        data = json.dumps(json_input)
-        response: Response = post(self.url, data=data)
-        try:
-            status_code = response.status_code
-            if status_code == 200:
-                return response.json()
-            else:
-                return {"status": status_code, "error": response.text}
-        except JSONDecodeError as error:
-            raise RestProtocolException(
-                f"{error}, server response received: {response.text}"
+    def user_inputs(
+        self, scenario: Scenario, sender_id: str
+    ) -> Iterator[Tuple[dict, InteractionTurn, Mapping]]:
+        """
+        User input of each turn of the scenario, rendered as it is consumed, along
+        with the bot turn expected in response and the variables to render it with.
+        """
+        interactions: List[Interaction] = self.resolve_interactions(scenario)
+        scenario_variables = self.scenario_variables(scenario, sender_id)
+
+        for step, interaction in enumerate(interactions, FIRST_STEP):
+            vars = self.interaction_variables(scenario_variables, step)
+
+            user_input = {self.senderKey(): sender_id}
+
+            user_input.update(
+                self.interaction_loader.render_user_turn(interaction.user, vars)
             )
+            yield user_input, interaction.bot, vars
+
+    def _send_input(self, json_input: dict) -> dict:
+        return send_input(self._post, self.url, json_input)
 
 
 @configure(
-    "protocol.url", InteractionLoader, ScenarioFragmentLoader, JsonDataComparator
+    "protocol.url",
+    InteractionLoader,
+    ScenarioFragmentLoader,
+    JsonDataComparator,
+    HttpTransport,
+    scope=Scope.THREAD,
 )
 class RestRunner(AbstractRestRunner):
     def senderKey(self):
@@ -96,7 +130,12 @@ class RestRunner(AbstractRestRunner):
 
 
 @configure(
-    "protocol.url", InteractionLoader, ScenarioFragmentLoader, JsonDataComparator
+    "protocol.url",
+    InteractionLoader,
+    ScenarioFragmentLoader,
+    JsonDataComparator,
+    HttpTransport,
+    scope=Scope.THREAD,
 )
 class IvrRunner(AbstractRestRunner):
     def senderKey(self):
@@ -104,3 +143,18 @@ class IvrRunner(AbstractRestRunner):
 
     def createVars(self, i):
         return {STEP_ID_ENV_VARIABLE: str(i)}
+
+
+def send_input(post: PostFunction, url: str, json_input: dict) -> dict:
+    data = json_codec.dumpb(json_input)
+    response = post(url, data)
+    try:
+        status_code = response.status_code
+        if status_code == 200:
+            return json_codec.loads(response.content)
+        else:
+            return {"status": status_code, "error": response.text}
+    except ValueError as error:
+        raise RestProtocolException(
+            f"{error}, server response received: {response.text}"
+        )
@@ -1,8 +1,21 @@
-from typing import Any, List, Optional, Union
+import os
+from threading import local
+from typing import Any, List, Mapping, Optional, Tuple, Union
 
+from .common.variables import VariableContext
 from .comparator import JsonDataComparator, JsonDiff
 from .interaction import Interaction, InteractionLoader
-from .scenario import Scenario, ScenarioFragmentLoader, ScenarioFragmentReference
+from .scenario import Scenario, ScenarioFragmentLoader
+
+# Step numbers given to the variables of each interaction.
+FIRST_STEP = 2
+# Sender the conversations are rendered for when comparing them across scenarios.
+CANONICAL_SENDER_ID = "canonical-sender"
+
+USER_INPUT_KEY = "user_input"
+EXPECTED_OUTPUT_KEY = "expected_output"
+ACTUAL_OUTPUT_KEY = "actual_output"
+OUTPUT_DIFF_KEY = "output_diff"
 
 
 class FailedInteraction:
@@ -18,6 +31,23 @@ class FailedInteraction:
         self.actual_output = actual_output
         self.output_diff = output_diff
 
+    def to_dict(self) -> dict:
+        return {
+            USER_INPUT_KEY: self.user_input,
+            EXPECTED_OUTPUT_KEY: self.expected_output,
+            ACTUAL_OUTPUT_KEY: self.actual_output,
+            OUTPUT_DIFF_KEY: self.output_diff.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FailedInteraction":
+        return cls(
+            data[USER_INPUT_KEY],
+            data[EXPECTED_OUTPUT_KEY],
+            data[ACTUAL_OUTPUT_KEY],
+            JsonDiff.from_dict(data[OUTPUT_DIFF_KEY]),
+        )
+
     def __repr__(self) -> str:
         return (
             f"<FailedInteraction, 'User Input: {self.user_input}, "
@@ -39,24 +69,60 @@ class ScenarioRunner:
         self.interaction_loader = interaction_loader
         self.scenario_fragment_loader = scenario_fragment_loader
         self.comparator = comparator
+        # Snapshot of the environment, shared by every scenario of the runner.
+        self.run_variables = VariableContext(dict(os.environ))
+        self._turn_latencies = local()
 
     def run(self, scenario: Scenario) -> Optional[FailedInteraction]:
         raise NotImplementedError
 
+    @property
+    def turn_latencies(self) -> List[float]:
+        """
+        Seconds waited for the bot at each turn of the last scenario run by the
+        current thread.
+        """
+        return getattr(self._turn_latencies, "values", [])
+
+    def _reset_turn_latencies(self, latencies: Optional[List[float]] = None) -> None:
+        self._turn_latencies.values = [] if latencies is None else latencies
+
+    def _record_turn_latency(self, latency: float) -> None:
+        self.turn_latencies.append(latency)
+
     def resolve_interactions(self, scenario: Scenario) -> List[Interaction]:
-        interactions: List[Interaction] = []
-        for step in scenario.steps:
-            if isinstance(step, Interaction):
-                interaction: Interaction = step
-                interactions.append(interaction)
-            elif isinstance(step, ScenarioFragmentReference):
-                scenario_fragment_reference: ScenarioFragmentReference = step
-                interactions.extend(
-                    self.scenario_fragment_loader.scenario_fragment(
-                        scenario_fragment_reference.name
-                    )
-                )
-            else:
-                raise Exception("Unsupported step type: '{step}'")
+        return self.scenario_fragment_loader.resolve_interactions(scenario)
 
-        return interactions
+    def scenario_variables(self, scenario: Scenario, sender_id: str) -> VariableContext:
+        """
+        Variables of the scenario variants take precedence over the environment.
+        """
+        return VariableContext(scenario.variables).with_defaults(self.run_variables)
+
+    def interaction_variables(self, variables: VariableContext, step: int) -> Mapping:
+        return variables
+
+    def render_conversation(self, scenario: Scenario) -> List[Tuple[Any, Any, Any]]:
+        """
+        Render the user and bot turns the scenario would go through, along with the
+        matcher rules of the bot turns, for a canonical sender so that scenarios
+        having the same conversation render identically.
+        """
+        scenario_variables = self.scenario_variables(scenario, CANONICAL_SENDER_ID)
+        conversation: List[Tuple[Any, Any, Any]] = []
+        for step, interaction in enumerate(
+            self.resolve_interactions(scenario), FIRST_STEP
+        ):
+            variables = self.interaction_variables(scenario_variables, step)
+            conversation.append(
+                (
+                    self.interaction_loader.render_user_turn(
+                        interaction.user, variables
+                    ),
+                    self.interaction_loader.render_bot_turn(interaction.bot, variables),
+                    self.interaction_loader.bot_turn_rules(
+                        interaction.bot
+                    ).declared_rules(),
+                )
+            )
+        return conversation
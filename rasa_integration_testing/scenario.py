@@ -1,15 +1,20 @@
+import csv
 import logging
 import os
+from itertools import product
 from pathlib import Path
-from typing import Dict, List, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 
 from ruamel.yaml import YAML
 
+from .common import json_codec
 from .common.configuration import configure
 from .interaction import Interaction, InteractionTurn
 
 logger = logging.getLogger(__name__)
 
+SCENARIOS_FOLDER = "scenarios"
+SCENARIOS_GLOB = "*.yml"
 SCENARIO_FRAGMENTS_FOLDER = "scenario_fragments"
 SCENARIO_FRAGMENTS_GLOB = "*.yml"
 
@@ -19,8 +24,16 @@ USER_KEY = "user"
 BOT_KEY = "bot"
 TEMPLATE_KEY = "template"
 VARIABLES_KEY = "variables"
+STEPS_KEY = "steps"
+MATRIX_KEY = "matrix"
+DATA_KEY = "data"
+
+CSV_EXTENSION = ".csv"
+JSON_LINES_EXTENSION = ".jsonl"
 
 CATCH_ALL_PATTERN = "/**/*.*"
+# Files of a folder given instead of a glob that aren't scenarios.
+DATA_EXTENSIONS = (CSV_EXTENSION, JSON_LINES_EXTENSION)
 
 
 class ScenarioParsingError(Exception):
@@ -48,10 +61,14 @@ class ScenarioFragmentReference:
 
 class Scenario:
     def __init__(
-        self, name: str, steps: List[Union[Interaction, ScenarioFragmentReference]]
+        self,
+        name: str,
+        steps: List[Union[Interaction, ScenarioFragmentReference]],
+        variables: Optional[Dict[str, Any]] = None,
     ):
         self.name = name
         self.steps = steps
+        self.variables = {} if variables is None else variables
 
     @classmethod
     def from_file(cls, name: str, path: Path) -> "Scenario":
@@ -64,13 +81,40 @@ class Scenario:
             if not isinstance(steps, list):
                 raise ScenarioParsingError("Invalid scenario format", path)
 
-            try:
-                return cls(name, [_create_scenario_step(step, path) for step in steps])
-            except TypeError as type_error:
-                raise ScenarioParsingError(str(type_error), path)
+            return cls(name, _create_scenario_steps(steps, path))
+
+    @classmethod
+    def iter_from_file(cls, name: str, path: Path) -> Iterator["Scenario"]:
+        """
+        Load a scenario, or lazily expand the variants of a scenario declaring a
+        parameter matrix and/or a data file. Variants are named after their
+        variables, for example `greeting[language=en,user=john]`.
+        """
+        logger.info(f"Loading scenario from: {path}")
+
+        with open(path) as scenario_file:
+            yaml = YAML()
+            definition = yaml.load(scenario_file)
+
+        if isinstance(definition, list):
+            yield cls(name, _create_scenario_steps(definition, path))
+            return
+
+        if (
+            not isinstance(definition, dict)
+            or STEPS_KEY not in definition
+            or not definition.keys() <= {STEPS_KEY, MATRIX_KEY, DATA_KEY}
+            or not isinstance(definition[STEPS_KEY], list)
+        ):
+            raise ScenarioParsingError("Invalid scenario format", path)
+
+        steps = _create_scenario_steps(definition[STEPS_KEY], path)
+        for variables in _scenario_variants(definition, path):
+            yield cls(_variant_name(name, variables), steps, variables)
 
     def __repr__(self):
-        return f"Scenario '{self.name}': steps={self.steps}"
+        variables = f", variables={self.variables}" if self.variables else ""
+        return f"Scenario '{self.name}': steps={self.steps}{variables}"
 
 
 @configure("tests_path")
@@ -79,6 +123,9 @@ class ScenarioFragmentLoader:
         self._scenario_fragments_path = tests_path / SCENARIO_FRAGMENTS_FOLDER
         self._scenario_fragments = self._load_scenario_fragments()
 
+    def reload(self) -> None:
+        self._scenario_fragments = self._load_scenario_fragments()
+
     def scenario_fragment(self, scenario_fragment_name: str) -> List[Interaction]:
         if not scenario_fragment_name in self._scenario_fragments.keys():
             raise Exception(
@@ -88,8 +135,29 @@ class ScenarioFragmentLoader:
 
         return self._scenario_fragments[scenario_fragment_name]
 
+    def resolve_interactions(self, scenario: Scenario) -> List[Interaction]:
+        interactions: List[Interaction] = []
+        for step in scenario.steps:
+            if isinstance(step, Interaction):
+                interaction: Interaction = step
+                interactions.append(interaction)
+            elif isinstance(step, ScenarioFragmentReference):
+                scenario_fragment_reference: ScenarioFragmentReference = step
+                interactions.extend(
+                    self.scenario_fragment(scenario_fragment_reference.name)
+                )
+            else:
+                raise Exception("Unsupported step type: '{step}'")
+
+        return interactions
+
     def _load_scenario_fragments(self) -> Dict[str, List[Interaction]]:
         def get_interactions(scenario: Scenario) -> List[Interaction]:
+            if scenario.variables:
+                raise Exception(
+                    f"Scenario fragment '{scenario.name}' cannot declare variants"
+                )
+
             steps = scenario.steps
             interactions: List[Interaction] = [
                 step for step in steps if isinstance(step, Interaction)
@@ -112,20 +180,86 @@ class ScenarioFragmentLoader:
 
 
 def load_scenarios(scenarios_path: Path, scenarios_glob: str) -> List[Scenario]:
-    if scenarios_path.joinpath(scenarios_glob).is_dir():
-        scenarios_glob += CATCH_ALL_PATTERN
+    return list(iter_scenarios(scenarios_path, scenarios_glob))
+
 
-    return [
-        Scenario.from_file(_scenario_name(scenario_file, scenarios_path), scenario_file)
-        for scenario_file in list(scenarios_path.rglob(scenarios_glob))
-    ]
+def iter_scenarios(scenarios_path: Path, scenarios_glob: str) -> Iterator[Scenario]:
+    """
+    Stream the scenarios matching the glob, expanding the variants of scenarios
+    declaring a parameter matrix or a data file only as they are consumed.
+    """
+    for scenario_file in scenario_files(scenarios_path, scenarios_glob):
+        yield from Scenario.iter_from_file(
+            scenario_name(scenario_file, scenarios_path), scenario_file
+        )
+
+
+def scenario_files(scenarios_path: Path, scenarios_glob: str) -> List[Path]:
+    if scenarios_path.joinpath(scenarios_glob).is_dir():
+        return [
+            scenario_file
+            for scenario_file in scenarios_path.rglob(
+                scenarios_glob + CATCH_ALL_PATTERN
+            )
+            if scenario_file.suffix not in DATA_EXTENSIONS
+        ]
+    return list(scenarios_path.rglob(scenarios_glob))
 
 
-def _scenario_name(scenario_file: Path, scenarios_path: Path) -> str:
+def scenario_name(scenario_file: Path, scenarios_path: Path) -> str:
     scenario_name = os.path.relpath(scenario_file, str(scenarios_path))
     return scenario_name[: scenario_name.rfind(EXTENSION_SEPARATOR)]
 
 
+def _create_scenario_steps(
+    steps: list, scenario_path: Path
+) -> List[Union[Interaction, ScenarioFragmentReference]]:
+    try:
+        return [_create_scenario_step(step, scenario_path) for step in steps]
+    except TypeError as type_error:
+        raise ScenarioParsingError(str(type_error), scenario_path)
+
+
+def _scenario_variants(definition: dict, scenario_path: Path) -> Iterator[dict]:
+    matrix = definition.get(MATRIX_KEY) or {}
+    if not isinstance(matrix, dict) or not all(
+        isinstance(values, list) and values for values in matrix.values()
+    ):
+        raise ScenarioParsingError(
+            f"Invalid scenario matrix, expected non empty lists of values: {matrix}",
+            scenario_path,
+        )
+
+    rows: Iterable[dict] = [{}]
+    if DATA_KEY in definition:
+        rows = _read_data_rows(scenario_path.parent / definition[DATA_KEY])
+
+    for row in rows:
+        for values in product(*matrix.values()):
+            yield {**row, **dict(zip(matrix.keys(), values))}
+
+
+def _read_data_rows(data_path: Path) -> Iterator[dict]:
+    with open(data_path, newline="") as data_file:
+        if data_path.suffix == CSV_EXTENSION:
+            yield from csv.DictReader(data_file)
+        elif data_path.suffix == JSON_LINES_EXTENSION:
+            yield from (json_codec.loads(line) for line in data_file if line.strip())
+        else:
+            raise ScenarioParsingError(
+                f"Unsupported scenario data file, use {CSV_EXTENSION} or "
+                f"{JSON_LINES_EXTENSION}",
+                data_path,
+            )
+
+
+def _variant_name(scenario_name: str, variables: dict) -> str:
+    if not variables:
+        return scenario_name
+    parameters = ",".join(f"{key}={value}" for key, value in variables.items())
+    return f"{scenario_name}[{parameters}]"
+
+
 def _create_scenario_step(
     step: Union[dict, str], scenario_path: Path
 ) -> Union[Interaction, ScenarioFragmentReference]:
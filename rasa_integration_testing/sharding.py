@@ -0,0 +1,97 @@
+import heapq
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+from .scenario import Scenario, ScenarioFragmentLoader
+
+SHARD_SEPARATOR = "/"
+# Seconds assumed for each turn when no scenario has a recorded duration.
+DEFAULT_TURN_DURATION = 1.0
+
+
+class Shard:
+    """
+    One of the parts a suite is split into, numbered from 1, so that each job of a
+    CI matrix runs its own part of the scenarios.
+    """
+
+    def __init__(self, index: int, count: int):
+        if count < 1 or not 1 <= index <= count:
+            raise ValueError(
+                f"Shard {index}{SHARD_SEPARATOR}{count} isn't between 1 and {count}."
+            )
+        self.index = index
+        self.count = count
+
+    @classmethod
+    def from_string(cls, shard: str) -> "Shard":
+        index, separator, count = shard.partition(SHARD_SEPARATOR)
+        if not separator or not index.isdigit() or not count.isdigit():
+            raise ValueError(f"Shard '{shard}' isn't formatted as i/N, e.g. 2/16.")
+        return cls(int(index), int(count))
+
+    def select(
+        self, scenarios: Iterable[Scenario], weights: Mapping[str, float]
+    ) -> List[Scenario]:
+        """
+        Scenarios of the shard, in their original order. Scenarios are given to the
+        least loaded shard, heaviest first, ties going by name and shard number, so
+        that every job computes the same partition whatever the order the scenarios
+        are found in.
+        """
+        scenarios = list(scenarios)
+        weighted_scenarios = sorted(
+            ((weights[scenario.name], scenario.name) for scenario in scenarios),
+            key=lambda weighted_scenario: (-weighted_scenario[0], weighted_scenario[1]),
+        )
+
+        shard_loads: List[Tuple[float, int]] = [
+            (0.0, index) for index in range(1, self.count + 1)
+        ]
+        shard_names = set()
+        for scenario_weight, name in weighted_scenarios:
+            load, index = heapq.heappop(shard_loads)
+            if index == self.index:
+                shard_names.add(name)
+            heapq.heappush(shard_loads, (load + scenario_weight, index))
+
+        return [scenario for scenario in scenarios if scenario.name in shard_names]
+
+    def __repr__(self) -> str:
+        return f"<Shard {self.index}{SHARD_SEPARATOR}{self.count}>"
+
+
+def scenario_weights(
+    scenarios: Iterable[Scenario],
+    scenario_fragment_loader: ScenarioFragmentLoader,
+    durations: Mapping[str, float],
+) -> Dict[str, float]:
+    """
+    Expected duration of each scenario, its recorded duration when known. Others
+    are estimated from their amount of turns, scenario fragments included, at the
+    mean recorded duration of a turn.
+    """
+    turn_counts = {
+        scenario.name: _turn_count(scenario, scenario_fragment_loader)
+        for scenario in scenarios
+    }
+    recorded_names = [name for name in turn_counts if name in durations]
+    recorded_turns = sum(turn_counts[name] for name in recorded_names)
+    turn_duration = (
+        sum(durations[name] for name in recorded_names) / recorded_turns
+        if recorded_turns
+        else DEFAULT_TURN_DURATION
+    )
+    return {
+        name: durations[name] if name in durations else turn_count * turn_duration
+        for name, turn_count in turn_counts.items()
+    }
+
+
+def _turn_count(
+    scenario: Scenario, scenario_fragment_loader: ScenarioFragmentLoader
+) -> int:
+    try:
+        return len(scenario_fragment_loader.resolve_interactions(scenario))
+    except Exception:
+        # Scenarios referring to missing fragments fail right away when run.
+        return len(scenario.steps)
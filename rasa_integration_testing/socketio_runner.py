@@ -1,162 +1,320 @@
+import asyncio
 import os
-from threading import Condition
-from typing import Any, List, Optional, Tuple
+from collections import deque
+from threading import Lock, Thread
+from time import perf_counter
+from typing import Any, Deque, List, Mapping, Optional, Tuple
+from uuid import uuid4
 
-from socketio import Client, ClientNamespace
+from socketio import AsyncClient, AsyncClientNamespace
 
+from .cassette import Cassette, CassetteStream
 from .common.configuration import configure
-from .comparator import JsonDataComparator
+from .common.variables import VariableContext
+from .comparator import INDEX_KEY_PREFIX, JsonDataComparator, JsonDiff
 from .interaction import Interaction, InteractionLoader
+from .matcher import NO_RULES, MatcherRules
 from .runner import FailedInteraction, ScenarioRunner
 from .scenario import Scenario, ScenarioFragmentLoader
 
 SESSION_ID_KEY = "session_id"
 EVENT_BOT_UTTERED = "bot_uttered"
 EVENT_USER_UTTERED = "user_uttered"
+EVENT_SESSION_REQUEST = "session_request"
 ENV_BOT_RESPONSE_TIMEOUT = "BOT_RESPONSE_TIMEOUT"
 
 BOT_RESPONSE_TIMEOUT = float(os.environ.get(ENV_BOT_RESPONSE_TIMEOUT, 6.0))
+# Bot messages with more values than this are compared in a thread, so that large
+# payloads don't hold up the other conversations of the event loop.
+MAX_ON_LOOP_COMPARISON_VALUES = 500
+# Seconds to wait for the disconnect packets to be sent to the server.
+DISCONNECT_TIMEOUT = 1.0
 IS_USER_MESSAGE = True
 IS_BOT_MESSAGE = False
 
+# Whether the message is a user input, the message and its matcher rules.
+StackEntry = Tuple[bool, dict, MatcherRules]
+# A bot message and when it was received.
+ReceivedMessage = Tuple[Any, float]
+
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+_event_loop_lock = Lock()
+
 
 @configure(
-    "protocol.url", InteractionLoader, ScenarioFragmentLoader, JsonDataComparator
+    "protocol.url",
+    InteractionLoader,
+    ScenarioFragmentLoader,
+    JsonDataComparator,
+    Cassette,
 )
 class SocketIORunner(ScenarioRunner):
-    def run(self, scenario: Scenario) -> Optional[FailedInteraction]:
-        client: Client = Client()
+    """
+    Conversations of every runner thread are driven by a single asyncio event loop
+    of the process, so that hundreds of them can be run at once with as many
+    workers, each thread only waiting for the result of its own conversation.
 
+    The events of each conversation are recorded into the cassette when it's
+    recording. When it's replaying, no connection is made and the bot messages
+    recorded in response to each event are received as soon as it is emitted.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        interaction_loader: InteractionLoader,
+        scenario_fragment_loader: ScenarioFragmentLoader,
+        comparator: JsonDataComparator,
+        cassette: Optional[Cassette] = None,
+    ):
+        super().__init__(url, interaction_loader, scenario_fragment_loader, comparator)
+        self.cassette = cassette or Cassette.constructor()
+
+    def run(self, scenario: Scenario) -> Optional[FailedInteraction]:
+        # Templates are rendered by the runner thread, the event loop only drives
+        # the conversations.
         interactions: List[Interaction] = self.resolve_interactions(scenario)
-        runner_namespace = SocketIORunnerClientNamespace(
-            self, interactions.copy(), dict(os.environ)
+        expected_messages = _create_interaction_stack(
+            self.interaction_loader,
+            interactions,
+            VariableContext(scenario.variables).with_defaults(self.run_variables),
         )
+        result, turn_latencies = asyncio.run_coroutine_threadsafe(
+            self.run_async(expected_messages), shared_event_loop()
+        ).result()
+        self._reset_turn_latencies(turn_latencies)
+        return result
 
-        client.register_namespace(runner_namespace)
-
+    async def run_async(
+        self, expected_messages: List[StackEntry]
+    ) -> Tuple[Optional[FailedInteraction], List[float]]:
+        conversation = SocketIOConversation(self, expected_messages)
+        if self.cassette.replaying:
+            conversation.stream = self.cassette.stream(self.url, uuid4().hex)
+            try:
+                return await conversation.run(), conversation.turn_latencies
+            finally:
+                conversation.stream.close()
+
+        client = AsyncClient()
+        client.register_namespace(conversation)
         # have to force polling or else python-socketio tries to close
         # non-existant websockets which produces warning logs.
-        client.connect(self.url, transports="polling")
-        result = runner_namespace.run()
-        client.disconnect()
+        await client.connect(self.url, transports="polling")
+        if self.cassette.recording:
+            conversation.stream = self.cassette.stream(self.url, client.sid)
+        try:
+            result = await conversation.run()
+        finally:
+            if conversation.stream is not None:
+                conversation.stream.close()
+            # The Socket.IO disconnect ends the session on the server, but waits
+            # for the server to answer the pending long polling request, which it
+            # only does at its next ping. The transport is dropped once the
+            # disconnect packets queued by the client are sent.
+            disconnect = asyncio.ensure_future(client.disconnect())
+            try:
+                await asyncio.wait_for(client.eio.queue.join(), DISCONNECT_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                disconnect.cancel()
+                await client.eio.disconnect(abort=True)
+
+        return result, conversation.turn_latencies
+
+
+class SocketIOConversation(AsyncClientNamespace):
+    """
+    State machine of a scenario over the queue of its expected messages. Bot
+    messages are queued as they are received and handled in order, each one sending
+    the user inputs expected before it, being compared with the next expected bot
+    message, then sending the user input following it. The conversation ends at the
+    first difference or once the bot stays silent for the response timeout.
+    """
 
-        return result
-
-
-class SocketIORunnerClientNamespace(ClientNamespace):
     def __init__(
-        self,
-        socketio_runner: SocketIORunner,
-        interactions: List[Interaction],
-        substitutes: dict = {},
+        self, socketio_runner: SocketIORunner, expected_messages: List[StackEntry]
     ):
         super().__init__()
         self.socketio_runner = socketio_runner
-        self._interaction_stack: List[Tuple[bool, dict]] = _create_interaction_stack(
-            socketio_runner.interaction_loader, interactions, substitutes
-        )
-        self._timeout_condition = Condition()
-        self._failed_interaction: Optional[FailedInteraction] = None
+        self._expected_messages: Deque[StackEntry] = deque(expected_messages)
+        self._received_messages: Optional["asyncio.Queue[ReceivedMessage]"] = None
         self._current_user_input: dict = {}
-
-    def session_request(self) -> None:
-        self.emit("session_request")
-
-    def on_bot_uttered(self, data: Any) -> None:
-        self._timeout_notify()
-
-        is_user_message, message = self._pop_interaction_stack()
-
-        while is_user_message:
-            self._send_user_input(message)
-            is_user_message, message = self._pop_interaction_stack()
-
-        json_diff = self.socketio_runner.comparator.compare(message, data)
-
-        if not json_diff.identical and self._failed_interaction is None:
-            self._failed_interaction = FailedInteraction(
-                self._current_user_input, message, data, json_diff,
-            )
-
+        self._user_input_sent_at: Optional[float] = None
+        self.turn_latencies: List[float] = []
+        # Cassette stream of the conversation, when recording or replaying.
+        self.stream: Optional[CassetteStream] = None
+
+    async def on_bot_uttered(self, data: Any) -> None:
+        if self.stream is not None:
+            self.stream.received(data)
+        self._bot_messages().put_nowait((data, perf_counter()))
+
+    async def run(self) -> Optional[FailedInteraction]:
+        await self._emit(EVENT_SESSION_REQUEST)
         if self._next_is_user_message():
-            _, message = self._pop_interaction_stack()
-            self._send_user_input(message)
+            _, message, _ = self._expected_messages.popleft()
+            await self._send_user_input(message)
 
-    def _next_is_user_message(self) -> bool:
-        if len(self._interaction_stack) > 0:
-            is_user_message, _ = self._interaction_stack[0]
-            return is_user_message
-        return False
-
-    def _pop_interaction_stack(self) -> Tuple[bool, dict]:
-        return (
-            self._interaction_stack.pop(0)
-            if len(self._interaction_stack) > 0
-            else (False, {})
-        )
+        while True:
+            try:
+                data, received_at = await self._next_bot_message()
+            except asyncio.TimeoutError:
+                break
+
+            failed_interaction = await self._handle_bot_message(data, received_at)
+            if failed_interaction is not None:
+                return failed_interaction
 
-    def _get_remaining_bot_messages(self) -> List[dict]:
-        return [
+        remaining_messages = [
             message
-            for is_user_input, message in self._interaction_stack
+            for is_user_input, message, _ in self._expected_messages
             if not is_user_input
         ]
+        json_diff = self.socketio_runner.comparator.compare({}, remaining_messages)
+        if not json_diff.identical:
+            return FailedInteraction(
+                self._current_user_input, {}, remaining_messages, json_diff
+            )
+        return None
+
+    async def _handle_bot_message(
+        self, data: Any, received_at: float
+    ) -> Optional[FailedInteraction]:
+        if self._user_input_sent_at is not None:
+            self.turn_latencies.append(received_at - self._user_input_sent_at)
+            self._user_input_sent_at = None
+
+        while self._next_is_user_message():
+            _, message, _ = self._expected_messages.popleft()
+            await self._send_user_input(message)
+        _, message, rules = (
+            self._expected_messages.popleft()
+            if self._expected_messages
+            else (IS_BOT_MESSAGE, {}, NO_RULES)
+        )
 
-    def _timeout_notify(self):
-        with self._timeout_condition:
-            self._timeout_condition.notify()
+        json_diff = await self._compare(message, data, rules)
+        if not json_diff.identical:
+            return FailedInteraction(self._current_user_input, message, data, json_diff)
 
-    def _timeout_await(self) -> bool:
-        with self._timeout_condition:
-            return self._timeout_condition.wait(BOT_RESPONSE_TIMEOUT)
+        if self._next_is_user_message():
+            _, message, _ = self._expected_messages.popleft()
+            await self._send_user_input(message)
+        return None
+
+    async def _compare(
+        self, expected: Any, actual: Any, rules: MatcherRules
+    ) -> JsonDiff:
+        compare = self.socketio_runner.comparator.compare
+        if not _has_more_values(actual, MAX_ON_LOOP_COMPARISON_VALUES):
+            return compare(expected, actual, rules)
+        return await asyncio.get_event_loop().run_in_executor(
+            None, compare, expected, actual, rules
+        )
 
-    def _send_user_input(self, message: dict) -> None:
-        self._timeout_notify()
-        self._current_user_input = {SESSION_ID_KEY: self.client.sid}
+    async def _send_user_input(self, message: dict) -> None:
+        session_id = (
+            self.stream.conversation_id if self.stream is not None else self.client.sid
+        )
+        self._current_user_input = {SESSION_ID_KEY: session_id}
         self._current_user_input.update(message)
-        self.emit(EVENT_USER_UTTERED, self._current_user_input)
-
-    def run(self) -> Optional[FailedInteraction]:
-        self.session_request()
-
-        is_user_input, message = self._pop_interaction_stack()
-        if is_user_input:
-            self._send_user_input(message)
-
-        while self._failed_interaction is None and self._timeout_await():
-            pass
-
-        remaining_messages = self._get_remaining_bot_messages()
-        json_diff = self.socketio_runner.comparator.compare({}, remaining_messages)
+        self._user_input_sent_at = perf_counter()
+        await self._emit(EVENT_USER_UTTERED, self._current_user_input)
+
+    async def _emit(self, event: str, data: Any = None) -> None:
+        if self.stream is None:
+            await self.emit(event, data)
+            return
+
+        for message in self.stream.emitted(event, data):
+            await self.on_bot_uttered(message)
+        if not self.stream.cassette.replaying:
+            await self.emit(event, data)
+
+    async def _next_bot_message(self) -> ReceivedMessage:
+        if self.stream is not None and self.stream.cassette.replaying:
+            # Replayed messages are all received by the time they are expected.
+            if self._bot_messages().empty():
+                raise asyncio.TimeoutError()
+            return self._bot_messages().get_nowait()
+        return await asyncio.wait_for(self._bot_messages().get(), BOT_RESPONSE_TIMEOUT)
 
-        if not json_diff.identical and self._failed_interaction is None:
-            return FailedInteraction(
-                self._current_user_input, {}, remaining_messages, json_diff,
-            )
-
-        return self._failed_interaction
+    def _next_is_user_message(self) -> bool:
+        return bool(self._expected_messages) and self._expected_messages[0][0]
+
+    def _bot_messages(self) -> "asyncio.Queue[ReceivedMessage]":
+        """
+        Created on first use to be bound to the event loop of the conversation.
+        """
+        if self._received_messages is None:
+            self._received_messages = asyncio.Queue()
+        return self._received_messages
+
+
+def shared_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Event loop of the process running the Socket.IO conversations, started in a
+    daemon thread on first use.
+    """
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = asyncio.new_event_loop()
+            Thread(target=_event_loop.run_forever, daemon=True).start()
+    return _event_loop
+
+
+def _has_more_values(node: Any, max_values: int) -> bool:
+    """
+    Whether the node has more nested values than the maximum, stopping the count as
+    soon as it is reached.
+    """
+    pending_nodes = [node]
+    value_count = 0
+    while pending_nodes:
+        value_count += 1
+        if value_count > max_values:
+            return True
+        current_node = pending_nodes.pop()
+        if isinstance(current_node, dict):
+            pending_nodes.extend(current_node.values())
+        elif isinstance(current_node, list):
+            pending_nodes.extend(current_node)
+    return False
 
 
 def _create_interaction_stack(
     interaction_loader: InteractionLoader,
     interactions: List[Interaction],
-    substitutes: dict,
-) -> List[Tuple[bool, dict]]:
-    rendered_messages: List[Tuple[bool, dict]] = []
+    variables: Mapping,
+) -> List[StackEntry]:
+    """
+    Bot messages are compared one at a time, each with the matcher rules of its
+    entry in the bot turn.
+    """
+    rendered_messages: List[StackEntry] = []
 
     for interaction in interactions:
         rendered_messages.append(
             (
                 IS_USER_MESSAGE,
-                interaction_loader.render_user_turn(interaction.user, substitutes),
+                interaction_loader.render_user_turn(interaction.user, variables),
+                NO_RULES,
             )
         )
         rendered_bot_message = interaction_loader.render_bot_turn(
-            interaction.bot, substitutes
+            interaction.bot, variables
         )
+        rules = interaction_loader.bot_turn_rules(interaction.bot)
 
-        for message in _split_rendered_messages(rendered_bot_message):
-            rendered_messages.append((IS_BOT_MESSAGE, message))
+        for index, message in enumerate(
+            _split_rendered_messages(rendered_bot_message), 1
+        ):
+            rendered_messages.append(
+                (IS_BOT_MESSAGE, message, rules.child(f"{INDEX_KEY_PREFIX}{index}"))
+            )
 
     return rendered_messages
 
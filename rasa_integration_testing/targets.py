@@ -0,0 +1,205 @@
+from concurrent.futures.thread import ThreadPoolExecutor
+from threading import Lock, local
+from time import perf_counter, time
+from typing import Any, List, Optional, Tuple
+
+from .common.utils import generate_tracker_id_from_scenario_name
+from .history import PERCENTILE, percentile
+from .rest_runner import AbstractRestRunner, send_input
+from .runner import FailedInteraction
+from .scenario import Scenario
+from .transport import HttpTransport, PostFunction
+
+ERROR_KEY = "error"
+
+
+class TargetResult:
+    """
+    Outcome of a scenario on one target: the interaction it failed, if any, and the
+    seconds waited for the target at each turn it was sent.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        failed_interaction: Optional[FailedInteraction] = None,
+        turn_latencies: Optional[List[float]] = None,
+    ):
+        self.target = target
+        self.failed_interaction = failed_interaction
+        self.turn_latencies = [] if turn_latencies is None else turn_latencies
+
+    @property
+    def failed(self) -> bool:
+        return self.failed_interaction is not None
+
+    def __repr__(self) -> str:
+        return (
+            f"<TargetResult {self.target}, failed: {self.failed}, "
+            f"turns: {len(self.turn_latencies)}>"
+        )
+
+
+class TargetStatistics:
+    def __init__(self, target: str):
+        self.target = target
+        self.scenario_count = 0
+        self.failure_count = 0
+        self.turn_latencies: List[float] = []
+
+    @property
+    def mean_turn_latency(self) -> Optional[float]:
+        if not self.turn_latencies:
+            return None
+        return sum(self.turn_latencies) / len(self.turn_latencies)
+
+    @property
+    def turn_latency_p95(self) -> Optional[float]:
+        if not self.turn_latencies:
+            return None
+        return percentile(sorted(self.turn_latencies), PERCENTILE)
+
+    def __repr__(self) -> str:
+        return (
+            f"<TargetStatistics {self.target}, "
+            f"failed {self.failure_count}/{self.scenario_count}>"
+        )
+
+
+class TargetReport:
+    """
+    Pass rate and turn latencies of each target, accumulated from the scenario
+    threads as results come in.
+    """
+
+    def __init__(self, targets: List[str]):
+        self._statistics = {target: TargetStatistics(target) for target in targets}
+        self._lock = Lock()
+
+    def record(self, results: List[TargetResult]) -> None:
+        with self._lock:
+            for result in results:
+                statistics = self._statistics[result.target]
+                statistics.scenario_count += 1
+                statistics.failure_count += result.failed
+                statistics.turn_latencies.extend(result.turn_latencies)
+
+    @property
+    def statistics(self) -> List[TargetStatistics]:
+        with self._lock:
+            return list(self._statistics.values())
+
+    @property
+    def failed(self) -> bool:
+        return any(statistics.failure_count for statistics in self.statistics)
+
+
+class MultiTargetRunner:
+    """
+    Runs each scenario against several bots at once, e.g. two models being compared.
+    Every turn is rendered once and sent to all the targets concurrently. A target
+    failing a turn, or that couldn't be sent it, isn't sent the rest of the scenario.
+
+    In differential mode, the first target is the baseline: the responses of the
+    other targets are compared with its response instead of the bot turn templates,
+    so that changes in behavior show up even where the templates are loose. When the
+    baseline can't be sent a turn, the turn is compared with the templates instead
+    and the scenario ends there.
+    """
+
+    def __init__(
+        self,
+        targets: List[str],
+        transport: HttpTransport,
+        differential: bool = False,
+        max_workers: int = 1,
+    ):
+        self.targets = targets
+        self.differential = differential
+        self._transport = transport
+        self._posts = local()
+        self._executor = ThreadPoolExecutor(max_workers * len(targets))
+
+    def run(self, runner: AbstractRestRunner, scenario: Scenario) -> List[TargetResult]:
+        """
+        Results of the scenario on each target, in the order of the targets. The
+        runner renders the turns and compares the responses.
+        """
+        sender_id = generate_tracker_id_from_scenario_name(time(), scenario.name)
+        results = [TargetResult(target) for target in self.targets]
+        try:
+            self._run(runner, scenario, sender_id, results)
+        finally:
+            for target in self.targets:
+                self._transport.end_conversation(target, sender_id)
+        return results
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def _run(
+        self,
+        runner: AbstractRestRunner,
+        scenario: Scenario,
+        sender_id: str,
+        results: List[TargetResult],
+    ) -> None:
+        baseline = results[0]
+        active_results = list(results)
+
+        for user_input, bot_turn, variables in runner.user_inputs(scenario, sender_id):
+            responses = list(
+                self._executor.map(
+                    lambda result: self._send(result.target, user_input),
+                    active_results,
+                )
+            )
+            for result, (_, latency, _) in zip(active_results, responses):
+                result.turn_latencies.append(latency)
+
+            compared_to_baseline = self.differential and not responses[0][2]
+            rules = runner.interaction_loader.bot_turn_rules(bot_turn)
+            expected_output = (
+                responses[0][0]
+                if compared_to_baseline
+                else runner.interaction_loader.render_bot_turn(bot_turn, variables)
+            )
+            for result, (actual_output, _, failed) in zip(active_results, responses):
+                if compared_to_baseline and result is baseline:
+                    continue
+                json_diff = runner.comparator.compare(
+                    expected_output, actual_output, rules
+                )
+                if failed or not json_diff.identical:
+                    result.failed_interaction = FailedInteraction(
+                        user_input, expected_output, actual_output, json_diff
+                    )
+
+            active_results = [result for result in active_results if not result.failed]
+            if baseline.failed or len(active_results) == (
+                1 if self.differential else 0
+            ):
+                break
+
+    def _send(self, target: str, user_input: dict) -> Tuple[Any, float, bool]:
+        """
+        Output of the target, seconds waited for it and whether sending failed. The
+        output of a failed send is its error, so that only this target fails.
+        """
+        sent_at = perf_counter()
+        try:
+            output = send_input(self._post(), target, user_input)
+            failed = False
+        except Exception as error:
+            output = {ERROR_KEY: f"{error.__class__.__name__}: {error}"}
+            failed = True
+        return output, perf_counter() - sent_at, failed
+
+    def _post(self) -> PostFunction:
+        """
+        Client of the current sending thread, HTTP/1.1 sessions can't be shared.
+        """
+        post: Optional[PostFunction] = getattr(self._posts, "post", None)
+        if post is None:
+            post = self._posts.post = self._transport.post_function()
+        return post
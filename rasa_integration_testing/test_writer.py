@@ -1,59 +1,135 @@
-import json
 import os
+import shutil
+import tempfile
+from threading import Lock
+from typing import Dict, List, Tuple
 
 from ruamel.yaml import YAML
 
+from .common import json_codec
+
 USER = "user"
 BOT = "bot"
 
 INTERACTION_EXTENSION = "json"
 SCENARIO_FILENAME = "scenario.yml"
+TEMPORARY_DIRECTORY_PREFIX = "."
 
 
 def write_user_input(test_output_directory: str, sender_id: str, user_input: dict):
-    _write_interaction(test_output_directory, sender_id, USER, user_input)
+    ScenarioWriter(test_output_directory).write_user_input(sender_id, user_input)
 
 
 def write_bot_output(test_output_directory: str, sender_id: str, bot_output: dict):
-    interaction_count = _write_interaction(
-        test_output_directory, sender_id, BOT, bot_output
+    ScenarioWriter(test_output_directory).write_bot_output(sender_id, bot_output)
+
+
+class ScenarioWriter:
+    """
+    Writes the turns of conversations as they happen. The next interaction number
+    of each interaction type directory is kept, so directories are only listed
+    once by a writer.
+    """
+
+    def __init__(self, test_output_directory: str):
+        self.test_output_directory = test_output_directory
+        self._interaction_counts: Dict[str, int] = {}
+        self._lock = Lock()
+
+    def write_user_input(self, sender_id: str, user_input: dict):
+        self._write_interaction(sender_id, USER, user_input)
+
+    def write_bot_output(self, sender_id: str, bot_output: dict):
+        interaction_count = self._write_interaction(sender_id, BOT, bot_output)
+
+        _write_scenario(self.test_output_directory, sender_id, interaction_count)
+
+    def _write_interaction(
+        self, sender_id: str, interaction_type: str, interaction_content: dict
+    ) -> int:
+        session_directory = f"{self.test_output_directory}/{sender_id}"
+        interaction_type_directory = f"{session_directory}/{interaction_type}"
+
+        with self._lock:
+            if interaction_type_directory not in self._interaction_counts or (
+                not os.path.isdir(interaction_type_directory)
+            ):
+                os.makedirs(interaction_type_directory, exist_ok=True)
+                self._interaction_counts[interaction_type_directory] = len(
+                    os.listdir(interaction_type_directory)
+                )
+            interaction_count = self._interaction_counts[interaction_type_directory] + 1
+            self._interaction_counts[interaction_type_directory] = interaction_count
+
+        _write_interaction_file(
+            interaction_type_directory,
+            interaction_type,
+            interaction_count,
+            interaction_content,
+        )
+        return interaction_count
+
+
+def write_conversation(
+    test_output_directory: str, session_name: str, interactions: List[Tuple[dict, dict]]
+):
+    """
+    Write a whole conversation at once. It is written to a temporary directory
+    first and then moved to its final location, so readers never see it partially.
+    """
+    temporary_directory = tempfile.mkdtemp(
+        prefix=f"{TEMPORARY_DIRECTORY_PREFIX}{session_name}", dir=test_output_directory
     )
-
-    _write_scenario(test_output_directory, sender_id, interaction_count)
+    try:
+        for interaction_type in (USER, BOT):
+            os.makedirs(f"{temporary_directory}/{interaction_type}")
+
+        for interaction_index, (user_input, bot_output) in enumerate(interactions, 1):
+            _write_interaction_file(
+                f"{temporary_directory}/{USER}", USER, interaction_index, user_input
+            )
+            _write_interaction_file(
+                f"{temporary_directory}/{BOT}", BOT, interaction_index, bot_output
+            )
+
+        _write_scenario_file(
+            f"{temporary_directory}/{SCENARIO_FILENAME}", len(interactions)
+        )
+        os.rename(temporary_directory, f"{test_output_directory}/{session_name}")
+    except BaseException:
+        shutil.rmtree(temporary_directory, ignore_errors=True)
+        raise
 
 
-def _write_interaction(
-    test_output_directory: str,
-    sender_id: str,
+def _write_interaction_file(
+    interaction_type_directory: str,
     interaction_type: str,
+    interaction_index: int,
     interaction_content: dict,
-) -> int:
-    session_directory = f"{test_output_directory}/{sender_id}"
-    interaction_type_directory = f"{session_directory}/{interaction_type}"
-    os.makedirs(interaction_type_directory, exist_ok=True)
-
-    interaction_count = len(os.listdir(interaction_type_directory)) + 1
-
+):
     interaction_filename = (
         f"{interaction_type_directory}/"
-        f"{interaction_type}{interaction_count}.{INTERACTION_EXTENSION}"
+        f"{interaction_type}{interaction_index}.{INTERACTION_EXTENSION}"
     )
 
-    with open(interaction_filename, "w") as interaction_file:
+    with open(interaction_filename, "w", encoding="utf-8") as interaction_file:
         interaction_file.write(
-            json.dumps(interaction_content, sort_keys=True, indent=2)
+            json_codec.dumps(interaction_content, sort_keys=True, indent=True)
         )
 
-    return interaction_count
-
 
 def _write_scenario(test_output_directory: str, sender_id: str, interaction_count: int):
+    _write_scenario_file(
+        f"{test_output_directory}/{sender_id}/{SCENARIO_FILENAME}", interaction_count
+    )
+
+
+def _write_scenario_file(scenario_filename: str, interaction_count: int):
     interactions = [
         {USER: USER + str(interaction_index), BOT: BOT + str(interaction_index)}
         for interaction_index in range(1, interaction_count + 1)
     ]
 
-    scenario_filename = f"{test_output_directory}/{sender_id}/{SCENARIO_FILENAME}"
-    with open(scenario_filename, "w") as scenario_file:
+    with open(scenario_filename, "w", encoding="utf-8") as scenario_file:
         yaml = YAML()
         yaml.dump(interactions, scenario_file)
@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from threading import BoundedSemaphore, Lock
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ruamel.yaml import YAML
+
+from .common import json_codec
+from .interaction import (
+    BOT_FOLDER,
+    INTERACTION_TURN_EXTENSION,
+    INTERACTIONS_FOLDER,
+    USER_FOLDER,
+)
+from .scenario import BOT_KEY, SCENARIOS_FOLDER, USER_KEY
+
+SQLITE_HEADER = b"SQLite format 3\x00"
+SQLITE_EVENTS_QUERY = "SELECT sender_id, data FROM events ORDER BY sender_id, id"
+
+SENDER_ID_KEY = "sender_id"
+EVENTS_KEY = "events"
+EVENT_KEY = "event"
+TEXT_KEY = "text"
+DATA_KEY = "data"
+MESSAGE_KEY = "message"
+USER_EVENT = "user"
+BOT_EVENT = "bot"
+SESSION_STARTED_EVENT = "session_started"
+
+TEMPLATES_FOLDER = "tracker"
+SCENARIO_EXTENSION = "yml"
+DIGEST_SIZE = 16
+JINJA_MARKERS = ("{{", "{%", "{#")
+
+Turn = Tuple[dict, List[dict]]
+Conversation = List[Turn]
+# Event of a sender, None once the sender's conversation is complete.
+SenderEvent = Tuple[Optional[str], Optional[dict]]
+
+
+class TrackerExportConverter:
+    """
+    Streams the conversations of a tracker store export and writes each distinct
+    one as a scenario. Scenarios and interaction templates are named after their
+    content, so that identical turns share the same template and the files already
+    in the output path tell what was written, conversations converted before
+    included.
+
+    Only the digests of the conversations being written are kept in memory, and at
+    most a couple of conversations per worker wait to be written.
+    """
+
+    def __init__(self, output_path: Path, max_workers: int):
+        self._output_path = output_path
+        self._max_workers = max_workers
+        self._pending_conversations: Set[bytes] = set()
+        self._pending_lock = Lock()
+        self.conversation_count = 0
+        self.scenario_count = 0
+
+    def convert(self, export_path: Path) -> None:
+        for folder in (USER_FOLDER, BOT_FOLDER):
+            os.makedirs(self._templates_path(folder), exist_ok=True)
+        os.makedirs(self._output_path / SCENARIOS_FOLDER, exist_ok=True)
+
+        pending_writes = BoundedSemaphore(self._max_workers * 2)
+        futures: List[Future] = []
+        with ThreadPoolExecutor(self._max_workers) as executor:
+            for conversation in read_conversations(export_path):
+                self.conversation_count += 1
+                digest = _digest(conversation)
+                # A conversation leaves the pending ones once its scenario exists.
+                with self._pending_lock:
+                    if (
+                        digest in self._pending_conversations
+                        or self._scenario_path(digest).exists()
+                    ):
+                        continue
+                    self._pending_conversations.add(digest)
+                self.scenario_count += 1
+
+                pending_writes.acquire()
+                future = executor.submit(self._write_scenario, digest, conversation)
+                future.add_done_callback(
+                    partial(self._scenario_written, pending_writes, digest)
+                )
+                futures = [
+                    pending for pending in futures if not _raise_if_done(pending)
+                ]
+                futures.append(future)
+
+        for future in futures:
+            future.result()
+
+    def _write_scenario(self, digest: bytes, conversation: Conversation) -> None:
+        steps = [
+            {
+                USER_KEY: self._write_template(USER_FOLDER, user_input),
+                BOT_KEY: self._write_template(BOT_FOLDER, bot_output),
+            }
+            for user_input, bot_output in conversation
+        ]
+
+        with _atomic_file(self._scenario_path(digest)) as scenario_file:
+            YAML().dump(steps, scenario_file)
+
+    def _scenario_written(
+        self, pending_writes: BoundedSemaphore, digest: bytes, _: Future
+    ) -> None:
+        with self._pending_lock:
+            self._pending_conversations.discard(digest)
+        pending_writes.release()
+
+    def _write_template(self, folder: str, content: object) -> str:
+        rendered_content = json.dumps(content, sort_keys=True, indent=2)
+        name = hashlib.blake2b(
+            rendered_content.encode(), digest_size=DIGEST_SIZE
+        ).hexdigest()
+        template_path = (
+            self._templates_path(folder) / f"{name}.{INTERACTION_TURN_EXTENSION}"
+        )
+        # Templates are only renamed into place once complete, and threads writing
+        # the same template at once write the same content.
+        if not template_path.exists():
+            if any(marker in rendered_content for marker in JINJA_MARKERS):
+                rendered_content = f"{{% raw %}}{rendered_content}{{% endraw %}}"
+            with _atomic_file(template_path) as template_file:
+                template_file.write(rendered_content)
+
+        return f"{TEMPLATES_FOLDER}/{name}"
+
+    def _scenario_path(self, digest: bytes) -> Path:
+        return (
+            self._output_path
+            / SCENARIOS_FOLDER
+            / f"{digest.hex()}.{SCENARIO_EXTENSION}"
+        )
+
+    def _templates_path(self, folder: str) -> Path:
+        return self._output_path / INTERACTIONS_FOLDER / folder / TEMPLATES_FOLDER
+
+
+def read_conversations(export_path: Path) -> Iterator[Conversation]:
+    """
+    Read the conversations of a SQL tracker store SQLite file, or of a JSON lines
+    file of trackers or of events with their sender id. A tracker line holds whole
+    conversations. The events of different senders can be interleaved in a JSON
+    lines file of events, the conversations of its senders are then only complete
+    at the end of the file.
+    """
+    with open(export_path, "rb") as export_file:
+        is_sqlite = export_file.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+
+    if is_sqlite:
+        yield from _split_conversations(_read_sqlite_events(export_path), True)
+    else:
+        yield from _split_conversations(_read_json_lines_events(export_path), False)
+
+
+def _read_sqlite_events(export_path: Path) -> Iterator[SenderEvent]:
+    connection = sqlite3.connect(f"file:{export_path}?mode=ro", uri=True)
+    try:
+        for sender_id, data in connection.execute(SQLITE_EVENTS_QUERY):
+            yield sender_id, json_codec.loads(data)
+    finally:
+        connection.close()
+
+
+def _read_json_lines_events(export_path: Path) -> Iterator[SenderEvent]:
+    with open(export_path, "r") as export_file:
+        for line in export_file:
+            if line.strip():
+                line_content = json_codec.loads(line)
+                sender_id = line_content.get(SENDER_ID_KEY)
+                if EVENTS_KEY in line_content:
+                    for event in line_content[EVENTS_KEY]:
+                        yield sender_id, event
+                    yield sender_id, None
+                else:
+                    yield sender_id, line_content
+
+
+def _split_conversations(
+    sender_events: Iterable[SenderEvent], sorted_by_sender: bool
+) -> Iterator[Conversation]:
+    """
+    Conversations of the senders as they end. When the events are sorted by sender,
+    the conversations of the previous senders end with their last event.
+    """
+    conversations: Dict[Optional[str], Conversation] = {}
+    for sender_id, event in sender_events:
+        if event is None:
+            conversation = conversations.pop(sender_id, [])
+            if conversation:
+                yield conversation
+            continue
+        if sorted_by_sender and sender_id not in conversations:
+            yield from _end_conversations(conversations)
+
+        event_type = event.get(EVENT_KEY)
+        conversation = conversations.setdefault(sender_id, [])
+        if event_type == SESSION_STARTED_EVENT:
+            if conversation:
+                yield conversation
+            conversations[sender_id] = []
+        elif event_type == USER_EVENT:
+            conversation.append(({MESSAGE_KEY: event.get(TEXT_KEY)}, []))
+        elif event_type == BOT_EVENT and conversation:
+            conversation[-1][1].append(_bot_message(event))
+
+    yield from _end_conversations(conversations)
+
+
+def _end_conversations(
+    conversations: Dict[Optional[str], Conversation],
+) -> Iterator[Conversation]:
+    for conversation in conversations.values():
+        if conversation:
+            yield conversation
+    conversations.clear()
+
+
+def _bot_message(event: dict) -> dict:
+    message = {
+        key: value
+        for key, value in (event.get(DATA_KEY) or {}).items()
+        if value is not None
+    }
+    if event.get(TEXT_KEY) is not None:
+        message[TEXT_KEY] = event[TEXT_KEY]
+    return message
+
+
+def _digest(conversation: Conversation) -> bytes:
+    return hashlib.blake2b(
+        json.dumps(conversation, sort_keys=True).encode(), digest_size=DIGEST_SIZE
+    ).digest()
+
+
+def _raise_if_done(future: Future) -> bool:
+    if future.done():
+        future.result()
+        return True
+    return False
+
+
+@contextmanager
+def _atomic_file(path: Path) -> Iterator[IO[str]]:
+    """
+    Write to a temporary file renamed to its final path once complete.
+    """
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=str(path.parent), prefix=".", suffix=path.suffix
+    )
+    try:
+        with os.fdopen(file_descriptor, "w") as temporary_file:
+            yield temporary_file
+        os.replace(temporary_path, str(path))
+    except BaseException:
+        os.remove(temporary_path)
+        raise
@@ -0,0 +1,137 @@
+from functools import partial
+from typing import Any, Callable, List, Optional
+
+from requests import Session
+
+from .cassette import Cassette
+from .common import json_codec
+from .common.configuration import configure
+from .common.utils import TRACKER_ID_SIGNATURE
+
+HTTP1_TRANSPORT = "http1"
+HTTP2_TRANSPORT = "http2"
+TRANSPORTS = (HTTP1_TRANSPORT, HTTP2_TRANSPORT)
+
+# Sends the given body to the given url, returns a response with the status_code,
+# text and content of requests responses.
+PostFunction = Callable[[str, bytes], Any]
+
+# Status of the responses replayed for requests missing from the cassette.
+MISSING_RESPONSE_STATUS = 404
+
+
+@configure("protocol.transport", Cassette)
+class HttpTransport:
+    """
+    Hands out the HTTP clients of the REST runners. An HTTP/1.1 connection carries
+    one request at a time, so each runner gets its own keep-alive session. An HTTP/2
+    client multiplexes the requests of all the runners over its connections, so a
+    single client is shared between threads.
+
+    The HTTP/2 transport requires the optional httpx dependency. Servers must speak
+    HTTP/2, with prior knowledge over plain http.
+
+    Requests and responses are recorded into the cassette when it's recording, and
+    served from it without any connection when it's replaying.
+    """
+
+    def __init__(
+        self, transport: str = HTTP1_TRANSPORT, cassette: Optional[Cassette] = None
+    ):
+        if transport not in TRANSPORTS:
+            raise Exception(
+                f"'{transport}' isn't a valid transport, use one of "
+                f"{', '.join(TRANSPORTS)}."
+            )
+        self.transport = transport
+        self.cassette = cassette or Cassette.constructor()
+        self._http2_client = None
+        self._sessions: List[Session] = []
+        if transport == HTTP2_TRANSPORT and not self.cassette.replaying:
+            try:
+                import httpx
+            except ImportError:
+                raise Exception(
+                    "The http2 transport requires httpx, install it with "
+                    "`pip install httpx[http2]`."
+                )
+            self._http2_client = httpx.Client(http1=False, http2=True)
+
+    def post_function(self) -> PostFunction:
+        if self.cassette.replaying:
+            return partial(_replay, self.cassette)
+        if self._http2_client is None:
+            session = Session()
+            self._sessions.append(session)
+            post: PostFunction = session.post
+        else:
+            post = partial(_post_content, self._http2_client)
+        if self.cassette.recording:
+            return partial(_record, self.cassette, post)
+        return post
+
+    def end_conversation(self, url: str, conversation_id: str) -> None:
+        """
+        Let the cassette forget a finished conversation with the url.
+        """
+        self.cassette.end_conversation(url, conversation_id)
+
+    def close(self) -> None:
+        """
+        Close the connections of the clients handed out, once the runs are over.
+        """
+        for session in self._sessions:
+            session.close()
+        if self._http2_client is not None:
+            self._http2_client.close()
+
+
+def _post_content(client: Any, url: str, data: bytes) -> Any:
+    return client.post(url, content=data)
+
+
+class ReplayedResponse:
+    def __init__(self, status_code: int, content: bytes):
+        self.status_code = status_code
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode()
+
+
+def _record(cassette: Cassette, post: PostFunction, url: str, data: bytes) -> Any:
+    conversation_id = _conversation_id(data)
+    key = cassette.next_key(url, conversation_id, data)
+    response = post(url, data)
+    cassette.record(key, response.status_code, response.content, conversation_id)
+    return response
+
+
+def _replay(cassette: Cassette, url: str, data: bytes) -> ReplayedResponse:
+    conversation_id = _conversation_id(data)
+    exchange = cassette.replay(
+        cassette.next_key(url, conversation_id, data), conversation_id
+    )
+    if exchange is None:
+        return ReplayedResponse(
+            MISSING_RESPONSE_STATUS,
+            f"No response recorded in cassette '{cassette.path}'.".encode(),
+        )
+    status, content = exchange
+    return ReplayedResponse(status, content)
+
+
+def _conversation_id(data: bytes) -> Optional[str]:
+    """
+    Sender id generated for the scenario, found among the values of the request.
+    """
+    try:
+        request = json_codec.loads(data)
+    except ValueError:
+        return None
+    if isinstance(request, dict):
+        for value in request.values():
+            if isinstance(value, str) and value.startswith(TRACKER_ID_SIGNATURE):
+                return value
+    return None
@@ -0,0 +1,272 @@
+from concurrent.futures.thread import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from jinja2 import Environment, FileSystemLoader, TemplateSyntaxError, meta
+
+from .common import json_codec
+from .interaction import (
+    BOT_FOLDER,
+    INTERACTION_TURN_EXTENSION,
+    INTERACTIONS_FOLDER,
+    USER_FOLDER,
+    Interaction,
+    template_filename,
+)
+from .matcher import MatcherRules, rules_filename
+from .scenario import (
+    SCENARIO_FRAGMENTS_FOLDER,
+    SCENARIO_FRAGMENTS_GLOB,
+    SCENARIOS_FOLDER,
+    Scenario,
+    scenario_files,
+    scenario_name,
+)
+
+# A scenario or scenario fragment file, its name, and its first variant when valid
+# or its problem otherwise.
+ParsedScenario = Tuple[Path, str, Optional[Scenario], Optional["ValidationProblem"]]
+
+
+class ValidationProblem:
+    def __init__(self, path: Path, message: str):
+        self.path = path
+        self.message = message
+
+    def __eq__(self, other) -> bool:
+        return (
+            self.__class__ == other.__class__
+            and self.path == other.path
+            and self.message == other.message
+        )
+
+    def __hash__(self):
+        return hash((self.path, self.message))
+
+    def __str__(self) -> str:
+        return f"{self.path}: {self.message}"
+
+    def __repr__(self) -> str:
+        return f"<ValidationProblem, {self}>"
+
+
+class SuiteValidator:
+    """
+    Checks a test suite without sending anything to the bot: scenario and scenario
+    fragment files are parsed, their fragment and template references resolved,
+    and the templates they use, along with the templates those include, are
+    syntax-checked along with the matcher rules of bot turns. Files are checked in
+    parallel and every problem is reported at once.
+
+    Only the first variant of scenarios declaring a matrix or a data file is
+    expanded, since all of their variants refer to the same templates.
+    """
+
+    def __init__(self, tests_path: Path, max_workers: int):
+        self._tests_path = tests_path
+        self._interactions_path = tests_path / INTERACTIONS_FOLDER
+        self._max_workers = max_workers
+        self._template_environment = Environment(
+            loader=FileSystemLoader(str(self._interactions_path))
+        )
+
+    def validate(
+        self, scenarios_glob: str, all_templates: bool = False
+    ) -> List[ValidationProblem]:
+        """
+        Problems of the scenarios matching the glob and of the templates they use,
+        or of every template of the suite.
+        """
+        problems: Set[ValidationProblem] = set()
+        with ThreadPoolExecutor(self._max_workers) as executor:
+            fragments_path = self._tests_path / SCENARIO_FRAGMENTS_FOLDER
+            fragment_files = (
+                scenario_files(fragments_path, SCENARIO_FRAGMENTS_GLOB)
+                if fragments_path.is_dir()
+                else []
+            )
+            scenarios_path = self._tests_path / SCENARIOS_FOLDER
+            parsed_fragments = list(
+                executor.map(
+                    lambda path: self._parse(path, fragments_path), fragment_files
+                )
+            )
+            parsed_scenarios = list(
+                executor.map(
+                    lambda path: self._parse(path, scenarios_path),
+                    scenario_files(scenarios_path, scenarios_glob),
+                )
+            )
+
+            fragments: Dict[str, Tuple[Path, List[Interaction]]] = {}
+            for path, name, fragment, problem in parsed_fragments:
+                if fragment is not None:
+                    fragments[name] = (
+                        path,
+                        self._fragment_interactions(path, fragment, problems),
+                    )
+                elif problem is not None:
+                    problems.add(problem)
+
+            # Scenario and scenario fragment files referring to each template.
+            references: Dict[str, Set[Path]] = {}
+            for path, _, scenario, problem in parsed_scenarios:
+                if scenario is not None:
+                    for filename, referring_path in self._template_references(
+                        path, scenario, fragments, problems
+                    ):
+                        references.setdefault(filename, set()).add(referring_path)
+                elif problem is not None:
+                    problems.add(problem)
+
+            pending_templates = set(references)
+            if all_templates:
+                pending_templates.update(
+                    template_path.relative_to(self._interactions_path).as_posix()
+                    for template_path in self._interactions_path.rglob(
+                        f"*.{INTERACTION_TURN_EXTENSION}"
+                    )
+                )
+            checked_templates: Set[str] = set()
+            while pending_templates:
+                checked_templates |= pending_templates
+                filenames = sorted(pending_templates)
+                pending_templates = set()
+                for filename, (template_problems, included_templates) in zip(
+                    filenames,
+                    executor.map(
+                        lambda filename: self._check_template(
+                            filename, references.get(filename, set())
+                        ),
+                        filenames,
+                    ),
+                ):
+                    problems.update(template_problems)
+                    for included_template in included_templates:
+                        references.setdefault(included_template, set()).add(
+                            self._interactions_path / filename
+                        )
+                    pending_templates |= included_templates - checked_templates
+
+        return sorted(
+            problems, key=lambda problem: (str(problem.path), problem.message)
+        )
+
+    def _parse(self, path: Path, folder_path: Path) -> ParsedScenario:
+        name = scenario_name(path, folder_path)
+        try:
+            return path, name, next(Scenario.iter_from_file(name, path), None), None
+        except Exception as error:
+            return (
+                path,
+                name,
+                None,
+                ValidationProblem(path, _error_message(error, path)),
+            )
+
+    def _fragment_interactions(
+        self, path: Path, fragment: Scenario, problems: Set[ValidationProblem]
+    ) -> List[Interaction]:
+        if fragment.variables:
+            problems.add(
+                ValidationProblem(path, "Scenario fragments cannot declare variants")
+            )
+        if not all(isinstance(step, Interaction) for step in fragment.steps):
+            problems.add(
+                ValidationProblem(
+                    path, "Scenario fragments cannot refer to other fragments"
+                )
+            )
+        return [step for step in fragment.steps if isinstance(step, Interaction)]
+
+    def _template_references(
+        self,
+        path: Path,
+        scenario: Scenario,
+        fragments: Dict[str, Tuple[Path, List[Interaction]]],
+        problems: Set[ValidationProblem],
+    ) -> Iterator[Tuple[str, Path]]:
+        """
+        Templates of the scenario, each with the file referring to it.
+        """
+        for step in scenario.steps:
+            if isinstance(step, Interaction):
+                for filename in _interaction_templates(step):
+                    yield filename, path
+            elif step.name in fragments:
+                fragment_path, interactions = fragments[step.name]
+                for interaction in interactions:
+                    for filename in _interaction_templates(interaction):
+                        yield filename, fragment_path
+            else:
+                problems.add(
+                    ValidationProblem(path, f"Missing scenario fragment '{step.name}'")
+                )
+
+    def _check_template(
+        self, filename: str, referring_paths: Set[Path]
+    ) -> Tuple[List[ValidationProblem], Set[str]]:
+        """
+        Problems of a template and the templates it includes, extends or imports.
+        """
+        template_path = self._interactions_path / filename
+        if not template_path.is_file():
+            return (
+                [
+                    ValidationProblem(path, f"Missing template '{filename}'")
+                    for path in referring_paths
+                ],
+                set(),
+            )
+
+        problems: List[ValidationProblem] = []
+        try:
+            syntax_tree = self._template_environment.parse(
+                template_path.read_text(), filename, str(template_path)
+            )
+        except TemplateSyntaxError as error:
+            return (
+                [ValidationProblem(template_path, f"Line {error.lineno}: {error}")],
+                set(),
+            )
+
+        included_templates = set(meta.find_referenced_templates(syntax_tree))
+        if not included_templates and not meta.find_undeclared_variables(syntax_tree):
+            try:
+                json_codec.loads(
+                    self._template_environment.get_template(filename).render()
+                )
+            except ValueError as error:
+                problems.append(
+                    ValidationProblem(template_path, f"Invalid JSON ({error})")
+                )
+
+        if filename.startswith(f"{BOT_FOLDER}/"):
+            rules_path = self._interactions_path / rules_filename(filename)
+            if rules_path.is_file():
+                try:
+                    MatcherRules.from_file(rules_path)
+                except Exception as error:
+                    problems.append(
+                        ValidationProblem(rules_path, _error_message(error, rules_path))
+                    )
+
+        # Dynamic includes can't be resolved without rendering.
+        included_templates.discard(None)
+        return problems, included_templates
+
+
+def _interaction_templates(interaction: Interaction) -> Tuple[str, str]:
+    return (
+        template_filename(interaction.user, USER_FOLDER),
+        template_filename(interaction.bot, BOT_FOLDER),
+    )
+
+
+def _error_message(error: Exception, path: Path) -> str:
+    """
+    Message of the error without the path of the file it's reported for.
+    """
+    message = str(error) or error.__class__.__name__
+    path_suffix = f": {path}"
+    return message[: -len(path_suffix)] if message.endswith(path_suffix) else message
@@ -0,0 +1,219 @@
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+from .interaction import (
+    BOT_FOLDER,
+    INTERACTIONS_FOLDER,
+    USER_FOLDER,
+    Interaction,
+    InteractionLoader,
+    template_filename,
+)
+from .matcher import RULES_EXTENSION, rules_filename
+from .scenario import (
+    SCENARIO_FRAGMENTS_FOLDER,
+    SCENARIOS_FOLDER,
+    Scenario,
+    ScenarioFragmentLoader,
+    ScenarioFragmentReference,
+    scenario_files,
+    scenario_name,
+)
+
+logger = logging.getLogger(__name__)
+
+WATCHED_FOLDERS = (SCENARIOS_FOLDER, SCENARIO_FRAGMENTS_FOLDER, INTERACTIONS_FOLDER)
+FRAGMENT_EXTENSION = ".yml"
+
+FileStates = Dict[Path, Tuple[int, int]]
+
+
+class SuiteWatcher:
+    """
+    Polls the files of a test folder and tells which scenarios are affected by the
+    files changed since the last poll. Each scenario file is indexed with the
+    fragments and interaction templates it uses, so that polling only compares file
+    stats and looks up the index. The fragments and matcher rules of the loaders
+    are reloaded when their files change.
+    """
+
+    def __init__(
+        self,
+        tests_path: Path,
+        scenarios_glob: str,
+        scenario_fragment_loader: ScenarioFragmentLoader,
+        interaction_loader: InteractionLoader,
+    ):
+        self._tests_path = tests_path
+        self._scenarios_path = tests_path / SCENARIOS_FOLDER
+        self._scenarios_glob = scenarios_glob
+        self._scenario_fragment_loader = scenario_fragment_loader
+        self._interaction_loader = interaction_loader
+        self._file_states = _file_states(tests_path)
+        self._scenarios: Dict[Path, List[Scenario]] = {}
+        self._dependencies: Dict[Path, Set[Path]] = {}
+        for scenario_file in scenario_files(self._scenarios_path, scenarios_glob):
+            self._index(scenario_file)
+
+    @property
+    def scenarios(self) -> List[Scenario]:
+        return [
+            scenario
+            for scenario_file in sorted(self._scenarios)
+            for scenario in self._scenarios[scenario_file]
+        ]
+
+    def select(self, scenarios_glob: str) -> List[Scenario]:
+        """
+        Indexed scenarios of the files matching a glob relative to the scenarios
+        folder.
+        """
+        selected_files = set(scenario_files(self._scenarios_path, scenarios_glob))
+        return [
+            scenario
+            for scenario_file in sorted(self._scenarios)
+            if scenario_file in selected_files
+            for scenario in self._scenarios[scenario_file]
+        ]
+
+    def poll(self) -> List[Scenario]:
+        """
+        Scenarios affected by the files changed, added or removed since the last
+        poll.
+        """
+        file_states = _file_states(self._tests_path)
+        changed_files = {
+            path
+            for path in file_states.keys() | self._file_states.keys()
+            if file_states.get(path) != self._file_states.get(path)
+        }
+        self._file_states = file_states
+        return self.affected_scenarios(changed_files) if changed_files else []
+
+    def affected_scenarios(self, changed_files: Iterable[Path]) -> List[Scenario]:
+        changed_files = set(changed_files)
+        fragments_path = self._tests_path / SCENARIO_FRAGMENTS_FOLDER
+        if any(_is_relative_to(path, fragments_path) for path in changed_files):
+            try:
+                self._scenario_fragment_loader.reload()
+            except Exception:
+                logger.exception("Could not reload the scenario fragments")
+        if any(path.name.endswith(RULES_EXTENSION) for path in changed_files):
+            self._interaction_loader.reload_rules()
+
+        affected_files: Set[Path] = set()
+        if any(_is_relative_to(path, self._scenarios_path) for path in changed_files):
+            indexed_files = set(self._scenarios)
+            current_files = set(
+                scenario_files(self._scenarios_path, self._scenarios_glob)
+            )
+            for removed_file in indexed_files - current_files:
+                del self._scenarios[removed_file]
+                del self._dependencies[removed_file]
+
+            # Data files are looked up next to the scenarios declaring them.
+            data_folders = {
+                path.parent
+                for path in changed_files - indexed_files - current_files
+                if _is_relative_to(path, self._scenarios_path)
+            }
+            affected_files.update(
+                scenario_file
+                for scenario_file in current_files
+                if scenario_file in changed_files
+                or scenario_file.parent in data_folders
+            )
+
+        for changed_file in changed_files:
+            dependents = {
+                scenario_file
+                for scenario_file, dependencies in self._dependencies.items()
+                if changed_file in dependencies
+            }
+            if not dependents and _is_relative_to(
+                changed_file, self._tests_path / INTERACTIONS_FOLDER
+            ):
+                # Templates only included or extended by other templates.
+                dependents = set(self._scenarios)
+            affected_files.update(dependents)
+
+        for scenario_file in affected_files:
+            self._index(scenario_file)
+
+        return [
+            scenario
+            for scenario_file in sorted(affected_files)
+            for scenario in self._scenarios.get(scenario_file, [])
+        ]
+
+    def _index(self, scenario_file: Path) -> None:
+        try:
+            scenarios = list(
+                Scenario.iter_from_file(
+                    scenario_name(scenario_file, self._scenarios_path), scenario_file
+                )
+            )
+        except Exception:
+            logger.exception(f"Could not load scenario {scenario_file}")
+            scenarios = []
+
+        dependencies: Set[Path] = set()
+        for scenario in scenarios[:1]:
+            dependencies.update(self._dependencies_of(scenario))
+        self._scenarios[scenario_file] = scenarios
+        self._dependencies[scenario_file] = dependencies
+
+    def _dependencies_of(self, scenario: Scenario) -> Set[Path]:
+        dependencies: Set[Path] = set()
+        interactions: List[Interaction] = []
+        for step in scenario.steps:
+            if isinstance(step, ScenarioFragmentReference):
+                dependencies.add(
+                    self._tests_path
+                    / SCENARIO_FRAGMENTS_FOLDER
+                    / f"{step.name}{FRAGMENT_EXTENSION}"
+                )
+                try:
+                    interactions.extend(
+                        self._scenario_fragment_loader.scenario_fragment(step.name)
+                    )
+                except Exception:
+                    logger.warning(f"Missing scenario fragment '{step.name}'")
+            else:
+                interactions.append(step)
+
+        interactions_path = self._tests_path / INTERACTIONS_FOLDER
+        for interaction in interactions:
+            dependencies.add(
+                interactions_path / template_filename(interaction.user, USER_FOLDER)
+            )
+            bot_template = template_filename(interaction.bot, BOT_FOLDER)
+            dependencies.add(interactions_path / bot_template)
+            dependencies.add(interactions_path / rules_filename(bot_template))
+        return dependencies
+
+
+def _file_states(tests_path: Path) -> FileStates:
+    file_states: FileStates = {}
+    for folder in WATCHED_FOLDERS:
+        _scan(tests_path / folder, file_states)
+    return file_states
+
+
+def _scan(path: Path, file_states: FileStates) -> None:
+    try:
+        entries = list(os.scandir(path))
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        if entry.is_dir():
+            _scan(Path(entry.path), file_states)
+        else:
+            stat = entry.stat()
+            file_states[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+
+
+def _is_relative_to(path: Path, folder: Path) -> bool:
+    return folder == path or folder in path.parents
@@ -1,10 +1,12 @@
 import time
+from concurrent.futures import ThreadPoolExecutor
 from os import getpid
 from socket import gethostname
 from unittest import TestCase
 
 from rasa_integration_testing.common.utils import (
     TRACKER_ID_SIGNATURE,
+    bounded_map,
     generate_tracker_id_from_scenario_name,
 )
 
@@ -26,3 +28,17 @@ class TestCommon(TestCase):
         regex = f"^{TRACKER_ID_SIGNATURE}_{gethostname()}\
 {str(getpid())}_\\d*.\\d*_{EXPECTED_SCENARIO_NAME}"
         self.assertRegex(tracker_id, regex)
+
+    def test_bounded_map(self):
+        consumed = []
+
+        def items():
+            for item in range(10):
+                consumed.append(item)
+                yield item
+
+        with ThreadPoolExecutor(2) as executor:
+            results = bounded_map(executor, lambda item: item * 2, items(), 3)
+            self.assertEqual(next(results), 0)
+            self.assertLessEqual(len(consumed), 4)
+            self.assertListEqual(list(results), [item * 2 for item in range(1, 10)])
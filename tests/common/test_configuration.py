@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+from configparser import NoOptionError
 from pathlib import Path
 from typing import Callable
 from unittest import TestCase
@@ -5,6 +7,7 @@ from unittest import TestCase
 from rasa_integration_testing.common.configuration import (
     Configuration,
     DependencyInjector,
+    Scope,
     configure,
 )
 
@@ -43,6 +46,20 @@ class MixedParameters:
         self.flag = flag
 
 
+@configure("section.text", "section.missing", "section.absent")
+class DefaultValueObject:
+    def __init__(self, text: str, missing: int = 7, absent: str = "absent"):
+        self.text = text
+        self.missing = missing
+        self.absent = absent
+
+
+@configure("section.missing")
+class MissingOptionObject:
+    def __init__(self, missing: int):
+        self.missing = missing
+
+
 @configure(configured_object=ConfiguredObject, value=5)
 class PassedValueObject:
     def __init__(self, configured_object: ConfiguredObject, value: int):
@@ -56,6 +73,40 @@ class InvalidConfiguredObject:
         self.option = option
 
 
+@configure("section.number", scope=Scope.THREAD)
+class ThreadObject:
+    def __init__(self, number: int):
+        self.number = number
+
+
+@configure(scope=Scope.PROCESS)
+class ProcessObject:
+    def __init__(self):
+        pass
+
+
+@configure(scope=Scope.PROCESS)
+class ClosableObject:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@configure(ThreadObject, ProcessObject, scope=Scope.SCENARIO)
+class ScenarioObject:
+    def __init__(self, thread_object: ThreadObject, process_object: ProcessObject):
+        self.thread_object = thread_object
+        self.process_object = process_object
+
+
+@configure(ScenarioObject, scope=Scope.THREAD)
+class CaptiveScenarioObject:
+    def __init__(self, scenario_object: ScenarioObject):
+        self.scenario_object = scenario_object
+
+
 INJECTOR = DependencyInjector(Configuration(Path("tests/common/config.ini")))
 
 
@@ -76,6 +127,16 @@ class TestConfiguration(TestCase):
         mixed_parameters: MixedParameters = INJECTOR.autowire(MixedParameters)
         self.assertEqual(mixed_parameters.number, 4)
 
+    def test_default_values(self):
+        default_value_object: DefaultValueObject = INJECTOR.autowire(DefaultValueObject)
+        self.assertEqual(default_value_object.text, "It works!")
+        self.assertEqual(default_value_object.missing, 7)
+        self.assertEqual(default_value_object.absent, "absent")
+
+    def test_missing_option(self):
+        with self.assertRaises(NoOptionError):
+            INJECTOR.autowire(MissingOptionObject)
+
     def test_invalid_autowiring(self):
         self._assert_error(
             "Invalid configure decorator option: invalid_option from "
@@ -106,6 +167,66 @@ class TestConfiguration(TestCase):
             ExtraKeywordArgument,
         )
 
+    def test_singleton_scope(self):
+        self.assertIs(
+            INJECTOR.autowire(ConfiguredObject), INJECTOR.autowire(ConfiguredObject)
+        )
+
+    def test_registered_object(self):
+        injector = DependencyInjector(Configuration(Path("tests/common/config.ini")))
+        registered_object = ProcessObject()
+        injector.register(ProcessObject, registered_object)
+        self.assertIs(registered_object, injector.autowire(ProcessObject))
+
+    def test_close(self):
+        injector = DependencyInjector(Configuration(Path("tests/common/config.ini")))
+        closable_object = injector.autowire(ClosableObject)
+        registered_object = ClosableObject()
+        injector.register(ConfiguredObject, registered_object)
+        injector.close()
+        self.assertTrue(closable_object.closed)
+        self.assertFalse(registered_object.closed)
+
+    def test_thread_scope(self):
+        thread_object = INJECTOR.autowire(ThreadObject)
+        self.assertIs(thread_object, INJECTOR.autowire(ThreadObject))
+        self.assertEqual(thread_object.number, 4)
+
+        with ThreadPoolExecutor(1) as executor:
+            other_thread_object = executor.submit(INJECTOR.autowire, ThreadObject)
+        self.assertIsNot(thread_object, other_thread_object.result())
+
+    def test_process_scope(self):
+        process_object = INJECTOR.autowire(ProcessObject)
+        with ThreadPoolExecutor(1) as executor:
+            other_thread_object = executor.submit(INJECTOR.autowire, ProcessObject)
+        self.assertIs(process_object, other_thread_object.result())
+
+    def test_scenario_scope(self):
+        with INJECTOR.scenario_scope():
+            scenario_object = INJECTOR.autowire(ScenarioObject)
+            self.assertIs(scenario_object, INJECTOR.autowire(ScenarioObject))
+        with INJECTOR.scenario_scope():
+            other_scenario_object = INJECTOR.autowire(ScenarioObject)
+
+        self.assertIsNot(scenario_object, other_scenario_object)
+        self.assertIs(
+            scenario_object.thread_object, other_scenario_object.thread_object
+        )
+
+    def test_outside_scenario_scope(self):
+        self._assert_error(
+            "Tried to autowire a scenario object outside a scenario", ScenarioObject
+        )
+
+    def test_captive_dependency(self):
+        with INJECTOR.scenario_scope():
+            self._assert_error(
+                "CaptiveScenarioObject with THREAD scope cannot depend on "
+                "ScenarioObject with SCENARIO scope",
+                CaptiveScenarioObject,
+            )
+
     def _assert_error(self, message: str, function: Callable):
         with self.assertRaises(Exception) as error:
             INJECTOR.autowire(function)
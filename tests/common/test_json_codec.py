@@ -0,0 +1,61 @@
+import json
+from unittest import TestCase
+
+from ruamel.yaml import YAML
+
+from rasa_integration_testing.common import json_codec
+from rasa_integration_testing.common.json_codec import (
+    StandardJsonCodec,
+    available_codecs,
+)
+
+PAYLOAD = {
+    "recipient_id": "ITEST_host_1.0_pay_bill",
+    "text": "Bonjour, vous êtes à l'écoute de https://example.com/aide",
+    "buttons": [{"title": "Oui", "payload": "/affirm"}, {"title": "Non"}],
+    "custom": {"confidence": 0.875, "slots": None, "retries": 3, "final": True},
+}
+
+
+class TestJsonCodec(TestCase):
+    def test_codecs_round_trip(self):
+        for codec in available_codecs():
+            with self.subTest(codec=codec.name):
+                self.assertEqual(codec.loads(codec.dumps(PAYLOAD)), PAYLOAD)
+                self.assertEqual(codec.loads(codec.dumpb(PAYLOAD)), PAYLOAD)
+                self.assertEqual(codec.loads(json.dumps(PAYLOAD).encode()), PAYLOAD)
+
+    def test_codecs_sorted_indented(self):
+        for codec in available_codecs():
+            with self.subTest(codec=codec.name):
+                self.assertEqual(
+                    codec.dumps({"b": [1], "a": "/"}, sort_keys=True, indent=True),
+                    '{\n  "a": "/",\n  "b": [\n    1\n  ]\n}',
+                )
+
+    def test_codecs_unescaped(self):
+        for codec in available_codecs():
+            with self.subTest(codec=codec.name):
+                self.assertIn("êtes à l'écoute", codec.dumps(PAYLOAD))
+                self.assertIn("êtes à l'écoute".encode(), codec.dumpb(PAYLOAD))
+
+    def test_codecs_yaml_values(self):
+        values = YAML().load(
+            "matrix: {ratio: [1.5, 1e3], retries: [0x10], name: [café]}\n"
+            "variables: {enabled: true, empty: null}\n"
+        )
+        for codec in available_codecs():
+            with self.subTest(codec=codec.name):
+                self.assertEqual(codec.loads(codec.dumps(values)), values)
+                self.assertEqual(codec.loads(codec.dumpb(values)), values)
+
+    def test_codecs_decoding_error(self):
+        for codec in available_codecs():
+            with self.subTest(codec=codec.name):
+                with self.assertRaises(ValueError):
+                    codec.loads("{'text': 'hi'}")
+
+    def test_fastest_codec_selected(self):
+        codec_names = [codec.name for codec in available_codecs()]
+        self.assertEqual(codec_names[-1], StandardJsonCodec.name)
+        self.assertEqual(json_codec.codec.name, codec_names[0])
@@ -0,0 +1,48 @@
+from pathlib import Path
+from unittest import TestCase
+
+from rasa_integration_testing.common.variables import EMPTY_VARIABLES, VariableContext
+from rasa_integration_testing.interaction import InteractionLoader, InteractionTurn
+
+RUN_VARIABLES = {"title": "Doctor", "SHARED": "run"}
+SCENARIO_VARIABLES = {"SHARED": "scenario", "SENDER_ID": "sender"}
+INTERACTION_TEMPLATES_TESTS_PATH = Path("tests/main_scenarios/interaction_templates")
+
+
+class TestVariableContext(TestCase):
+    def test_layers_precedence(self):
+        context = VariableContext(RUN_VARIABLES).with_defaults(SCENARIO_VARIABLES)
+
+        self.assertEqual("run", context["SHARED"])
+        self.assertEqual("sender", context["SENDER_ID"])
+        self.assertIn("title", context)
+        self.assertNotIn("missing", context)
+        self.assertEqual(3, len(context))
+        self.assertEqual({"title", "SHARED", "SENDER_ID"}, set(context))
+        with self.assertRaises(KeyError):
+            context["missing"]
+
+    def test_layers_are_not_copied(self):
+        context = VariableContext(RUN_VARIABLES)
+        self.assertIs(context, context.with_defaults({}))
+        self.assertEqual(
+            {**SCENARIO_VARIABLES, **RUN_VARIABLES},
+            dict(context.with_defaults(SCENARIO_VARIABLES)),
+        )
+        self.assertEqual(0, len(EMPTY_VARIABLES))
+
+    def test_rendered_turn_variables(self):
+        loader = InteractionLoader(INTERACTION_TEMPLATES_TESTS_PATH)
+        turn = InteractionTurn("welcome_template", {"title": "Mister", "name": "John"})
+
+        self.assertEqual(
+            {"text": "Welcome Mister John!"}, loader.render_user_turn(turn)
+        )
+        self.assertEqual(
+            {"text": "Welcome Doctor John!"},
+            loader.render_user_turn(turn, VariableContext(RUN_VARIABLES)),
+        )
+        self.assertEqual(
+            {"text": "Welcome Doctor John!"},
+            loader.render_user_turn(turn, RUN_VARIABLES),
+        )
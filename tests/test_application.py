@@ -1,18 +1,50 @@
+import json
+import shutil
+import subprocess
 import sys
+import tempfile
 from io import StringIO
+from pathlib import Path
 from unittest import TestCase
+from unittest.mock import MagicMock, patch
 
 from click.testing import CliRunner
 from httmock import HTTMock, all_requests, response
 
-from rasa_integration_testing.application import EXIT_FAILURE, EXIT_SUCCESS, cli
+from rasa_integration_testing.application import (
+    EXIT_FAILURE,
+    EXIT_SUCCESS,
+    RUNNERS_ENTRY_POINT_GROUP,
+    RunnerType,
+    cli,
+)
+from rasa_integration_testing.rest_runner import RestRunner
+from rasa_integration_testing.watch import SuiteWatcher
 
 CONFIGS_PATH = "tests/main_scenarios"
 SUCCESS_CONFIGURATION_PATH = f"{CONFIGS_PATH}/success"
 FAILURE_CONFIGURATION_PATH = f"{CONFIGS_PATH}/fail"
 MIXED_DIFF_CONFIGURATION_PATH = f"{CONFIGS_PATH}/mixed_diff"
+MATRIX_CONFIGURATION_PATH = f"{CONFIGS_PATH}/matrix"
+DUPLICATES_CONFIGURATION_PATH = f"{CONFIGS_PATH}/duplicates"
+MATCHER_RULES_CONFIGURATION_PATH = f"{CONFIGS_PATH}/matcher_rules"
+TARGETS_CONFIGURATION_PATH = f"{CONFIGS_PATH}/targets"
+INVALID_CONFIGURATION_PATH = "tests/validation_scenarios/invalid"
 SUBSET_DIRECTORY = "subset"
 NONEXISTENT_SUBSET_DIRECTORY = "foo"
+USAGE_ERROR_EXIT_CODE = 2
+
+IMPORT_TIME_BUDGET = 1.0
+LAZY_MODULES = ["coloredlogs", "jinja2", "requests", "ruamel", "socketio"]
+IMPORT_TIME_SCRIPT = f"""
+import sys
+import time
+
+start = time.perf_counter()
+import rasa_integration_testing.application
+print(time.perf_counter() - start)
+print(",".join(module for module in {LAZY_MODULES} if module in sys.modules))
+"""
 
 
 class TestRunner(TestCase):
@@ -34,6 +66,250 @@ class TestRunner(TestCase):
             )
             self.assertEqual(EXIT_SUCCESS, execution.exit_code)
 
+    def test_matrix_scenario(self):
+        with HTTMock(request_response):
+            execution = self.runner.invoke(cli, [MATRIX_CONFIGURATION_PATH])
+            self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+
+    def test_deduplicated_scenarios(self):
+        with HTTMock(request_response):
+            execution = self.runner.invoke(
+                cli, [DUPLICATES_CONFIGURATION_PATH, "--deduplicate"]
+            )
+            self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+            self.assertIn("2 conversations saved by deduplication.", execution.output)
+
+    def test_history(self):
+        with HTTMock(request_response), tempfile.TemporaryDirectory() as directory:
+            history_path = str(Path(directory) / "history.sqlite")
+            execution = self.runner.invoke(
+                cli, [MATRIX_CONFIGURATION_PATH, "--history", history_path]
+            )
+            self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+
+            execution = self.runner.invoke(
+                cli,
+                [
+                    MATRIX_CONFIGURATION_PATH,
+                    "--history",
+                    history_path,
+                    "--longest-first",
+                    "--failed-first",
+                ],
+            )
+            self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+
+            execution = self.runner.invoke(
+                cli, ["history", "slowest", history_path, "-n", "2"]
+            )
+            self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+            self.assertEqual(2, len(execution.output.splitlines()))
+            self.assertIn("0/2 failed: greeting[", execution.output)
+
+            execution = self.runner.invoke(
+                cli,
+                [
+                    "history",
+                    "growth",
+                    history_path,
+                    "--runs",
+                    "1",
+                    "--threshold",
+                    "-100",
+                ],
+            )
+            self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+            self.assertEqual(4, len(execution.output.splitlines()))
+
+    def test_scheduling_without_history(self):
+        execution = self.runner.invoke(
+            cli, [SUCCESS_CONFIGURATION_PATH, "--longest-first"]
+        )
+        self.assertEqual(USAGE_ERROR_EXIT_CODE, execution.exit_code)
+
+    def test_flaky_scenario(self):
+        responses = []
+
+        @all_requests
+        def flaky_response(url, request):
+            responses.append(request.body)
+            if len(responses) == 1:
+                return response(200, {"text": "timeout"}, {}, None, 5, request)
+            return request_response(url, request)
+
+        with HTTMock(flaky_response):
+            execution = self.runner.invoke(
+                cli, [FAILURE_CONFIGURATION_PATH, "--rerun-failures", "2"]
+            )
+        self.assertEqual(EXIT_FAILURE, execution.exit_code)
+        self.assertIn("failed consistently", execution.output)
+
+        responses.clear()
+        with HTTMock(flaky_response):
+            execution = self.runner.invoke(
+                cli, [SUCCESS_CONFIGURATION_PATH, "--rerun-failures", "2"]
+            )
+        self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+        self.assertIn("is flaky, it passed on rerun 1.", execution.output)
+        self.assertIn("(1 flaky)", execution.output)
+
+    def test_watch(self):
+        with HTTMock(request_response), patch(
+            "rasa_integration_testing.application.sleep",
+            side_effect=[None, KeyboardInterrupt],
+        ):
+            execution = self.runner.invoke(cli, [MATRIX_CONFIGURATION_PATH, "--watch"])
+        self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+        self.assertIn("Watching for changes", execution.output)
+
+    def test_watch_reruns_not_in_history(self):
+        with HTTMock(request_response), tempfile.TemporaryDirectory() as directory:
+            history_path = str(Path(directory) / "history.sqlite")
+            with patch(
+                "rasa_integration_testing.application.sleep",
+                side_effect=[None, KeyboardInterrupt],
+            ), patch.object(
+                SuiteWatcher,
+                "poll",
+                autospec=True,
+                side_effect=lambda watcher: watcher.scenarios,
+            ):
+                execution = self.runner.invoke(
+                    cli,
+                    [SUCCESS_CONFIGURATION_PATH, "--watch", "--history", history_path],
+                )
+            self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+
+            execution = self.runner.invoke(cli, ["history", "slowest", history_path])
+            self.assertIn("0/1 failed", execution.output)
+
+    def test_watch_bundle(self):
+        with tempfile.TemporaryDirectory() as directory:
+            bundle_path = str(Path(directory) / "suite.bundle")
+            self.runner.invoke(
+                cli, ["compile", SUCCESS_CONFIGURATION_PATH, "-o", bundle_path]
+            )
+            execution = self.runner.invoke(
+                cli, [SUCCESS_CONFIGURATION_PATH, "--bundle", bundle_path, "--watch"]
+            )
+        self.assertEqual(USAGE_ERROR_EXIT_CODE, execution.exit_code)
+
+    def test_shards(self):
+        with HTTMock(request_response):
+            for shard in ("1/2", "2/2", "3/3"):
+                with self.subTest(shard=shard):
+                    execution = self.runner.invoke(
+                        cli, [DUPLICATES_CONFIGURATION_PATH, "--shard", shard]
+                    )
+                    self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+
+            execution = self.runner.invoke(
+                cli, [DUPLICATES_CONFIGURATION_PATH, "--shard", "6/6"]
+            )
+            self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+            self.assertIn("Shard 6/6 has no scenarios to run.", execution.output)
+
+            execution = self.runner.invoke(
+                cli, [DUPLICATES_CONFIGURATION_PATH, "--shard", "3/2"]
+            )
+            self.assertEqual(USAGE_ERROR_EXIT_CODE, execution.exit_code)
+
+    def test_check(self):
+        execution = self.runner.invoke(cli, ["check", SUCCESS_CONFIGURATION_PATH])
+        self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+
+        execution = self.runner.invoke(cli, ["check", INVALID_CONFIGURATION_PATH])
+        self.assertEqual(EXIT_FAILURE, execution.exit_code)
+        self.assertIn("Found 7 problems", execution.output)
+
+    def test_invalid_suite_not_run(self):
+        with patch("rasa_integration_testing.application._run_suite") as run_suite:
+            execution = self.runner.invoke(cli, [INVALID_CONFIGURATION_PATH])
+            self.assertEqual(EXIT_FAILURE, execution.exit_code)
+            self.assertIn("Found 6 problems", execution.output)
+            run_suite.assert_not_called()
+
+    def test_several_targets(self):
+        with HTTMock(request_response):
+            execution = self.runner.invoke(cli, [TARGETS_CONFIGURATION_PATH])
+            self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+            self.assertIn(
+                "'http://127.0.0.1:8081/': 1/1 tests passed, turn latency mean",
+                execution.output,
+            )
+
+        with HTTMock(candidate_request_response):
+            execution = self.runner.invoke(cli, [TARGETS_CONFIGURATION_PATH])
+            self.assertEqual(EXIT_FAILURE, execution.exit_code)
+            self.assertIn(
+                "'http://127.0.0.1:8081/': 0/1 tests passed", execution.output
+            )
+
+            execution = self.runner.invoke(
+                cli, [TARGETS_CONFIGURATION_PATH, "--differential"]
+            )
+            self.assertEqual(EXIT_FAILURE, execution.exit_code)
+            self.assertIn(
+                "'http://127.0.0.1:8080/' (baseline): 1/1 tests passed",
+                execution.output,
+            )
+
+    def test_several_targets_usage(self):
+        for options in (["--deduplicate"], ["--rerun-failures", "1"], ["--watch"]):
+            with self.subTest(options=options):
+                execution = self.runner.invoke(
+                    cli, [TARGETS_CONFIGURATION_PATH, *options]
+                )
+                self.assertEqual(USAGE_ERROR_EXIT_CODE, execution.exit_code)
+
+        execution = self.runner.invoke(
+            cli, [SUCCESS_CONFIGURATION_PATH, "--differential"]
+        )
+        self.assertEqual(USAGE_ERROR_EXIT_CODE, execution.exit_code)
+
+    def test_cassette(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cassette_path = str(Path(directory) / "cassette.sqlite")
+            with HTTMock(request_response):
+                execution = self.runner.invoke(
+                    cli,
+                    [SUCCESS_CONFIGURATION_PATH, "--record-cassette", cassette_path],
+                )
+            self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+            self.assertIn("responses recorded into cassette", execution.output)
+
+            execution = self.runner.invoke(
+                cli, [SUCCESS_CONFIGURATION_PATH, "--replay-cassette", cassette_path]
+            )
+            self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+
+            execution = self.runner.invoke(
+                cli,
+                [
+                    SUCCESS_CONFIGURATION_PATH,
+                    "--record-cassette",
+                    cassette_path,
+                    "--replay-cassette",
+                    cassette_path,
+                ],
+            )
+            self.assertEqual(USAGE_ERROR_EXIT_CODE, execution.exit_code)
+
+    def test_configured_cassette(self):
+        with tempfile.TemporaryDirectory() as directory:
+            tests_path = Path(directory) / "success"
+            shutil.copytree(SUCCESS_CONFIGURATION_PATH, tests_path)
+            cassette_path = Path(directory) / "cassette.sqlite"
+            with open(tests_path / "config.ini", "a") as config_file:
+                config_file.write(
+                    f"\n[cassette]\npath = {cassette_path}\nmode = record\n"
+                )
+            with HTTMock(request_response):
+                execution = self.runner.invoke(cli, [str(tests_path)])
+            self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+            self.assertIn("responses recorded into cassette", execution.output)
+            self.assertTrue(cassette_path.is_file())
+
     def test_missing_subdirectory(self):
         with HTTMock(request_response):
             execution = self.runner.invoke(
@@ -41,12 +317,78 @@ class TestRunner(TestCase):
             )
             self.assertEqual(EXIT_FAILURE, execution.exit_code)
 
+    def test_compiled_bundle(self):
+        with tempfile.TemporaryDirectory() as directory, HTTMock(request_response):
+            bundle_path = str(Path(directory) / "suite.bundle")
+            compilation = self.runner.invoke(
+                cli, ["compile", SUCCESS_CONFIGURATION_PATH, "-o", bundle_path]
+            )
+            self.assertEqual(EXIT_SUCCESS, compilation.exit_code)
+
+            execution = self.runner.invoke(
+                cli, ["run", SUCCESS_CONFIGURATION_PATH, "--bundle", bundle_path]
+            )
+            self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+
+            execution = self.runner.invoke(
+                cli,
+                [SUCCESS_CONFIGURATION_PATH, SUBSET_DIRECTORY, "--bundle", bundle_path],
+            )
+            self.assertEqual(USAGE_ERROR_EXIT_CODE, execution.exit_code)
+
+    def test_stale_bundle(self):
+        with tempfile.TemporaryDirectory() as directory:
+            bundle_path = str(Path(directory) / "suite.bundle")
+            self.runner.invoke(
+                cli, ["compile", FAILURE_CONFIGURATION_PATH, "-o", bundle_path]
+            )
+            execution = self.runner.invoke(
+                cli, [SUCCESS_CONFIGURATION_PATH, "--bundle", bundle_path]
+            )
+            self.assertEqual(EXIT_FAILURE, execution.exit_code)
+
+    def test_convert_tracker_export(self):
+        with tempfile.TemporaryDirectory() as directory:
+            export_path = Path(directory) / "trackers.jsonl"
+            export_path.write_text(
+                '{"sender_id": "a", "events": [{"event": "user", "text": "hi"}]}\n'
+            )
+            execution = self.runner.invoke(
+                cli, ["convert", str(export_path), str(Path(directory) / "tests")]
+            )
+            self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+            self.assertIn("1 conversations into 1 scenarios", execution.output)
+
     def test_unsuccessful_scenario(self):
         with HTTMock(request_response):
             execution = self.runner.invoke(cli, [FAILURE_CONFIGURATION_PATH])
             self.assertIsInstance(execution.exception, SystemExit)
             self.assertEqual(EXIT_FAILURE, execution.exit_code)
 
+    def test_failure_artifacts(self):
+        with HTTMock(request_response), tempfile.TemporaryDirectory() as folder:
+            execution = self.runner.invoke(
+                cli, [FAILURE_CONFIGURATION_PATH, "--artifacts", folder]
+            )
+            self.assertEqual(EXIT_FAILURE, execution.exit_code)
+            artifact = json.loads(Path(folder, "fail.json").read_text())
+            self.assertEqual(artifact["scenario"], "fail")
+            self.assertIn("output_diff", artifact)
+
+    def test_matcher_rules(self):
+        with tempfile.TemporaryDirectory() as directory, HTTMock(request_response):
+            execution = self.runner.invoke(cli, [MATCHER_RULES_CONFIGURATION_PATH])
+            self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+
+            bundle_path = str(Path(directory) / "suite.bundle")
+            self.runner.invoke(
+                cli, ["compile", MATCHER_RULES_CONFIGURATION_PATH, "-o", bundle_path]
+            )
+            execution = self.runner.invoke(
+                cli, [MATCHER_RULES_CONFIGURATION_PATH, "--bundle", bundle_path]
+            )
+            self.assertEqual(EXIT_SUCCESS, execution.exit_code)
+
     def test_mixed_diff_scenario(self):
         with HTTMock(request_response):
             execution = self.runner.invoke(cli, [MIXED_DIFF_CONFIGURATION_PATH])
@@ -54,7 +396,49 @@ class TestRunner(TestCase):
             self.assertEqual(EXIT_FAILURE, execution.exit_code)
 
 
+class TestRunnerType(TestCase):
+    def test_builtin_runner(self):
+        self.assertEqual(RestRunner, RunnerType.from_string("rest"))
+
+    def test_invalid_runner(self):
+        with self.assertRaisesRegex(Exception, "'foo' isn't a valid runner type."):
+            RunnerType.from_string("foo")
+
+    def test_entry_point_runner(self):
+        entry_point = MagicMock()
+        entry_point.name = "custom"
+        entry_point.load.return_value = RestRunner
+        entry_points = MagicMock()
+        entry_points.select.return_value = [entry_point]
+
+        with patch("importlib.metadata.entry_points", return_value=entry_points):
+            self.assertEqual(RestRunner, RunnerType.from_string("custom"))
+        entry_points.select.assert_called_once_with(group=RUNNERS_ENTRY_POINT_GROUP)
+
+
+class TestImportTime(TestCase):
+    def test_import_budget(self):
+        process = subprocess.run(
+            [sys.executable, "-c", IMPORT_TIME_SCRIPT],
+            stdout=subprocess.PIPE,
+            check=True,
+            universal_newlines=True,
+        )
+        import_time, imported_modules = process.stdout.splitlines()
+
+        self.assertEqual("", imported_modules)
+        self.assertLess(float(import_time), IMPORT_TIME_BUDGET)
+
+
 @all_requests
 def request_response(url, request):
     headers = {"content-type": "application/json"}
     return response(200, request.body, headers, None, 5, request)
+
+
+@all_requests
+def candidate_request_response(url, request):
+    if url.port == 8081:
+        headers = {"content-type": "application/json"}
+        return response(200, {"text": "bonjour"}, headers, None, 5, request)
+    return request_response(url, request)
@@ -0,0 +1,125 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from httmock import HTTMock, all_requests, response
+
+from rasa_integration_testing.bundle import (
+    BundledInteractionLoader,
+    BundleError,
+    SuiteBundle,
+)
+from rasa_integration_testing.common.configuration import (
+    Configuration,
+    DependencyInjector,
+)
+from rasa_integration_testing.interaction import (
+    Interaction,
+    InteractionLoader,
+    InteractionTurn,
+)
+from rasa_integration_testing.rest_runner import RestRunner
+from rasa_integration_testing.scenario import ScenarioFragmentLoader
+
+TEST_DEFINITIONS_FOLDER = Path("tests/main_scenarios/")
+FRAGMENTED_TESTS_PATH = TEST_DEFINITIONS_FOLDER / "fragmented"
+INTERACTION_TEMPLATES_TESTS_PATH = TEST_DEFINITIONS_FOLDER / "interaction_templates"
+BUNDLE_FILENAME = "test.bundle"
+
+
+class TestSuiteBundle(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.bundle_path = Path(self.directory.name) / BUNDLE_FILENAME
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_resolved_scenarios(self):
+        SuiteBundle.compile(FRAGMENTED_TESTS_PATH, "*.yml").write(self.bundle_path)
+        bundle = SuiteBundle.read(self.bundle_path)
+
+        self.assertEqual(
+            ["fragmented"], [scenario.name for scenario in bundle.scenarios]
+        )
+        self.assertEqual(
+            Interaction(
+                InteractionTurn("user_introduction"),
+                InteractionTurn("bot_introduction"),
+            ),
+            bundle.scenarios[0].steps[0],
+        )
+        self.assertEqual(6, len(bundle.scenarios[0].steps))
+
+    def test_rendered_turns(self):
+        bundle = SuiteBundle.compile(INTERACTION_TEMPLATES_TESTS_PATH, "*.yml")
+        bundle.write(self.bundle_path)
+        loader = SuiteBundle.read(self.bundle_path).interaction_loader()
+        file_loader = InteractionLoader(INTERACTION_TEMPLATES_TESTS_PATH)
+
+        self.assertIsInstance(loader, BundledInteractionLoader)
+        self.assertIn("bot/welcome.jinja", bundle.static_turns)
+        self.assertNotIn("bot/goodbye_template.jinja", bundle.static_turns)
+        for interaction in bundle.scenarios[0].steps:
+            self.assertEqual(
+                file_loader.render_user_turn(interaction.user),
+                loader.render_user_turn(interaction.user),
+            )
+            self.assertEqual(
+                file_loader.render_bot_turn(interaction.bot),
+                loader.render_bot_turn(interaction.bot),
+            )
+
+    def test_run_bundled_scenarios(self):
+        bundle = SuiteBundle.compile(FRAGMENTED_TESTS_PATH, "*.yml")
+        injector = DependencyInjector(
+            Configuration(FRAGMENTED_TESTS_PATH / "config.ini"),
+            {"tests_path": Path(self.directory.name)},
+        )
+        injector.register(InteractionLoader, bundle.interaction_loader())
+        injector.register(ScenarioFragmentLoader, bundle.scenario_fragment_loader())
+        runner: RestRunner = injector.autowire(RestRunner)
+
+        with HTTMock(request_response):
+            self.assertIsNone(runner.run(bundle.scenarios[0]))
+
+    def test_stale_bundle(self):
+        tests_path = Path(self.directory.name) / "tests"
+        shutil.copytree(INTERACTION_TEMPLATES_TESTS_PATH, tests_path)
+        bundle = SuiteBundle.compile(tests_path, "*.yml")
+        self.assertFalse(bundle.is_stale(tests_path))
+
+        with open(tests_path / "interactions/bot/welcome.jinja", "a") as template:
+            template.write("\n")
+        self.assertTrue(bundle.is_stale(tests_path))
+
+    def test_invalid_static_template(self):
+        tests_path = Path(self.directory.name) / "tests"
+        shutil.copytree(INTERACTION_TEMPLATES_TESTS_PATH, tests_path)
+        with open(tests_path / "interactions/bot/welcome.jinja", "w") as template:
+            template.write("{")
+
+        with self.assertRaisesRegex(BundleError, "Invalid JSON template"):
+            SuiteBundle.compile(tests_path, "*.yml")
+
+    def test_unsupported_version(self):
+        self.bundle_path.write_text('{"format": "other", "version": 1}')
+        with self.assertRaisesRegex(BundleError, "Unsupported bundle"):
+            SuiteBundle.read(self.bundle_path)
+
+    def test_other_jinja_version(self):
+        SuiteBundle.compile(FRAGMENTED_TESTS_PATH, "*.yml").write(self.bundle_path)
+        bundle_data = json.loads(self.bundle_path.read_text())
+        bundle_data["jinja_version"] = "2.0"
+        self.bundle_path.write_text(json.dumps(bundle_data))
+
+        with self.assertRaisesRegex(BundleError, "compiled with Jinja 2.0"):
+            SuiteBundle.read(self.bundle_path)
+
+
+@all_requests
+def request_response(url, request):
+    headers = {"content-type": "application/json"}
+    return response(200, request.body, headers, None, 5, request)
@@ -0,0 +1,133 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from rasa_integration_testing.cassette import (
+    OFF_MODE,
+    RECORD_MODE,
+    REPLAY_MODE,
+    Cassette,
+)
+
+TARGET = "http://127.0.0.1:8080/"
+FIRST_SENDER = "ITEST_first"
+SECOND_SENDER = "ITEST_second"
+STATUS_OK = 200
+
+
+class TestCassette(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.directory.name) / "cassette.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_replay_recorded(self):
+        cassette = Cassette.constructor(self.path, RECORD_MODE)
+        for text in ("hi", "bye"):
+            key = cassette.next_key(TARGET, FIRST_SENDER, _request(FIRST_SENDER, text))
+            cassette.record(
+                key, STATUS_OK, _request(FIRST_SENDER, text.upper()), FIRST_SENDER
+            )
+        self.assertEqual(cassette.save(), 2)
+        self.assertEqual(cassette.save(), 0)
+
+        cassette = Cassette.constructor(self.path, REPLAY_MODE)
+        for text in ("hi", "bye"):
+            key = cassette.next_key(
+                TARGET, SECOND_SENDER, _request(SECOND_SENDER, text)
+            )
+            self.assertEqual(
+                cassette.replay(key, SECOND_SENDER),
+                (STATUS_OK, _request(SECOND_SENDER, text.upper())),
+            )
+
+    def test_keys_depend_on_conversation(self):
+        cassette = Cassette.constructor()
+        first_hi = cassette.next_key(TARGET, FIRST_SENDER, _request(FIRST_SENDER, "hi"))
+        second_hi = cassette.next_key(
+            TARGET, SECOND_SENDER, _request(SECOND_SENDER, "hi")
+        )
+        self.assertEqual(first_hi, second_hi)
+
+        # Same request, later in the conversation.
+        self.assertNotEqual(
+            cassette.next_key(TARGET, FIRST_SENDER, _request(FIRST_SENDER, "hi")),
+            first_hi,
+        )
+        self.assertNotEqual(
+            cassette.next_key("http://other/", FIRST_SENDER, b"{}"),
+            cassette.next_key(TARGET, FIRST_SENDER, b"{}"),
+        )
+
+        cassette.end_conversation(TARGET, SECOND_SENDER)
+        self.assertEqual(
+            cassette.next_key(TARGET, SECOND_SENDER, _request(SECOND_SENDER, "hi")),
+            first_hi,
+        )
+
+    def test_compact_storage(self):
+        cassette = Cassette.constructor(self.path, RECORD_MODE)
+        content = _request(FIRST_SENDER, "hello " * 1000)
+        cassette.record(cassette.next_key(TARGET, None, b"{}"), STATUS_OK, content)
+        cassette.save()
+
+        with sqlite3.connect(self.path) as connection:
+            ((stored_content,),) = connection.execute("SELECT content FROM exchanges")
+        self.assertLess(len(stored_content), len(content) / 10)
+
+    def test_missing_exchange(self):
+        Path(self.path).touch()
+        cassette = Cassette.constructor(self.path, REPLAY_MODE)
+        self.assertIsNone(cassette.replay(cassette.next_key(TARGET, None, b"{}")))
+
+    def test_stream(self):
+        cassette = Cassette.constructor(self.path, RECORD_MODE)
+        stream = cassette.stream(TARGET, "recorded-sid")
+        self.assertEqual(stream.emitted("session_request"), [])
+        stream.received({"text": "welcome"})
+        stream.emitted("user_uttered", {"session_id": "recorded-sid", "message": "hi"})
+        stream.received({"text": "hello", "recipient_id": "recorded-sid"})
+        stream.received({"text": "how are you?"})
+        stream.close()
+        cassette.save()
+
+        cassette = Cassette.constructor(self.path, REPLAY_MODE)
+        stream = cassette.stream(TARGET, "replayed-sid")
+        self.assertEqual(stream.emitted("session_request"), [{"text": "welcome"}])
+        self.assertEqual(
+            stream.emitted(
+                "user_uttered", {"session_id": "replayed-sid", "message": "hi"}
+            ),
+            [
+                {"text": "hello", "recipient_id": "replayed-sid"},
+                {"text": "how are you?"},
+            ],
+        )
+        self.assertEqual(
+            stream.emitted(
+                "user_uttered", {"session_id": "replayed-sid", "message": "bye"}
+            ),
+            [],
+        )
+
+    def test_off(self):
+        cassette = Cassette.constructor()
+        self.assertEqual(cassette.mode, OFF_MODE)
+        self.assertFalse(cassette.recording or cassette.replaying)
+
+    def test_invalid_cassette(self):
+        for path, mode, message in (
+            (self.path, "rewind", "'rewind' isn't a valid cassette mode"),
+            ("", RECORD_MODE, "requires a cassette path"),
+            (self.path, REPLAY_MODE, "doesn't exist, record it first"),
+        ):
+            with self.subTest(mode=mode):
+                with self.assertRaisesRegex(Exception, message):
+                    Cassette.constructor(path, mode)
+
+
+def _request(sender_id: str, text: str) -> bytes:
+    return f'{{"sender": "{sender_id}", "text": "{text}"}}'.encode()
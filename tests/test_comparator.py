@@ -1,6 +1,9 @@
+import json
+from pathlib import Path
 from unittest import TestCase
 
 from rasa_integration_testing.comparator import JsonDataComparator, JsonDiff, JsonPath
+from rasa_integration_testing.matcher import MatcherRules
 
 
 class TestComparator(TestCase):
@@ -36,3 +39,210 @@ class TestComparator(TestCase):
         path = JsonPath(key)
         self.assertEqual(result.missing_entries, {path: "value1"})
         self.assertEqual(result.extra_entries, {path: "value2"})
+
+    def test_serialized_diff(self):
+        result: JsonDiff = self.comparator.compare(
+            {"text": "hello", "buttons": [{"title": "a.b"}]}, {"text": "hi"}
+        )
+        deserialized = JsonDiff.from_dict(json.loads(json.dumps(result.to_dict())))
+
+        self.assertEqual(deserialized.missing_entries, result.missing_entries)
+        self.assertEqual(deserialized.extra_entries, result.extra_entries)
+
+    def test_compare_different_structures(self):
+        result: JsonDiff = self.comparator.compare(
+            {"a": {"b": 1}, "c": [1], "d": {"_1": 2}}, {"a": 5, "c": {}, "d": [2]}
+        )
+        self.assertEqual(
+            result.missing_entries,
+            {JsonPath("a", "b"): 1, JsonPath("c", "_1"): 1},
+        )
+        self.assertEqual(result.extra_entries, {JsonPath("a"): 5})
+
+    def test_compare_lists(self):
+        result: JsonDiff = self.comparator.compare(
+            {"a": [1, 2, {"b": 3}], "c": [4]}, {"a": [1, 5], "c": [4, {"d": 6}]}
+        )
+        self.assertEqual(
+            result.missing_entries,
+            {JsonPath("a", "_2"): 2, JsonPath("a", "_3", "b"): 3},
+        )
+        self.assertEqual(
+            result.extra_entries,
+            {JsonPath("a", "_2"): 5, JsonPath("c", "_2", "d"): 6},
+        )
+
+    def test_compare_with_rules(self):
+        rules = MatcherRules.from_dict(
+            {
+                "text": {"regex": r"Balance: \d+\$"},
+                "amount": {"tolerance": 0.5},
+                "id": {"type": "string"},
+                "buttons": {"subset": True},
+                "custom": {"subset": True},
+                "**.timestamp": {"ignore": True},
+            },
+            Path("rules.yml"),
+        )
+        expected = {
+            "text": "",
+            "amount": 10,
+            "id": None,
+            "buttons": [{"title": "Yes", "timestamp": 1}],
+            "custom": {"a": 1},
+        }
+
+        result: JsonDiff = self.comparator.compare(
+            expected,
+            {
+                "text": "Balance: 42$",
+                "amount": 10.25,
+                "id": "a1",
+                "buttons": [{"title": "Yes"}, {"title": "No"}],
+                "custom": {"a": 1, "b": 2},
+                "timestamp": 3,
+            },
+            rules,
+        )
+        self.assertTrue(result.identical)
+
+        result = self.comparator.compare(
+            expected,
+            {
+                "text": "Balance: none",
+                "amount": 12,
+                "id": 1,
+                "buttons": [],
+                "custom": {"a": 2},
+            },
+            rules,
+        )
+        self.assertEqual(
+            result.missing_entries,
+            {
+                JsonPath("text"): "",
+                JsonPath("amount"): 10,
+                JsonPath("id"): None,
+                JsonPath("buttons", "_1", "title"): "Yes",
+                JsonPath("custom", "a"): 1,
+            },
+        )
+        self.assertEqual(
+            result.extra_entries,
+            {
+                JsonPath("text"): "Balance: none",
+                JsonPath("amount"): 12,
+                JsonPath("id"): 1,
+                JsonPath("custom", "a"): 2,
+            },
+        )
+
+    def test_compare_unordered_lists(self):
+        rules = MatcherRules.from_dict(
+            {"buttons": {"unordered": True}, "texts": {"unordered": True}},
+            Path("rules.yml"),
+        )
+        result: JsonDiff = self.comparator.compare(
+            {
+                "buttons": [{"title": "a"}, {"title": "b"}, {"title": "c"}],
+                "texts": ["a", "a", "b"],
+            },
+            {
+                "buttons": [
+                    {"title": "b", "ignored": {"key": 1}},
+                    {"title": "c"},
+                    {"title": "a"},
+                ],
+                "texts": ["b", "a", "a"],
+            },
+            rules,
+        )
+        self.assertTrue(result.identical)
+
+        result = self.comparator.compare(
+            {"buttons": [{"title": "a"}, {"title": "b"}], "texts": ["a", "a"]},
+            {"buttons": [{"title": "c"}, {"title": "a"}], "texts": ["b", "a"]},
+            rules,
+        )
+        self.assertEqual(
+            result.missing_entries,
+            {JsonPath("buttons", "_2", "title"): "b", JsonPath("texts", "_2"): "a"},
+        )
+        self.assertEqual(
+            result.extra_entries,
+            {JsonPath("buttons", "_1", "title"): "c", JsonPath("texts", "_1"): "b"},
+        )
+
+    def test_compare_unordered_lists_with_rules(self):
+        rules = MatcherRules.from_dict(
+            {
+                "buttons": {"unordered": True},
+                "buttons.*.payload": {"regex": "/choose.*"},
+            },
+            Path("rules.yml"),
+        )
+        result: JsonDiff = self.comparator.compare(
+            {"buttons": [{"title": "a", "payload": ""}, {"title": "b"}]},
+            {"buttons": [{"title": "b"}, {"title": "a", "payload": "/choose_a"}]},
+            rules,
+        )
+        self.assertTrue(result.identical)
+
+        result = self.comparator.compare(
+            {"buttons": [{"title": "a", "payload": ""}]},
+            {"buttons": [{"title": "a", "payload": "/other"}]},
+            rules,
+        )
+        self.assertEqual(
+            result.missing_entries,
+            {
+                JsonPath("buttons", "_1", "title"): "a",
+                JsonPath("buttons", "_1", "payload"): "",
+            },
+        )
+
+    def test_compare_inserted_entry(self):
+        expected = [{"text": f"message {index}"} for index in range(30)]
+        result: JsonDiff = self.comparator.compare(
+            expected, [{"text": "inserted"}] + expected
+        )
+        self.assertEqual(result.missing_entries, {})
+        self.assertEqual(result.extra_entries, {JsonPath("_1", "text"): "inserted"})
+
+        result = self.comparator.compare(expected, expected[:10] + expected[11:])
+        self.assertEqual(
+            result.missing_entries, {JsonPath("_11", "text"): "message 10"}
+        )
+        self.assertEqual(result.extra_entries, {})
+
+    def test_compare_replaced_entry_after_insertion(self):
+        result: JsonDiff = self.comparator.compare(
+            [{"text": "a"}, {"text": "b", "buttons": [1]}, {"text": "c"}],
+            [{"text": "new"}, {"text": "a"}, {"text": "b", "buttons": [2]}],
+        )
+        self.assertEqual(
+            result.missing_entries,
+            {JsonPath("_2", "buttons", "_1"): 1, JsonPath("_3", "text"): "c"},
+        )
+        self.assertEqual(
+            result.extra_entries,
+            {JsonPath("_1", "text"): "new", JsonPath("_3", "buttons", "_1"): 2},
+        )
+
+    def test_compare_aligned_entries_with_rules(self):
+        rules = MatcherRules.from_dict(
+            {"messages": {"subset": True}, "messages.*.id": {"type": "string"}},
+            Path("rules.yml"),
+        )
+        result: JsonDiff = self.comparator.compare(
+            {"messages": [{"id": None, "text": "a"}, {"id": None, "text": "b"}]},
+            {
+                "messages": [
+                    {"id": "1", "text": "inserted"},
+                    {"id": "2", "text": "a"},
+                    {"id": "3", "text": "b"},
+                ]
+            },
+            rules,
+        )
+        self.assertTrue(result.identical)
@@ -0,0 +1,181 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Thread
+from typing import Optional
+from unittest import TestCase
+from unittest.mock import patch
+
+import requests
+from click.testing import CliRunner
+from httmock import HTTMock, response, urlmatch
+
+from rasa_integration_testing.application import cli
+from rasa_integration_testing.common.configuration import (
+    Configuration,
+    DependencyInjector,
+)
+from rasa_integration_testing.comparator import JsonDiff
+from rasa_integration_testing.daemon import DaemonServer, RunDaemon
+from rasa_integration_testing.interaction import InteractionLoader
+from rasa_integration_testing.rest_runner import RestRunner
+from rasa_integration_testing.runner import FailedInteraction
+from rasa_integration_testing.scenario import Scenario, ScenarioFragmentLoader
+from rasa_integration_testing.watch import SuiteWatcher
+
+LOCALHOST = "localhost"
+BOT_NETLOC = "127.0.0.1:8080"
+SUCCESS_TESTS_PATH = Path("tests/main_scenarios/success")
+FAILURE_TESTS_PATH = Path("tests/main_scenarios/fail")
+WORKER_COUNT = 2
+
+
+class TestRunDaemon(TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(WORKER_COUNT)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_select_scenarios(self):
+        daemon = self._daemon(SUCCESS_TESTS_PATH, _passing_run)
+
+        self.assertEqual(
+            _names(daemon.select(None, None)), ["subset/successA", "success"]
+        )
+        self.assertEqual(_names(daemon.select("subset", None)), ["subset/successA"])
+        self.assertEqual(_names(daemon.select(None, ["success"])), ["success"])
+        self.assertEqual(daemon.select("subset", ["success"]), [])
+
+    def test_run_statuses(self):
+        def run_scenario(scenario: Scenario) -> Optional[FailedInteraction]:
+            if scenario.name == "success":
+                raise ConnectionError("bot unreachable")
+            return FailedInteraction({}, {"text": "hi"}, {}, JsonDiff({}, {}))
+
+        daemon = self._daemon(SUCCESS_TESTS_PATH, run_scenario)
+        *results, summary = daemon.run(daemon.select(None, None))
+
+        self.assertEqual(
+            [(result["scenario"], result["status"]) for result in results],
+            [("subset/successA", "failed"), ("success", "error")],
+        )
+        self.assertEqual(
+            results[0]["failed_interaction"]["expected_output"], {"text": "hi"}
+        )
+        self.assertIn("bot unreachable", results[1]["error"])
+        self.assertEqual(
+            summary["summary"], {"scenarios": 2, "passed": 0, "failed": 1, "errors": 1}
+        )
+
+    def _daemon(self, tests_path: Path, run_scenario) -> RunDaemon:
+        watcher = SuiteWatcher(
+            tests_path,
+            "*.yml",
+            ScenarioFragmentLoader(tests_path),
+            InteractionLoader(tests_path),
+        )
+        return RunDaemon(watcher, run_scenario, self.executor, WORKER_COUNT)
+
+
+class TestDaemonServer(TestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(WORKER_COUNT)
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.executor.shutdown()
+
+    def test_stream_results(self):
+        url = self._serve(SUCCESS_TESTS_PATH)
+
+        with HTTMock(bot_response):
+            lines = _post_run(url, {"glob": "*.yml"})
+            repeated_lines = _post_run(url, {"scenarios": ["success"]})
+
+        self.assertEqual(
+            [line.get("status") for line in lines], ["passed", "passed", None]
+        )
+        self.assertEqual(lines[-1]["summary"]["passed"], 2)
+        self.assertEqual(repeated_lines[0]["scenario"], "success")
+
+    def test_failed_scenario(self):
+        url = self._serve(FAILURE_TESTS_PATH)
+
+        with HTTMock(bot_response):
+            result, summary = _post_run(url, {})
+
+        self.assertEqual(result["status"], "failed")
+        self.assertTrue(result["failed_interaction"]["output_diff"]["missing_entries"])
+        self.assertEqual(summary["summary"]["failed"], 1)
+
+    def test_invalid_requests(self):
+        url = self._serve(SUCCESS_TESTS_PATH)
+
+        self.assertEqual(requests.post(f"{url}/run", data="[").status_code, 400)
+        self.assertEqual(
+            requests.post(f"{url}/run", json={"scenarios": "success"}).status_code, 400
+        )
+        self.assertEqual(
+            requests.post(f"{url}/run", json={"glob": "/scenarios/*.yml"}).status_code,
+            400,
+        )
+        self.assertEqual(requests.post(f"{url}/stop", json={}).status_code, 404)
+
+    def _serve(self, tests_path: Path) -> str:
+        injector = DependencyInjector(
+            Configuration(tests_path / "config.ini"), {"tests_path": tests_path}
+        )
+
+        def run_scenario(scenario: Scenario) -> Optional[FailedInteraction]:
+            with injector.scenario_scope():
+                return injector.autowire(RestRunner).run(scenario)
+
+        watcher = SuiteWatcher(
+            tests_path,
+            "*.yml",
+            ScenarioFragmentLoader(tests_path),
+            InteractionLoader(tests_path),
+        )
+        server = DaemonServer(
+            (LOCALHOST, 0),
+            RunDaemon(watcher, run_scenario, self.executor, WORKER_COUNT),
+        )
+        Thread(target=server.serve_forever, daemon=True).start()
+        self.servers.append(server)
+        return f"http://{LOCALHOST}:{server.server_port}"
+
+
+class TestServeCommand(TestCase):
+    @patch.object(DaemonServer, "serve_forever", side_effect=KeyboardInterrupt)
+    def test_serve(self, serve_forever):
+        execution = CliRunner().invoke(
+            cli, ["serve", str(SUCCESS_TESTS_PATH), "-p", "0", "-k", "1"]
+        )
+
+        self.assertEqual(execution.exit_code, 0)
+        self.assertIn("Serving runs of 2 scenarios", execution.output)
+        serve_forever.assert_called_once()
+
+
+def _post_run(url: str, request: dict) -> list:
+    with requests.post(f"{url}/run", json=request, stream=True) as run_response:
+        run_response.raise_for_status()
+        return [json.loads(line) for line in run_response.iter_lines() if line]
+
+
+def _passing_run(scenario: Scenario) -> Optional[FailedInteraction]:
+    return None
+
+
+def _names(scenarios) -> list:
+    return [scenario.name for scenario in scenarios]
+
+
+@urlmatch(netloc=BOT_NETLOC)
+def bot_response(url, request):
+    headers = {"content-type": "application/json"}
+    return response(200, request.body, headers, None, 5, request)
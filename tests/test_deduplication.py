@@ -0,0 +1,116 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from httmock import HTTMock, all_requests, response
+
+from rasa_integration_testing.common.configuration import (
+    Configuration,
+    DependencyInjector,
+)
+from rasa_integration_testing.deduplication import (
+    ConversationDeduplicator,
+    conversation_digest,
+)
+from rasa_integration_testing.rest_runner import RestRunner
+from rasa_integration_testing.scenario import SCENARIOS_FOLDER, Scenario
+
+DUPLICATES_TESTS_PATH = Path("tests/main_scenarios/duplicates")
+SCENARIOS_PATH = DUPLICATES_TESTS_PATH / SCENARIOS_FOLDER
+
+
+class TestConversationDeduplicator(TestCase):
+    def setUp(self):
+        self.requests = []
+        injector = DependencyInjector(
+            Configuration(DUPLICATES_TESTS_PATH / "config.ini"),
+            {"tests_path": DUPLICATES_TESTS_PATH},
+        )
+        self.runner = injector.autowire(RestRunner)
+
+    def test_same_conversation_digest(self):
+        self.assertEqual(
+            conversation_digest(self.runner, _scenario("fragmented")),
+            conversation_digest(self.runner, _scenario("inlined")),
+        )
+        self.assertNotEqual(
+            conversation_digest(self.runner, _scenario("fragmented")),
+            conversation_digest(self.runner, _scenario("different")),
+        )
+
+    def test_different_rules_digest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            tests_path = Path(directory) / "duplicates"
+            shutil.copytree(DUPLICATES_TESTS_PATH, tests_path)
+            bot_path = tests_path / "interactions/bot"
+            shutil.copy(bot_path / "bot1.jinja", bot_path / "lenient_bot1.jinja")
+            scenario_path = tests_path / SCENARIOS_FOLDER / "lenient.yml"
+            scenario_path.write_text(
+                (tests_path / SCENARIOS_FOLDER / "inlined.yml")
+                .read_text()
+                .replace("bot: bot1", "bot: lenient_bot1")
+            )
+            runner = DependencyInjector(
+                Configuration(tests_path / "config.ini"), {"tests_path": tests_path}
+            ).autowire(RestRunner)
+            inlined = Scenario.from_file(
+                "inlined", tests_path / SCENARIOS_FOLDER / "inlined.yml"
+            )
+            lenient = Scenario.from_file("lenient", scenario_path)
+            self.assertEqual(
+                conversation_digest(runner, inlined),
+                conversation_digest(runner, lenient),
+            )
+
+            (bot_path / "lenient_bot1.rules.yml").write_text("text:\n  ignore: true\n")
+            runner.interaction_loader.reload_rules()
+            self.assertNotEqual(
+                conversation_digest(runner, inlined),
+                conversation_digest(runner, lenient),
+            )
+
+    def test_run_once_per_conversation(self):
+        deduplicator = ConversationDeduplicator()
+
+        with HTTMock(self.request_response):
+            results = [
+                deduplicator.run(self.runner, _scenario(name))
+                for name in ("fragmented", "copied", "inlined", "different")
+            ]
+
+        self.assertListEqual(
+            results,
+            [(None, None), ("fragmented", None), ("fragmented", None), (None, None)],
+        )
+        self.assertEqual(deduplicator.saved_count, 2)
+        self.assertEqual(len(self.requests), 8)
+
+    def test_shared_failure(self):
+        deduplicator = ConversationDeduplicator()
+
+        with HTTMock(failing_response):
+            _, failure = deduplicator.run(self.runner, _scenario("fragmented"))
+            shared_name, shared_failure = deduplicator.run(
+                self.runner, _scenario("inlined")
+            )
+
+        self.assertIsNotNone(failure)
+        self.assertEqual(shared_name, "fragmented")
+        self.assertIs(shared_failure, failure)
+
+    @all_requests
+    def request_response(self, url, request):
+        self.requests.append(request.body)
+        headers = {"content-type": "application/json"}
+        return response(200, request.body, headers, None, 5, request)
+
+
+@all_requests
+def failing_response(url, request):
+    headers = {"content-type": "application/json"}
+    return response(200, {"text": "unexpected"}, headers, None, 5, request)
+
+
+def _scenario(name: str) -> Scenario:
+    return Scenario.from_file(name, SCENARIOS_PATH / f"{name}.yml")
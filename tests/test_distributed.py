@@ -0,0 +1,159 @@
+import json
+import time
+from pathlib import Path
+from threading import Thread
+from unittest import TestCase
+
+from click.testing import CliRunner
+from httmock import HTTMock, response, urlmatch
+
+from rasa_integration_testing.application import cli
+from rasa_integration_testing.common.configuration import (
+    Configuration,
+    DependencyInjector,
+)
+from rasa_integration_testing.comparator import JsonDiff, JsonPath
+from rasa_integration_testing.distributed import (
+    STATUS_DONE,
+    STATUS_WAIT,
+    STATUS_WORK,
+    Coordinator,
+    CoordinatorServer,
+    Worker,
+    WorkResult,
+)
+from rasa_integration_testing.rest_runner import RestRunner
+from rasa_integration_testing.runner import FailedInteraction
+from rasa_integration_testing.scenario import (
+    SCENARIOS_FOLDER,
+    ScenarioFragmentLoader,
+    load_scenarios,
+)
+
+LOCALHOST = "localhost"
+BOT_NETLOC = "127.0.0.1:8080"
+MATRIX_TESTS_PATH = Path("tests/main_scenarios/matrix")
+FAILURE_TESTS_PATH = Path("tests/main_scenarios/fail")
+WORKER_COUNT = 3
+COORDINATOR_WAIT = 10.0
+
+
+class TestCoordinator(TestCase):
+    def test_lease_scenarios(self):
+        coordinator = _coordinator(MATRIX_TESTS_PATH)
+
+        leases = [coordinator.lease("worker") for _ in range(4)]
+        self.assertTrue(all(status == STATUS_WORK for status, _ in leases))
+        self.assertEqual(coordinator.lease("worker"), (STATUS_WAIT, None))
+
+        for _, lease in leases:
+            self.assertTrue(
+                coordinator.complete(
+                    lease.unit, WorkResult(lease.scenario["name"], "worker")
+                )
+            )
+
+        self.assertTrue(coordinator.wait(0))
+        self.assertEqual(coordinator.lease("worker"), (STATUS_DONE, None))
+        self.assertEqual(len(coordinator.results), 4)
+
+    def test_expired_lease(self):
+        coordinator = _coordinator(MATRIX_TESTS_PATH, lease_timeout=0)
+
+        _, lease = coordinator.lease("slow")
+        _, stolen_lease = coordinator.lease("fast")
+        self.assertEqual(lease.unit, stolen_lease.unit)
+        self.assertEqual(stolen_lease.worker, "fast")
+
+        result = WorkResult(lease.scenario["name"], "fast")
+        self.assertTrue(coordinator.complete(stolen_lease.unit, result))
+        self.assertFalse(coordinator.complete(lease.unit, result))
+        self.assertEqual(len(coordinator.results), 1)
+
+    def test_serialized_failed_interaction(self):
+        failed_interaction = FailedInteraction(
+            {"text": "hello"},
+            {"text": "hi"},
+            {"text": "what?"},
+            JsonDiff({JsonPath("text"): "hi"}, {JsonPath("text"): "what?"}),
+        )
+        deserialized = FailedInteraction.from_dict(
+            json.loads(json.dumps(failed_interaction.to_dict()))
+        )
+
+        self.assertEqual(deserialized.user_input, failed_interaction.user_input)
+        self.assertEqual(
+            deserialized.output_diff.extra_entries,
+            failed_interaction.output_diff.extra_entries,
+        )
+
+
+class TestWorkers(TestCase):
+    def setUp(self):
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def test_several_workers(self):
+        coordinator = _coordinator(MATRIX_TESTS_PATH)
+        url = self._serve(coordinator)
+        workers = [_worker(url, MATRIX_TESTS_PATH) for _ in range(WORKER_COUNT)]
+
+        with HTTMock(bot_response):
+            threads = [Thread(target=worker.run) for worker in workers]
+            for thread in threads:
+                thread.start()
+            self.assertTrue(coordinator.wait(COORDINATOR_WAIT))
+            for thread in threads:
+                thread.join(COORDINATOR_WAIT)
+
+        self.assertEqual(len(coordinator.results), 4)
+        self.assertTrue(all(result.successful for result in coordinator.results))
+        self.assertEqual(sum(worker.scenario_count for worker in workers), 4)
+
+    def test_failed_interaction_reported(self):
+        coordinator = _coordinator(FAILURE_TESTS_PATH)
+        url = self._serve(coordinator)
+
+        with HTTMock(bot_response):
+            execution = CliRunner().invoke(
+                cli, ["work", url, str(FAILURE_TESTS_PATH), "-k", "2"]
+            )
+
+        self.assertEqual(execution.exit_code, 0)
+        self.assertTrue(coordinator.wait(0))
+        (result,) = coordinator.results
+        self.assertFalse(result.successful)
+        self.assertIsNotNone(result.failed_interaction.output_diff.missing_entries)
+
+    def _serve(self, coordinator: Coordinator) -> str:
+        server = CoordinatorServer((LOCALHOST, 0), coordinator)
+        Thread(target=server.serve_forever, daemon=True).start()
+        self.servers.append(server)
+        return f"http://{LOCALHOST}:{server.server_port}"
+
+
+def _coordinator(tests_path: Path, lease_timeout: float = 60.0) -> Coordinator:
+    return Coordinator(
+        load_scenarios(tests_path / SCENARIOS_FOLDER, "*.yml"),
+        ScenarioFragmentLoader(tests_path),
+        lease_timeout,
+    )
+
+
+def _worker(url: str, tests_path: Path) -> Worker:
+    injector = DependencyInjector(
+        Configuration(tests_path / "config.ini"), {"tests_path": tests_path}
+    )
+    return Worker(url, injector, RestRunner, 2)
+
+
+@urlmatch(netloc=BOT_NETLOC)
+def bot_response(url, request):
+    # Slow enough for every worker to get a share of the scenarios.
+    time.sleep(0.05)
+    headers = {"content-type": "application/json"}
+    return response(200, request.body, headers, None, 5, request)
@@ -0,0 +1,135 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from rasa_integration_testing.history import (
+    DURATION_SMOOTHING,
+    TimingHistory,
+    percentile,
+)
+from rasa_integration_testing.scenario import Scenario
+
+HISTORY_FILENAME = "history.sqlite"
+
+
+class TestTimingHistory(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.history_path = Path(self.directory.name) / HISTORY_FILENAME
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_record_runs(self):
+        history = TimingHistory(self.history_path)
+        self.assertDictEqual(history.timings, {})
+        history.record("short", 1.0, False)
+        history.record("long", 10.0, True)
+        history.save()
+
+        history = TimingHistory(self.history_path)
+        self.assertDictEqual(
+            history.timings, {"short": (1.0, False), "long": (10.0, True)}
+        )
+
+        history.record("long", 20.0, False)
+        history.save()
+
+        duration, failed = TimingHistory(self.history_path).timings["long"]
+        self.assertAlmostEqual(
+            duration, DURATION_SMOOTHING * 20.0 + (1 - DURATION_SMOOTHING) * 10.0
+        )
+        self.assertFalse(failed)
+
+    def test_empty_run_not_saved(self):
+        history = TimingHistory(self.history_path)
+        history.record("short", 1.0, False)
+        history.save()
+        history.save()
+
+        (slowest_last_run,) = TimingHistory(self.history_path).slowest(1, 1)
+        self.assertEqual(slowest_last_run.name, "short")
+
+    def test_longest_first(self):
+        history = self._history()
+
+        self.assertListEqual(
+            _names(history.schedule(_scenarios(), True, False)),
+            ["long", "new", "failed", "short"],
+        )
+
+    def test_failed_first(self):
+        history = self._history()
+
+        self.assertListEqual(
+            _names(history.schedule(_scenarios(), False, True)),
+            ["failed", "short", "long", "new"],
+        )
+        self.assertListEqual(
+            _names(history.schedule(_scenarios(), True, True)),
+            ["failed", "long", "new", "short"],
+        )
+
+    def test_slowest(self):
+        self._save_runs({"short": [1.0, 1.0, 9.0], "long": [5.0, 5.0, 5.0]})
+
+        history = TimingHistory(self.history_path)
+        slowest = history.slowest(1, 3)
+        self.assertEqual(len(slowest), 1)
+        self.assertEqual(slowest[0].name, "long")
+        self.assertEqual(slowest[0].run_count, 3)
+        self.assertAlmostEqual(slowest[0].mean_turn_latency_p95, 0.5)
+
+        (slowest_last_run,) = history.slowest(1, 1)
+        self.assertEqual(slowest_last_run.name, "short")
+        self.assertEqual(slowest_last_run.max_duration, 9.0)
+
+    def test_percentile_growth(self):
+        self._save_runs(
+            {
+                "stable": [2.0, 2.0, 2.1, 2.0],
+                "drifting": [1.0, 1.0, 1.5, 1.6],
+                "new": [None, None, 1.0, 1.0],
+            }
+        )
+
+        history = TimingHistory(self.history_path)
+        (growth,) = history.percentile_growth(0.2, 2)
+        self.assertEqual(growth.name, "drifting")
+        self.assertEqual(growth.previous_duration, 1.0)
+        self.assertEqual(growth.recent_duration, 1.6)
+        self.assertListEqual(history.percentile_growth(0.2, 4), [])
+
+    def test_percentile(self):
+        self.assertEqual(percentile([1.0], 95), 1.0)
+        self.assertEqual(percentile([float(value) for value in range(1, 21)], 95), 19.0)
+        self.assertEqual(
+            percentile([float(value) for value in range(1, 101)], 95), 95.0
+        )
+
+    def _save_runs(self, durations):
+        run_count = len(next(iter(durations.values())))
+        for run in range(run_count):
+            history = TimingHistory(self.history_path)
+            for name, scenario_durations in durations.items():
+                if scenario_durations[run] is not None:
+                    history.record(
+                        name, scenario_durations[run], False, [0.1, 0.5, 0.2]
+                    )
+            history.save()
+
+    def _history(self) -> TimingHistory:
+        history = TimingHistory(self.history_path)
+        history.record("short", 1.0, False)
+        history.record("long", 10.0, False)
+        history.record("failed", 5.0, True)
+        history.save()
+        return TimingHistory(self.history_path)
+
+
+def _scenarios():
+    return [Scenario(name, []) for name in ("short", "long", "failed", "new")]
+
+
+def _names(scenarios):
+    return [scenario.name for scenario in scenarios]
@@ -0,0 +1,105 @@
+from pathlib import Path
+from unittest import TestCase
+
+from rasa_integration_testing.interaction import InteractionLoader, InteractionTurn
+from rasa_integration_testing.matcher import (
+    NO_RULES,
+    MatcherRules,
+    MatcherRulesError,
+    rules_filename,
+)
+
+RULES_PATH = Path("rules.yml")
+MATCHER_RULES_TESTS_PATH = Path("tests/main_scenarios/matcher_rules")
+
+
+class TestMatcherRules(TestCase):
+    def setUp(self):
+        self.rules = MatcherRules.from_dict(
+            {
+                "text": {"regex": "hi.*"},
+                "buttons.*.payload": {"type": "string"},
+                "**.timestamp": {"ignore": True},
+                "custom.**": {"subset": True},
+                "custom.amount": {"tolerance": 0.1},
+            },
+            RULES_PATH,
+        )
+
+    def test_literal_path(self):
+        self.assertEqual(self._rule("text").kind, "regex")
+        self.assertIsNone(self._rule("texts"))
+        self.assertIsNone(self._rule("text", "_1"))
+
+    def test_wildcard(self):
+        self.assertEqual(self._rule("buttons", "_2", "payload").kind, "type")
+        self.assertIsNone(self._rule("buttons", "payload"))
+
+    def test_recursive_wildcard(self):
+        self.assertEqual(self._rule("timestamp").kind, "ignore")
+        self.assertEqual(self._rule("a", "_1", "b", "timestamp").kind, "ignore")
+        self.assertEqual(self._rule("custom").kind, "subset")
+        self.assertEqual(self._rule("custom", "a", "b").kind, "subset")
+
+    def test_first_rule_wins(self):
+        self.assertEqual(self._rule("custom", "amount").kind, "subset")
+
+    def test_child_rules(self):
+        child_rules = self.rules.child("buttons")
+        state = child_rules.advance(child_rules.initial_state, "_1")
+        self.assertEqual(
+            child_rules.rule(child_rules.advance(state, "payload")).kind, "type"
+        )
+
+    def test_matches(self):
+        self.assertTrue(self._rule("text").matches("", "hi there"))
+        self.assertFalse(self._rule("text").matches("", "oh hi"))
+        self.assertFalse(self._rule("text").matches("", 12))
+        self.assertTrue(self._rule("buttons", "_1", "payload").matches(None, "/greet"))
+        self.assertFalse(self._rule("buttons", "_1", "payload").matches(None, 1))
+        self.assertTrue(self._tolerance_rule().matches(1.0, 1.05))
+        self.assertFalse(self._tolerance_rule().matches(1.0, 1.5))
+        self.assertFalse(self._tolerance_rule().matches(1.0, True))
+
+    def test_invalid_rules(self):
+        for rules in (
+            [],
+            {"text": "regex"},
+            {
+                "text": {
+                    "regex": "(",
+                }
+            },
+            {"text": {"type": "text"}},
+            {"text": {"tolerance": "1"}},
+            {"text": {"subset": False}},
+            {"buttons": {"unordered": "yes"}},
+            {"text": {"equals": 1}},
+        ):
+            with self.subTest(rules=rules):
+                with self.assertRaises(MatcherRulesError):
+                    MatcherRules.from_dict(rules, RULES_PATH)
+
+    def test_no_rules(self):
+        self.assertIsNone(NO_RULES.rule(NO_RULES.advance(NO_RULES.initial_state, "a")))
+
+    def test_loader_rules(self):
+        loader = InteractionLoader(MATCHER_RULES_TESTS_PATH)
+        rules = loader.bot_turn_rules(InteractionTurn("dynamic"))
+
+        self.assertIs(rules, loader.bot_turn_rules(InteractionTurn("dynamic")))
+        self.assertEqual(
+            rules.rule(rules.advance(rules.initial_state, "id")).kind, "type"
+        )
+        self.assertIs(loader.bot_turn_rules(InteractionTurn("missing")), NO_RULES)
+        self.assertEqual(rules_filename("bot/welcome.jinja"), "bot/welcome.rules.yml")
+
+    def _rule(self, *elements: str):
+        state = self.rules.initial_state
+        for element in elements:
+            state = self.rules.advance(state, element)
+        return self.rules.rule(state)
+
+    def _tolerance_rule(self):
+        rules = MatcherRules.from_dict({"a": {"tolerance": 0.1}}, RULES_PATH)
+        return rules.rule(rules.advance(rules.initial_state, "a"))
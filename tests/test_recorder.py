@@ -0,0 +1,149 @@
+import json
+import os
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from threading import Thread
+from unittest import TestCase
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from rasa_integration_testing.interaction import Interaction, InteractionTurn
+from rasa_integration_testing.recorder import ConversationRecorder, RecordingProxy
+from rasa_integration_testing.scenario import Scenario
+from rasa_integration_testing.test_writer import BOT, SCENARIO_FILENAME, USER
+
+LOCALHOST = "localhost"
+SENDER_ID = "sender/1"
+SESSION_NAME = "sender_1"
+WEBHOOK_PATH = "/webhooks/rest/webhook"
+IDLE_SESSION_WAIT = 5.0
+AUTHORIZATION_HEADER = "Authorization"
+ECHOED_AUTHORIZATION_HEADER = "X-Authorization"
+BAD_GATEWAY_STATUS = 502
+
+
+class TestConversationRecorder(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.output_path = Path(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_record_sessions(self):
+        recorder = ConversationRecorder(self.directory.name)
+        recorder.record(SENDER_ID, {"text": "hello"}, [{"text": "hi"}])
+        recorder.record(SENDER_ID, {"text": "bye"}, [{"text": "goodbye"}])
+        recorder.end_session(SENDER_ID)
+        recorder.record(SENDER_ID, {"text": "again"}, [{"text": "welcome back"}])
+        recorder.close()
+
+        self.assertEqual(
+            [SESSION_NAME, f"{SESSION_NAME}_2"], sorted(os.listdir(self.output_path))
+        )
+        scenario = Scenario.from_file(
+            SESSION_NAME, self.output_path / SESSION_NAME / SCENARIO_FILENAME
+        )
+        self.assertEqual(
+            [
+                Interaction(InteractionTurn("user1"), InteractionTurn("bot1")),
+                Interaction(InteractionTurn("user2"), InteractionTurn("bot2")),
+            ],
+            scenario.steps,
+        )
+        with open(self.output_path / SESSION_NAME / BOT / "bot2.json") as bot_file:
+            self.assertEqual([{"text": "goodbye"}], json.load(bot_file))
+
+    def test_idle_session(self):
+        recorder = ConversationRecorder(self.directory.name, idle_timeout=0)
+        recorder.record(SENDER_ID, {"text": "hello"}, [{"text": "hi"}])
+
+        deadline = time.monotonic() + IDLE_SESSION_WAIT
+        while SESSION_NAME not in os.listdir(self.output_path):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.1)
+        recorder.close()
+        self.assertEqual([SESSION_NAME], os.listdir(self.output_path))
+
+
+class TestRecordingProxy(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.target = HTTPServer((LOCALHOST, 0), EchoRequestHandler)
+        Thread(target=self.target.serve_forever, daemon=True).start()
+
+        self.recorder = ConversationRecorder(self.directory.name)
+        self.proxy = RecordingProxy(
+            (LOCALHOST, 0),
+            f"http://{LOCALHOST}:{self.target.server_port}/",
+            self.recorder,
+        )
+        Thread(target=self.proxy.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.proxy.shutdown()
+        self.proxy.server_close()
+        self.target.shutdown()
+        self.target.server_close()
+        self.directory.cleanup()
+
+    def test_record_conversation(self):
+        response = self._post({"sender": SENDER_ID, "message": "hello"})
+        self.assertEqual([{"message": "hello"}], response)
+        self._post({"sender": SENDER_ID, "message": "bye"})
+        self._post({"message": "no sender"})
+        self.recorder.close()
+
+        session_path = Path(self.directory.name) / SESSION_NAME
+        self.assertEqual([SESSION_NAME], os.listdir(self.directory.name))
+        with open(session_path / USER / "user2.json") as user_file:
+            self.assertEqual({"message": "bye"}, json.load(user_file))
+        with open(session_path / BOT / "bot2.json") as bot_file:
+            self.assertEqual([{"message": "bye"}], json.load(bot_file))
+
+    def test_forward_headers(self):
+        request = self._request({"message": "hello"}, {AUTHORIZATION_HEADER: "token"})
+        with urlopen(request) as response:
+            self.assertEqual("token", response.headers[ECHOED_AUTHORIZATION_HEADER])
+
+    def test_unreachable_target(self):
+        self.target.shutdown()
+        self.target.server_close()
+        with self.assertRaises(HTTPError) as context:
+            self._post({"sender": SENDER_ID, "message": "hello"})
+        self.assertEqual(BAD_GATEWAY_STATUS, context.exception.code)
+        self.recorder.close()
+        self.assertEqual([], os.listdir(self.directory.name))
+
+    def _post(self, user_input: dict):
+        with urlopen(self._request(user_input, {})) as response:
+            return json.load(response)
+
+    def _request(self, user_input: dict, headers: dict) -> Request:
+        return Request(
+            f"http://{LOCALHOST}:{self.proxy.server_port}{WEBHOOK_PATH}",
+            data=json.dumps(user_input).encode(),
+            headers={"Content-Type": "application/json", **headers},
+        )
+
+
+class EchoRequestHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        user_input = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        user_input.pop("sender", None)
+        content = json.dumps([user_input]).encode()
+
+        self.send_response(200 if self.path == WEBHOOK_PATH else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        if AUTHORIZATION_HEADER in self.headers:
+            self.send_header(
+                ECHOED_AUTHORIZATION_HEADER, self.headers[AUTHORIZATION_HEADER]
+            )
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
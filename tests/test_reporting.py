@@ -0,0 +1,83 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from rasa_integration_testing.comparator import JsonDiff, JsonPath
+from rasa_integration_testing.reporting import FailureRenderer
+from rasa_integration_testing.runner import FailedInteraction
+
+MAX_VALUE_LENGTH = 100
+MAX_DIFF_ENTRIES = 3
+
+
+class TestFailureRenderer(TestCase):
+    def setUp(self):
+        self.renderer = FailureRenderer(
+            max_value_length=MAX_VALUE_LENGTH, max_diff_entries=MAX_DIFF_ENTRIES
+        )
+
+    def test_short_value(self):
+        self.assertEqual(self.renderer.format_value({"text": "hi"}), "{'text': 'hi'}")
+
+    def test_huge_value(self):
+        payload = {
+            "custom": [{"id": index, "text": "x" * 10_000} for index in range(1000)]
+        }
+
+        formatted_value = self.renderer.format_value(payload)
+
+        self.assertEqual(len(formatted_value), MAX_VALUE_LENGTH + len("..."))
+        self.assertTrue(formatted_value.endswith("..."))
+
+    def test_long_strings(self):
+        renderer = FailureRenderer(max_value_length=5000)
+        formatted_value = renderer.format_value({"text": "x" * 1000})
+        self.assertEqual(formatted_value, repr({"text": "x" * 1000}))
+
+    def test_diff_lines(self):
+        output_diff = JsonDiff(
+            {JsonPath("text"): "hi", JsonPath("a"): 1, JsonPath("b"): 2},
+            {JsonPath("text"): "hello", JsonPath("c"): 3},
+        )
+
+        lines, omitted_count = self.renderer.diff_lines(output_diff)
+
+        self.assertEqual(
+            lines,
+            [
+                ("-", JsonPath("text"), "'hi'"),
+                ("+", JsonPath("text"), "'hello'"),
+                ("-", JsonPath("a"), "1"),
+            ],
+        )
+        self.assertEqual(omitted_count, 2)
+        self.assertEqual(len(output_diff.extra_entries), 2)
+
+    def test_artifact(self):
+        failed_interaction = FailedInteraction(
+            {"message": "hi"},
+            {"text": "hello"},
+            {"text": "bye"},
+            JsonDiff({JsonPath("text"): "hello"}, {JsonPath("text"): "bye"}),
+        )
+        self.assertIsNone(self.renderer.write_artifact("greeting", failed_interaction))
+
+        with tempfile.TemporaryDirectory() as folder:
+            renderer = FailureRenderer(Path(folder))
+            artifact_path = renderer.write_artifact(
+                "pay_bill/greeting[language=en-US]?", failed_interaction
+            )
+
+            self.assertEqual(
+                artifact_path,
+                Path(folder, "pay_bill", "greeting[language=en-US]_.json"),
+            )
+            artifact = json.loads(artifact_path.read_text(encoding="utf-8"))
+            self.assertEqual(artifact["scenario"], "pay_bill/greeting[language=en-US]?")
+            self.assertEqual(artifact["actual_output"], {"text": "bye"})
+
+            artifact_path = renderer.write_artifact(
+                "greeting[path=../../x]", failed_interaction
+            )
+            self.assertEqual(artifact_path, Path(folder, "greeting[path=____x].json"))
@@ -1,10 +1,12 @@
 import json
+import tempfile
 from pathlib import Path
 from typing import Optional
 from unittest import TestCase
 
 from httmock import HTTMock, all_requests, response
 
+from rasa_integration_testing.cassette import RECORD_MODE, Cassette
 from rasa_integration_testing.common.configuration import (
     Configuration,
     DependencyInjector,
@@ -55,6 +57,41 @@ class TestRunner(TestCase):
             result = runner.run(Scenario.from_file("success", SUCCESS_SCENARIO_PATH))
             self.assertEqual(result, None)
 
+    def test_turn_latencies(self):
+        with HTTMock(request_response):
+            runner = _scenario_runner(SUCCESS_TESTS_PATH)
+            scenario = Scenario.from_file("success", SUCCESS_SCENARIO_PATH)
+            runner.run(scenario)
+            self.assertEqual(len(runner.turn_latencies), len(scenario.steps))
+
+    def test_cassette_conversation_ended(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cassette = Cassette.constructor(
+                str(Path(directory) / "cassette.sqlite"), RECORD_MODE
+            )
+            injector = DependencyInjector(
+                Configuration(SUCCESS_TESTS_PATH / f"config.{INI_EXTENSION}"),
+                {"tests_path": SUCCESS_TESTS_PATH},
+            )
+            injector.register(Cassette, cassette)
+            with HTTMock(request_response):
+                injector.autowire(RestRunner).run(
+                    Scenario.from_file("success", SUCCESS_SCENARIO_PATH)
+                )
+            self.assertEqual(cassette._conversation_keys, {})
+            self.assertGreater(cassette.save(), 0)
+
+    def test_variables_precedence(self):
+        runner = _scenario_runner(SUCCESS_TESTS_PATH)
+        scenario = Scenario(
+            "success", [], {"PATH": "scenario", "SENDER_ID": "scenario"}
+        )
+        variables = runner.scenario_variables(scenario, "sender")
+
+        self.assertEqual(variables["PATH"], "scenario")
+        self.assertEqual(variables["SENDER_ID"], "sender")
+        self.assertIn("HOME", variables)
+
     def test_fragmented(self):
         with HTTMock(request_response):
             runner = _scenario_runner(FRAGMENTED_TESTS_PATH)
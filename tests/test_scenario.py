@@ -1,3 +1,4 @@
+import tempfile
 from pathlib import Path
 from unittest import TestCase
 
@@ -6,6 +7,7 @@ from rasa_integration_testing.scenario import (
     Scenario,
     ScenarioFragmentReference,
     ScenarioParsingError,
+    scenario_files,
 )
 
 SCENARIO_ROOT = "tests/test_scenarios"
@@ -15,6 +17,11 @@ FRAGMENTED_SCENARIO = Path(f"{SCENARIO_ROOT}/fragmented.yml")
 INTERACTION_TEMPLATES_SCENARIO = Path(f"{SCENARIO_ROOT}/interaction_templates.yml")
 INVALID_PROPERTIES_SCENARIO = Path(f"{SCENARIO_ROOT}/invalid_properties.yml")
 INVALID_NOT_A_LIST_SCENARIO = Path(f"{SCENARIO_ROOT}/invalid_not_a_list.yml")
+MATRIX_SCENARIO = Path(f"{SCENARIO_ROOT}/matrix.yml")
+INVALID_MATRIX_SCENARIO = Path(f"{SCENARIO_ROOT}/invalid_matrix.yml")
+INVALID_DATA_SCENARIO = Path(f"{SCENARIO_ROOT}/invalid_data.yml")
+EMPTY_MATRIX_SCENARIO = Path(f"{SCENARIO_ROOT}/empty_matrix.yml")
+MATRIX_TESTS_PATH = Path("tests/main_scenarios/matrix")
 
 
 class TestScenario(TestCase):
@@ -86,3 +93,88 @@ class TestScenario(TestCase):
             f"Invalid scenario format: {INVALID_NOT_A_LIST_SCENARIO}",
         ):
             Scenario.from_file("invalid_not_a_list", INVALID_NOT_A_LIST_SCENARIO)
+
+    def test_simple_scenario_has_a_single_variant(self):
+        scenarios = list(Scenario.iter_from_file("simple", SIMPLE_SCENARIO))
+
+        self.assertEqual(len(scenarios), 1)
+        self.assertEqual(scenarios[0].name, "simple")
+        self.assertDictEqual(scenarios[0].variables, {})
+
+    def test_matrix_scenario(self):
+        scenarios = list(Scenario.iter_from_file("matrix", MATRIX_SCENARIO))
+
+        self.assertListEqual(
+            [scenario.name for scenario in scenarios],
+            [
+                "matrix[name=John,language=en,channel=web]",
+                "matrix[name=John,language=fr,channel=web]",
+                "matrix[name=Jane,language=en,channel=web]",
+                "matrix[name=Jane,language=fr,channel=web]",
+            ],
+        )
+        self.assertDictEqual(
+            scenarios[1].variables,
+            {"name": "John", "language": "fr", "channel": "web"},
+        )
+        self.assertListEqual(
+            scenarios[0].steps,
+            [
+                ScenarioFragmentReference("introduction"),
+                Interaction(InteractionTurn("greeting"), InteractionTurn("welcome")),
+            ],
+        )
+
+    def test_matrix_scenario_is_expanded_lazily(self):
+        scenarios = Scenario.iter_from_file("matrix", MATRIX_SCENARIO)
+
+        self.assertEqual(
+            next(scenarios).name, "matrix[name=John,language=en,channel=web]"
+        )
+
+    def test_invalid_matrix_scenario(self):
+        with self.assertRaisesRegex(
+            ScenarioParsingError, f"Invalid scenario matrix.*{INVALID_MATRIX_SCENARIO}"
+        ):
+            list(Scenario.iter_from_file("invalid_matrix", INVALID_MATRIX_SCENARIO))
+
+    def test_empty_matrix_scenario(self):
+        with self.assertRaisesRegex(
+            ScenarioParsingError, f"Invalid scenario matrix.*{EMPTY_MATRIX_SCENARIO}"
+        ):
+            list(Scenario.iter_from_file("empty_matrix", EMPTY_MATRIX_SCENARIO))
+
+    def test_folder_scenario_files(self):
+        self.assertEqual(
+            [MATRIX_TESTS_PATH / "scenarios/greeting.yml"],
+            scenario_files(MATRIX_TESTS_PATH, "scenarios"),
+        )
+
+    def test_folder_yaml_scenario_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            folder_path = Path(directory) / "greetings"
+            folder_path.mkdir()
+            for filename in ("hello.yml", "bye.yaml", "names.csv", "names.jsonl"):
+                (folder_path / filename).touch()
+
+            self.assertEqual(
+                sorted(scenario_files(Path(directory), "greetings")),
+                [folder_path / "bye.yaml", folder_path / "hello.yml"],
+            )
+
+    def test_invalid_data_scenario(self):
+        with self.assertRaisesRegex(
+            ScenarioParsingError, "Unsupported scenario data file"
+        ):
+            list(Scenario.iter_from_file("invalid_data", INVALID_DATA_SCENARIO))
+
+    def test_invalid_not_a_list_scenario_variants(self):
+        with self.assertRaisesRegex(
+            ScenarioParsingError,
+            f"Invalid scenario format: {INVALID_NOT_A_LIST_SCENARIO}",
+        ):
+            list(
+                Scenario.iter_from_file(
+                    "invalid_not_a_list", INVALID_NOT_A_LIST_SCENARIO
+                )
+            )
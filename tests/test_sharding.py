@@ -0,0 +1,96 @@
+from pathlib import Path
+from unittest import TestCase
+
+from rasa_integration_testing.interaction import Interaction, InteractionTurn
+from rasa_integration_testing.scenario import (
+    SCENARIOS_FOLDER,
+    Scenario,
+    ScenarioFragmentLoader,
+    ScenarioFragmentReference,
+    load_scenarios,
+)
+from rasa_integration_testing.sharding import Shard, scenario_weights
+
+DUPLICATES_TESTS_PATH = Path("tests/main_scenarios/duplicates")
+
+
+class TestShard(TestCase):
+    def test_from_string(self):
+        shard = Shard.from_string("2/16")
+        self.assertEqual((shard.index, shard.count), (2, 16))
+
+    def test_invalid_shard(self):
+        for shard in ("2", "a/2", "0/2", "3/2", "1/0", "-1/2"):
+            with self.subTest(shard=shard):
+                with self.assertRaises(ValueError):
+                    Shard.from_string(shard)
+
+    def test_select_partitions(self):
+        scenarios = [_scenario(f"scenario{index}") for index in range(20)]
+        weights = {
+            scenario.name: float(index % 7) for index, scenario in enumerate(scenarios)
+        }
+
+        shards = [Shard(index, 3).select(scenarios, weights) for index in range(1, 4)]
+        self.assertCountEqual(
+            [scenario for shard in shards for scenario in shard], scenarios
+        )
+        loads = [sum(weights[scenario.name] for scenario in shard) for shard in shards]
+        self.assertLessEqual(max(loads) - min(loads), max(weights.values()))
+        self.assertEqual(shards[0], sorted(shards[0], key=scenarios.index))
+
+    def test_select_deterministic(self):
+        scenarios = [_scenario(f"scenario{index}") for index in range(10)]
+        weights = {scenario.name: 1.0 for scenario in scenarios}
+
+        self.assertEqual(
+            [scenario.name for scenario in Shard(2, 4).select(scenarios, weights)],
+            [
+                scenario.name
+                for scenario in Shard(2, 4).select(reversed(scenarios), weights)
+            ][::-1],
+        )
+
+    def test_more_shards_than_scenarios(self):
+        scenarios = [_scenario("only")]
+        self.assertEqual(Shard(1, 2).select(scenarios, {"only": 1.0}), scenarios)
+        self.assertEqual(Shard(2, 2).select(scenarios, {"only": 1.0}), [])
+
+
+class TestScenarioWeights(TestCase):
+    def setUp(self):
+        self.fragment_loader = ScenarioFragmentLoader(DUPLICATES_TESTS_PATH)
+        self.scenarios = load_scenarios(
+            DUPLICATES_TESTS_PATH / SCENARIOS_FOLDER, "*.yml"
+        )
+
+    def test_turn_counts(self):
+        weights = scenario_weights(self.scenarios, self.fragment_loader, {})
+        self.assertEqual(
+            weights,
+            {"fragmented": 6.0, "inlined": 6.0, "copied": 6.0, "different": 2.0},
+        )
+
+    def test_recorded_durations(self):
+        weights = scenario_weights(
+            self.scenarios, self.fragment_loader, {"inlined": 12.0, "different": 4.0}
+        )
+        self.assertEqual(weights["inlined"], 12.0)
+        self.assertEqual(weights["different"], 4.0)
+        # Two seconds per turn, as recorded for the other scenarios.
+        self.assertEqual(weights["fragmented"], 12.0)
+
+    def test_missing_fragment(self):
+        scenario = Scenario(
+            "missing", [ScenarioFragmentReference("missing"), _interaction()]
+        )
+        weights = scenario_weights([scenario], self.fragment_loader, {})
+        self.assertEqual(weights, {"missing": 2.0})
+
+
+def _scenario(name: str) -> Scenario:
+    return Scenario(name, [_interaction()])
+
+
+def _interaction() -> Interaction:
+    return Interaction(InteractionTurn("user"), InteractionTurn("bot"))
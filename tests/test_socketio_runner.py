@@ -1,24 +1,37 @@
 import asyncio
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from threading import Thread
-from typing import Any, List
+from threading import Thread, current_thread
+from time import perf_counter, sleep
+from typing import Any, Dict, List, Optional, Set
 from unittest import TestCase
+from unittest.mock import patch
 
 from aiohttp import web
 from socketio import AsyncServer
 
+from rasa_integration_testing.cassette import RECORD_MODE, REPLAY_MODE, Cassette
 from rasa_integration_testing.common.configuration import (
     Configuration,
     DependencyInjector,
 )
+from rasa_integration_testing.comparator import JsonPath
 from rasa_integration_testing.interaction import INTERACTION_TURN_EXTENSION, Interaction
 from rasa_integration_testing.scenario import Scenario
 from rasa_integration_testing.socketio_runner import (
     EVENT_BOT_UTTERED,
     EVENT_USER_UTTERED,
     SocketIORunner,
+    _has_more_values,
 )
 
+SOCKETIO_RUNNER_MODULE = "rasa_integration_testing.socketio_runner"
+SHORT_RESPONSE_TIMEOUT = 0.5
+CONCURRENT_CONVERSATIONS = 50
+GET_ASSESSMENT_MESSAGE = "/get_assessment"
+DISCONNECT_WAIT = 1.0
+
 YML_EXTENSION = "yml"
 INI_EXTENSION = "ini"
 
@@ -38,53 +51,154 @@ INITIAL_INVALID_DATA = (
 
 
 class TestRunner(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.bot_responses: Dict[str, List[dict]] = {}
+        cls.connected_sessions: Set[str] = set()
+        runner = cls.aiohttp_server()
+        Thread(target=cls.run_server, args=(runner,), daemon=True).start()
+
     def setUp(self):
         self.maxDiff = None
-        self.runner = self.aiohttp_server()
-        Thread(target=self.run_server, args=(self.runner,), daemon=True).start()
+        self.runner = _scenario_runner(SUCCESS_TESTS_PATH)
+        self.scenario = Scenario.from_file("success", SUCCESS_SCENARIO_PATH)
+        self.bot_responses.clear()
+        self.bot_responses.update(_bot_responses(self.runner, self.scenario))
 
     def test_identical(self):
-        runner = _scenario_runner(SUCCESS_TESTS_PATH)
-        scenario = Scenario.from_file("success", SUCCESS_SCENARIO_PATH)
-        self.bot_messages_stack = _bot_message_stack(runner, scenario)
-
-        result = runner.run(scenario)
+        result = self.runner.run(self.scenario)
         self.assertEqual(result, None)
-
-    def aiohttp_server(self):
+        self.assertEqual(len(self.runner.turn_latencies), 2)
+
+    @patch(f"{SOCKETIO_RUNNER_MODULE}.BOT_RESPONSE_TIMEOUT", SHORT_RESPONSE_TIMEOUT)
+    def test_concurrent_conversations(self):
+        with ThreadPoolExecutor(CONCURRENT_CONVERSATIONS) as executor:
+            results = list(
+                executor.map(
+                    self.runner.run, [self.scenario] * CONCURRENT_CONVERSATIONS
+                )
+            )
+        self.assertEqual(results, [None] * CONCURRENT_CONVERSATIONS)
+
+    @patch(f"{SOCKETIO_RUNNER_MODULE}.BOT_RESPONSE_TIMEOUT", SHORT_RESPONSE_TIMEOUT)
+    @patch(f"{SOCKETIO_RUNNER_MODULE}.MAX_ON_LOOP_COMPARISON_VALUES", 0)
+    def test_different_message_compared_off_loop(self):
+        self.bot_responses[GET_ASSESSMENT_MESSAGE][1] = {"text": "Any symptoms?"}
+
+        result = self.runner.run(self.scenario)
+        self.assertEqual(result.user_input["message"], GET_ASSESSMENT_MESSAGE)
+        self.assertEqual(
+            result.output_diff.extra_entries, {JsonPath("text"): "Any symptoms?"}
+        )
+
+    @patch(f"{SOCKETIO_RUNNER_MODULE}.BOT_RESPONSE_TIMEOUT", SHORT_RESPONSE_TIMEOUT)
+    def test_rendered_off_loop(self):
+        render_bot_turn = self.runner.interaction_loader.render_bot_turn
+        rendering_threads = set()
+
+        def tracked_render_bot_turn(*args, **kwargs):
+            rendering_threads.add(current_thread())
+            return render_bot_turn(*args, **kwargs)
+
+        with patch.object(
+            self.runner.interaction_loader, "render_bot_turn", tracked_render_bot_turn
+        ):
+            self.assertIsNone(self.runner.run(self.scenario))
+        self.assertEqual(rendering_threads, {current_thread()})
+
+    @patch(f"{SOCKETIO_RUNNER_MODULE}.BOT_RESPONSE_TIMEOUT", SHORT_RESPONSE_TIMEOUT)
+    def test_missing_messages(self):
+        del self.bot_responses[GET_ASSESSMENT_MESSAGE][1:]
+
+        result = self.runner.run(self.scenario)
+        self.assertEqual(result.expected_output, {})
+        self.assertEqual(len(result.actual_output), 1)
+
+    @patch(f"{SOCKETIO_RUNNER_MODULE}.BOT_RESPONSE_TIMEOUT", SHORT_RESPONSE_TIMEOUT)
+    def test_replayed_cassette(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cassette_path = str(Path(directory) / "cassette.sqlite")
+            cassette = Cassette.constructor(cassette_path, RECORD_MODE)
+            runner = _scenario_runner(SUCCESS_TESTS_PATH, cassette)
+            self.assertIsNone(runner.run(self.scenario))
+            cassette.save()
+
+            # Replayed without the bot, nor waiting for the response timeout.
+            self.bot_responses.clear()
+            runner = _scenario_runner(
+                SUCCESS_TESTS_PATH, Cassette.constructor(cassette_path, REPLAY_MODE)
+            )
+            start = perf_counter()
+            self.assertIsNone(runner.run(self.scenario))
+            self.assertLess(perf_counter() - start, SHORT_RESPONSE_TIMEOUT)
+            self.assertEqual(len(runner.turn_latencies), 2)
+
+    @patch(f"{SOCKETIO_RUNNER_MODULE}.BOT_RESPONSE_TIMEOUT", SHORT_RESPONSE_TIMEOUT)
+    def test_session_disconnected(self):
+        start = perf_counter()
+        self.assertIsNone(self.runner.run(self.scenario))
+        # The server ends the session without waiting for it to time out.
+        while self.connected_sessions and perf_counter() - start < DISCONNECT_WAIT:
+            sleep(0.01)
+        self.assertEqual(self.connected_sessions, set())
+        self.assertLess(perf_counter() - start, DISCONNECT_WAIT)
+
+    def test_has_more_values(self):
+        self.assertFalse(_has_more_values({"a": [1, 2]}, 4))
+        self.assertTrue(_has_more_values({"a": [1, 2, 3]}, 4))
+
+    @classmethod
+    def aiohttp_server(cls):
         sio = AsyncServer(async_mode="aiohttp")
 
+        @sio.event
+        async def connect(session_id: str, environ: dict):
+            cls.connected_sessions.add(session_id)
+
+        @sio.event
+        async def disconnect(session_id: str, *args: Any):
+            cls.connected_sessions.discard(session_id)
+
         @sio.on(EVENT_USER_UTTERED)
         async def on_user_uttered(session_id: str, request: Any):
-            if self.bot_messages_stack:
-                messages = self.bot_messages_stack.pop(0)
-                for message in messages:
-                    await sio.emit(EVENT_BOT_UTTERED, message, room=session_id)
+            for message in cls.bot_responses.get(request["message"], []):
+                await sio.emit(EVENT_BOT_UTTERED, message, room=session_id)
 
         app = web.Application()
         sio.attach(app)
         runner = web.AppRunner(app)
         return runner
 
-    def run_server(self, runner: web.AppRunner):
-        self.server_loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.server_loop)
-        self.server_loop.run_until_complete(runner.setup())
-        self.site = web.TCPSite(runner, "localhost", 8080)
-        self.server_loop.create_task(self.site.start())
-        self.server_loop.run_forever()
+    @classmethod
+    def run_server(cls, runner: web.AppRunner):
+        server_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(server_loop)
+        server_loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "localhost", 8080)
+        server_loop.create_task(site.start())
+        server_loop.run_forever()
 
 
-def _scenario_runner(tests_path: Path) -> SocketIORunner:
-    return DependencyInjector(
+def _scenario_runner(
+    tests_path: Path, cassette: Optional[Cassette] = None
+) -> SocketIORunner:
+    injector = DependencyInjector(
         Configuration(tests_path / f"config.{INI_EXTENSION}"),
         {"tests_path": tests_path},
-    ).autowire(SocketIORunner)
+    )
+    if cassette is not None:
+        injector.register(Cassette, cassette)
+    return injector.autowire(SocketIORunner)
 
 
-def _bot_message_stack(runner: SocketIORunner, scenario: Scenario) -> List[dict]:
+def _bot_responses(runner: SocketIORunner, scenario: Scenario) -> Dict[str, List[dict]]:
+    """
+    Bot messages answering each user message of the scenario.
+    """
     interactions: List[Interaction] = runner.resolve_interactions(scenario)
-    return [
-        runner.interaction_loader.render_bot_turn(interaction.bot)
+    return {
+        runner.interaction_loader.render_user_turn(interaction.user)[
+            "message"
+        ]: runner.interaction_loader.render_bot_turn(interaction.bot)
         for interaction in interactions
-    ]
+    }
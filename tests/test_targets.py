@@ -0,0 +1,168 @@
+import json
+from pathlib import Path
+from unittest import TestCase
+
+from httmock import HTTMock, all_requests, response
+from requests import ConnectionError
+
+from rasa_integration_testing.common.configuration import (
+    Configuration,
+    DependencyInjector,
+)
+from rasa_integration_testing.comparator import JsonPath
+from rasa_integration_testing.rest_runner import RestRunner
+from rasa_integration_testing.scenario import Scenario
+from rasa_integration_testing.targets import (
+    MultiTargetRunner,
+    TargetReport,
+    TargetResult,
+)
+from rasa_integration_testing.transport import HttpTransport
+
+TARGETS_TESTS_PATH = Path("tests/main_scenarios/targets")
+GREETING_SCENARIO_PATH = TARGETS_TESTS_PATH / "scenarios/greeting.yml"
+BASELINE_TARGET = "http://127.0.0.1:8080/"
+CANDIDATE_TARGET = "http://127.0.0.1:8081/"
+TARGETS = [BASELINE_TARGET, CANDIDATE_TARGET]
+CANDIDATE_PORT = 8081
+TURN_COUNT = 2
+
+
+class TestMultiTargetRunner(TestCase):
+    def setUp(self):
+        self.runner = DependencyInjector(
+            Configuration(TARGETS_TESTS_PATH / "config.ini"),
+            {"tests_path": TARGETS_TESTS_PATH},
+        ).autowire(RestRunner)
+        self.scenario = Scenario.from_file("greeting", GREETING_SCENARIO_PATH)
+
+    def test_identical_targets(self):
+        with HTTMock(request_response):
+            results = self._run(differential=False)
+
+        self.assertEqual([result.target for result in results], TARGETS)
+        for result in results:
+            self.assertFalse(result.failed)
+            self.assertEqual(len(result.turn_latencies), TURN_COUNT)
+
+    def test_failing_target_dropped(self):
+        with HTTMock(candidate_shouting_response):
+            baseline, candidate = self._run(differential=False)
+
+        self.assertFalse(baseline.failed)
+        self.assertEqual(len(baseline.turn_latencies), TURN_COUNT)
+        self.assertTrue(candidate.failed)
+        self.assertEqual(len(candidate.turn_latencies), 1)
+        self.assertEqual(
+            candidate.failed_interaction.output_diff.missing_entries,
+            {JsonPath("text"): "hello"},
+        )
+
+    def test_unreachable_target(self):
+        for differential in (False, True):
+            with self.subTest(differential=differential):
+                with HTTMock(candidate_unreachable_response):
+                    baseline, candidate = self._run(differential)
+
+                self.assertFalse(baseline.failed)
+                self.assertTrue(candidate.failed)
+                self.assertEqual(len(candidate.turn_latencies), 1)
+                self.assertIn(
+                    "ConnectionError: refused",
+                    candidate.failed_interaction.actual_output["error"],
+                )
+
+        with HTTMock(baseline_unreachable_response):
+            baseline, candidate = self._run(differential=True)
+
+        self.assertTrue(baseline.failed)
+        # The candidate is compared with the templates instead.
+        self.assertFalse(candidate.failed)
+        self.assertEqual(len(candidate.turn_latencies), 1)
+
+    def test_differential_same_responses(self):
+        with HTTMock(shouting_response):
+            self.assertTrue(all(result.failed for result in self._run(False)))
+            self.assertFalse(any(result.failed for result in self._run(True)))
+
+    def test_differential_different_responses(self):
+        with HTTMock(candidate_shouting_response):
+            baseline, candidate = self._run(differential=True)
+
+        self.assertFalse(baseline.failed)
+        # The baseline alone isn't run further.
+        self.assertEqual(len(baseline.turn_latencies), 1)
+        self.assertEqual(candidate.failed_interaction.expected_output["text"], "hello")
+        self.assertEqual(candidate.failed_interaction.actual_output["text"], "HELLO")
+
+    def _run(self, differential: bool):
+        multi_target_runner = MultiTargetRunner(TARGETS, HttpTransport(), differential)
+        try:
+            return multi_target_runner.run(self.runner, self.scenario)
+        finally:
+            multi_target_runner.close()
+
+
+class TestTargetReport(TestCase):
+    def test_statistics(self):
+        report = TargetReport(TARGETS)
+        report.record(
+            [
+                TargetResult(BASELINE_TARGET, None, [0.1, 0.3]),
+                TargetResult(CANDIDATE_TARGET, None, [0.2]),
+            ]
+        )
+        report.record([TargetResult(BASELINE_TARGET, None, [0.2])])
+        self.assertFalse(report.failed)
+
+        baseline, candidate = report.statistics
+        self.assertEqual((baseline.scenario_count, baseline.failure_count), (2, 0))
+        self.assertAlmostEqual(baseline.mean_turn_latency, 0.2)
+        self.assertEqual(baseline.turn_latency_p95, 0.3)
+        self.assertEqual(candidate.scenario_count, 1)
+
+    def test_no_turns(self):
+        report = TargetReport(TARGETS)
+        failed_interaction = object()
+        report.record([TargetResult(CANDIDATE_TARGET, failed_interaction)])
+        self.assertTrue(report.failed)
+
+        baseline, candidate = report.statistics
+        self.assertIsNone(baseline.mean_turn_latency)
+        self.assertIsNone(candidate.turn_latency_p95)
+        self.assertEqual(candidate.failure_count, 1)
+
+
+@all_requests
+def request_response(url, request):
+    headers = {"content-type": "application/json"}
+    return response(200, request.body, headers, None, 5, request)
+
+
+@all_requests
+def shouting_response(url, request):
+    body = json.loads(request.body)
+    body["text"] = body["text"].upper()
+    headers = {"content-type": "application/json"}
+    return response(200, json.dumps(body), headers, None, 5, request)
+
+
+@all_requests
+def candidate_shouting_response(url, request):
+    if url.port == CANDIDATE_PORT:
+        return shouting_response(url, request)
+    return request_response(url, request)
+
+
+@all_requests
+def candidate_unreachable_response(url, request):
+    if url.port == CANDIDATE_PORT:
+        raise ConnectionError("refused")
+    return request_response(url, request)
+
+
+@all_requests
+def baseline_unreachable_response(url, request):
+    if url.port != CANDIDATE_PORT:
+        raise ConnectionError("refused")
+    return request_response(url, request)
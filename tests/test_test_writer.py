@@ -10,7 +10,9 @@ from rasa_integration_testing.test_writer import (
     INTERACTION_EXTENSION,
     SCENARIO_FILENAME,
     USER,
+    ScenarioWriter,
     write_bot_output,
+    write_conversation,
     write_user_input,
 )
 
@@ -58,3 +60,52 @@ class TestTestWriter(TestCase):
                 f"{USER}1.{INTERACTION_EXTENSION}"
             ) as interaction_file:
                 self.assertEqual(USER_INPUT_1, json.load(interaction_file))
+
+    def test_scenario_writer(self):
+        with tempfile.TemporaryDirectory() as test_output_directory:
+            writer = ScenarioWriter(test_output_directory)
+            writer.write_user_input(SENDER_ID, USER_INPUT_1)
+            write_user_input(test_output_directory, SENDER_ID, USER_INPUT_2)
+            # Another writer's turns are only counted when listing the directory.
+            self.assertEqual(
+                1,
+                writer._interaction_counts[
+                    f"{test_output_directory}/{SENDER_ID}/{USER}"
+                ],
+            )
+
+            other_writer = ScenarioWriter(test_output_directory)
+            other_writer.write_user_input(SENDER_ID, USER_INPUT_1)
+            self.assertEqual(
+                3, len(os.listdir(f"{test_output_directory}/{SENDER_ID}/{USER}"))
+            )
+
+    def test_write_conversation(self):
+        with tempfile.TemporaryDirectory() as test_output_directory:
+            write_conversation(
+                test_output_directory,
+                SENDER_ID,
+                [(USER_INPUT_1, BOT_OUTPUT_1), (USER_INPUT_2, BOT_OUTPUT_2)],
+            )
+
+            self.assertEqual([SENDER_ID], os.listdir(test_output_directory))
+            scenario = Scenario.from_file(
+                "test_writer",
+                Path(f"{test_output_directory}/{SENDER_ID}/{SCENARIO_FILENAME}"),
+            )
+            self.assertEqual(2, len(scenario.steps))
+
+            with open(
+                f"{test_output_directory}/{SENDER_ID}/{BOT}/"
+                f"{BOT}2.{INTERACTION_EXTENSION}"
+            ) as interaction_file:
+                self.assertEqual(BOT_OUTPUT_2, json.load(interaction_file))
+
+    def test_write_existing_conversation(self):
+        with tempfile.TemporaryDirectory() as test_output_directory:
+            os.makedirs(f"{test_output_directory}/{SENDER_ID}/{USER}")
+            with self.assertRaises(OSError):
+                write_conversation(
+                    test_output_directory, SENDER_ID, [(USER_INPUT_1, BOT_OUTPUT_1)]
+                )
+            self.assertEqual([SENDER_ID], os.listdir(test_output_directory))
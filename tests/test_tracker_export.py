@@ -0,0 +1,197 @@
+import json
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from rasa_integration_testing.interaction import InteractionLoader
+from rasa_integration_testing.scenario import SCENARIOS_FOLDER, load_scenarios
+from rasa_integration_testing.tracker_export import (
+    TrackerExportConverter,
+    read_conversations,
+)
+
+GREETING_EVENTS = [
+    {"event": "action", "name": "action_session_start"},
+    {"event": "session_started"},
+    {"event": "bot", "text": "Dropped, nobody talked yet"},
+    {"event": "user", "text": "hello"},
+    {"event": "bot", "text": "Hi!", "data": {"buttons": None}},
+    {"event": "bot", "data": {"buttons": [{"title": "Yes", "payload": "/yes"}]}},
+    {"event": "user", "text": "{{ not a variable }}"},
+    {"event": "bot", "text": "Bye"},
+]
+OTHER_EVENTS = [{"event": "user", "text": "help"}, {"event": "bot", "text": "Sure"}]
+
+GREETING_CONVERSATION = [
+    (
+        {"message": "hello"},
+        [{"text": "Hi!"}, {"buttons": [{"title": "Yes", "payload": "/yes"}]}],
+    ),
+    ({"message": "{{ not a variable }}"}, [{"text": "Bye"}]),
+]
+OTHER_CONVERSATION = [({"message": "help"}, [{"text": "Sure"}])]
+
+
+class TestTrackerExport(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_json_lines_trackers(self):
+        export_path = self.path / "trackers.jsonl"
+        with open(export_path, "w") as export_file:
+            for sender_id, events in [
+                ("a", GREETING_EVENTS),
+                ("b", GREETING_EVENTS + [{"event": "session_started"}] + OTHER_EVENTS),
+            ]:
+                export_file.write(
+                    json.dumps({"sender_id": sender_id, "events": events})
+                )
+                export_file.write("\n")
+
+        self.assertEqual(
+            [GREETING_CONVERSATION, GREETING_CONVERSATION, OTHER_CONVERSATION],
+            list(read_conversations(export_path)),
+        )
+
+    def test_read_json_lines_trackers_ended(self):
+        export_path = self.path / "trackers.jsonl"
+        with open(export_path, "w") as export_file:
+            for sender_id, events in [
+                ("a", GREETING_EVENTS),
+                ("b", OTHER_EVENTS),
+                ("a", OTHER_EVENTS),
+            ]:
+                export_file.write(
+                    json.dumps({"sender_id": sender_id, "events": events})
+                )
+                export_file.write("\n")
+
+        conversations = read_conversations(export_path)
+        # Each tracker line is a whole conversation, yielded once read.
+        self.assertEqual(next(conversations), GREETING_CONVERSATION)
+        self.assertEqual([OTHER_CONVERSATION, OTHER_CONVERSATION], list(conversations))
+
+    def test_read_json_lines_events(self):
+        export_path = self.path / "events.jsonl"
+        with open(export_path, "w") as export_file:
+            for sender_id, events in [("a", GREETING_EVENTS), ("b", OTHER_EVENTS)]:
+                for event in events:
+                    export_file.write(json.dumps({"sender_id": sender_id, **event}))
+                    export_file.write("\n")
+
+        self.assertEqual(
+            [GREETING_CONVERSATION, OTHER_CONVERSATION],
+            list(read_conversations(export_path)),
+        )
+
+    def test_read_interleaved_json_lines_events(self):
+        export_path = self.path / "events.jsonl"
+        with open(export_path, "w") as export_file:
+            for events in zip(GREETING_EVENTS, OTHER_EVENTS + [{}] * 6):
+                for sender_id, event in zip("ab", events):
+                    if event:
+                        export_file.write(json.dumps({"sender_id": sender_id, **event}))
+                        export_file.write("\n")
+
+        self.assertEqual(
+            [GREETING_CONVERSATION, OTHER_CONVERSATION],
+            list(read_conversations(export_path)),
+        )
+
+    def test_read_falsy_bot_data(self):
+        export_path = self.path / "events.jsonl"
+        with open(export_path, "w") as export_file:
+            for event in [
+                {"event": "user", "text": "count"},
+                {"event": "bot", "data": {"custom": {"count": 0, "done": False}}},
+                {"event": "bot", "data": {"custom": 0, "image": None}},
+            ]:
+                export_file.write(json.dumps({"sender_id": "a", **event}))
+                export_file.write("\n")
+
+        self.assertEqual(
+            [
+                [
+                    (
+                        {"message": "count"},
+                        [{"custom": {"count": 0, "done": False}}, {"custom": 0}],
+                    )
+                ]
+            ],
+            list(read_conversations(export_path)),
+        )
+
+    def test_read_sqlite_tracker_store(self):
+        export_path = self._sqlite_export()
+        self.assertEqual(
+            [GREETING_CONVERSATION, GREETING_CONVERSATION, OTHER_CONVERSATION],
+            list(read_conversations(export_path)),
+        )
+
+    def test_convert(self):
+        tests_path = self.path / "tests"
+        converter = TrackerExportConverter(tests_path, 2)
+        converter.convert(self._sqlite_export())
+
+        self.assertEqual(3, converter.conversation_count)
+        self.assertEqual(2, converter.scenario_count)
+
+        scenarios = load_scenarios(tests_path / SCENARIOS_FOLDER, "*.yml")
+        self.assertEqual(2, len(scenarios))
+        interaction_loader = InteractionLoader(tests_path)
+        rendered_conversations = [
+            [
+                (
+                    interaction_loader.render_user_turn(interaction.user),
+                    interaction_loader.render_bot_turn(interaction.bot),
+                )
+                for interaction in scenario.steps
+            ]
+            for scenario in scenarios
+        ]
+        self.assertCountEqual(
+            [GREETING_CONVERSATION, OTHER_CONVERSATION], rendered_conversations
+        )
+        self.assertFalse(
+            [
+                filename
+                for _, _, filenames in os.walk(tests_path)
+                for filename in filenames
+                if filename.startswith(".")
+            ]
+        )
+
+    def test_convert_again(self):
+        tests_path = self.path / "tests"
+        export_path = self._sqlite_export()
+        TrackerExportConverter(tests_path, 2).convert(export_path)
+
+        converter = TrackerExportConverter(tests_path, 2)
+        converter.convert(export_path)
+        self.assertEqual(3, converter.conversation_count)
+        self.assertEqual(0, converter.scenario_count)
+
+    def _sqlite_export(self) -> Path:
+        export_path = self.path / "tracker.db"
+        connection = sqlite3.connect(str(export_path))
+        connection.execute(
+            "CREATE TABLE events (id INTEGER PRIMARY KEY, sender_id TEXT, data TEXT)"
+        )
+        for sender_id, events in [
+            ("a", GREETING_EVENTS),
+            ("c", OTHER_EVENTS),
+            ("b", GREETING_EVENTS),
+        ]:
+            connection.executemany(
+                "INSERT INTO events (sender_id, data) VALUES (?, ?)",
+                [(sender_id, json.dumps(event)) for event in events],
+            )
+        connection.commit()
+        connection.close()
+        return export_path
@@ -0,0 +1,86 @@
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from httmock import HTTMock, response, urlmatch
+
+from rasa_integration_testing.cassette import RECORD_MODE, REPLAY_MODE, Cassette
+from rasa_integration_testing.transport import (
+    HTTP1_TRANSPORT,
+    HTTP2_TRANSPORT,
+    MISSING_RESPONSE_STATUS,
+    HttpTransport,
+)
+
+BOT_URL = "http://127.0.0.1:8080/"
+RECORDED_SENDER = b"ITEST_recorded"
+REPLAYED_SENDER = b"ITEST_replayed"
+
+
+class TestHttpTransport(TestCase):
+    def test_http1_sessions(self):
+        transport = HttpTransport.constructor(HTTP1_TRANSPORT)
+        post = transport.post_function()
+
+        self.assertIsNot(post.__self__, transport.post_function().__self__)
+        with HTTMock(bot_response):
+            self.assertEqual(post(BOT_URL, '{"text": "hi"}').json(), {"text": "hi"})
+
+    def test_http2_shared_client(self):
+        httpx = MagicMock()
+        with patch.dict(sys.modules, {"httpx": httpx}):
+            transport = HttpTransport.constructor(HTTP2_TRANSPORT)
+
+        httpx.Client.assert_called_once_with(http1=False, http2=True)
+        transport.post_function()(BOT_URL, "{}")
+        transport.post_function()(BOT_URL, "{}")
+        self.assertEqual(httpx.Client.return_value.post.call_count, 2)
+        httpx.Client.return_value.post.assert_called_with(BOT_URL, content="{}")
+
+        transport.close()
+        httpx.Client.return_value.close.assert_called_once()
+
+    def test_http2_without_httpx(self):
+        with patch.dict(sys.modules, {"httpx": None}):
+            with self.assertRaises(Exception) as error:
+                HttpTransport.constructor(HTTP2_TRANSPORT)
+        self.assertIn("requires httpx", f"{error.exception}")
+
+    def test_replayed_cassette(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cassette_path = str(Path(directory) / "cassette.sqlite")
+            cassette = Cassette.constructor(cassette_path, RECORD_MODE)
+            post = HttpTransport.constructor(HTTP1_TRANSPORT, cassette).post_function()
+            with HTTMock(bot_response):
+                post(BOT_URL, _request(RECORDED_SENDER, b"hi"))
+            cassette.save()
+
+            cassette = Cassette.constructor(cassette_path, REPLAY_MODE)
+            post = HttpTransport.constructor(HTTP1_TRANSPORT, cassette).post_function()
+            response = post(BOT_URL, _request(REPLAYED_SENDER, b"hi"))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, _request(REPLAYED_SENDER, b"hi"))
+
+            response = post(BOT_URL, _request(REPLAYED_SENDER, b"hi"))
+            self.assertEqual(response.status_code, MISSING_RESPONSE_STATUS)
+            self.assertIn("No response recorded in cassette", response.text)
+
+    def test_invalid_transport(self):
+        with self.assertRaises(Exception) as error:
+            HttpTransport.constructor("http3")
+        self.assertEqual(
+            f"{error.exception}",
+            "'http3' isn't a valid transport, use one of http1, http2.",
+        )
+
+
+@urlmatch(netloc="127.0.0.1:8080")
+def bot_response(url, request):
+    headers = {"content-type": "application/json"}
+    return response(200, request.body, headers, None, 5, request)
+
+
+def _request(sender_id: bytes, text: bytes) -> bytes:
+    return b'{"sender": "' + sender_id + b'", "text": "' + text + b'"}'
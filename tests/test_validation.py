@@ -0,0 +1,75 @@
+from pathlib import Path
+from unittest import TestCase
+
+from rasa_integration_testing.validation import SuiteValidator, ValidationProblem
+
+INVALID_TESTS_PATH = Path("tests/validation_scenarios/invalid")
+SCENARIOS_PATH = INVALID_TESTS_PATH / "scenarios"
+BOT_TEMPLATES_PATH = INVALID_TESTS_PATH / "interactions/bot"
+MAIN_SCENARIOS_PATH = Path("tests/main_scenarios")
+MAX_WORKERS = 4
+
+
+class TestSuiteValidator(TestCase):
+    def setUp(self):
+        self.validator = SuiteValidator(INVALID_TESTS_PATH, MAX_WORKERS)
+
+    def test_used_templates(self):
+        self.assertEqual(
+            self.validator.validate("*.yml"),
+            [
+                ValidationProblem(
+                    BOT_TEMPLATES_PATH / "broken.jinja",
+                    "Line 2: unexpected char '\"' at 29",
+                ),
+                ValidationProblem(
+                    BOT_TEMPLATES_PATH / "partial.jinja",
+                    "Missing template 'bot/missing_partial.jinja'",
+                ),
+                ValidationProblem(
+                    BOT_TEMPLATES_PATH / "welcome.rules.yml",
+                    "Unknown rule 'equals' for 'text'",
+                ),
+                ValidationProblem(
+                    SCENARIOS_PATH / "invalid_format.yml", "Invalid scenario format"
+                ),
+                ValidationProblem(
+                    SCENARIOS_PATH / "missing_references.yml",
+                    "Missing scenario fragment 'absent'",
+                ),
+                ValidationProblem(
+                    SCENARIOS_PATH / "missing_references.yml",
+                    "Missing template 'bot/missing.jinja'",
+                ),
+            ],
+        )
+
+    def test_all_templates(self):
+        problems = self.validator.validate("*.yml", all_templates=True)
+        self.assertEqual(len(problems), 7)
+        self.assertIn(BOT_TEMPLATES_PATH / "unused.jinja", [p.path for p in problems])
+
+    def test_scenarios_glob(self):
+        self.assertEqual(
+            self.validator.validate("missing_references.yml"),
+            [
+                ValidationProblem(
+                    SCENARIOS_PATH / "missing_references.yml",
+                    "Missing scenario fragment 'absent'",
+                ),
+                ValidationProblem(
+                    SCENARIOS_PATH / "missing_references.yml",
+                    "Missing template 'bot/missing.jinja'",
+                ),
+            ],
+        )
+
+    def test_valid_suites(self):
+        for tests_path in MAIN_SCENARIOS_PATH.iterdir():
+            with self.subTest(tests_path=tests_path):
+                self.assertEqual(
+                    SuiteValidator(tests_path, MAX_WORKERS).validate(
+                        "*.yml", all_templates=True
+                    ),
+                    [],
+                )
@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from rasa_integration_testing.interaction import InteractionLoader, InteractionTurn
+from rasa_integration_testing.matcher import NO_RULES
+from rasa_integration_testing.scenario import ScenarioFragmentLoader
+from rasa_integration_testing.watch import SuiteWatcher
+
+FRAGMENTED_TESTS_PATH = Path("tests/main_scenarios/fragmented")
+SCENARIOS_GLOB = "*.yml"
+OTHER_SCENARIO = """
+- user: user2
+  bot: bot2
+"""
+BROKEN_SCENARIO = "- user: [\n"
+
+
+class TestSuiteWatcher(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.tests_path = Path(self.directory.name) / "tests"
+        shutil.copytree(FRAGMENTED_TESTS_PATH, self.tests_path)
+        _write(self.tests_path / "scenarios/other.yml", OTHER_SCENARIO)
+        self.fragment_loader = ScenarioFragmentLoader.constructor(self.tests_path)
+        self.interaction_loader = InteractionLoader.constructor(self.tests_path)
+        self.watcher = SuiteWatcher(
+            self.tests_path,
+            SCENARIOS_GLOB,
+            self.fragment_loader,
+            self.interaction_loader,
+        )
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_initial_scenarios(self):
+        self.assertListEqual(_names(self.watcher.scenarios), ["fragmented", "other"])
+        self.assertListEqual(self.watcher.poll(), [])
+
+    def test_changed_scenario(self):
+        _touch(self.tests_path / "scenarios/other.yml")
+        self.assertListEqual(_names(self.watcher.poll()), ["other"])
+
+    def test_changed_template(self):
+        _touch(self.tests_path / "interactions/bot/bot1.jinja")
+        self.assertListEqual(_names(self.watcher.poll()), ["fragmented"])
+
+        _touch(self.tests_path / "interactions/user/user2.jinja")
+        self.assertListEqual(_names(self.watcher.poll()), ["fragmented", "other"])
+
+    def test_included_template(self):
+        _write(self.tests_path / "interactions/bot/macros.jinja", "")
+        self.assertListEqual(_names(self.watcher.poll()), ["fragmented", "other"])
+
+    def test_changed_rules(self):
+        bot_turn = InteractionTurn("bot1")
+        self.assertIs(self.interaction_loader.bot_turn_rules(bot_turn), NO_RULES)
+
+        _write(
+            self.tests_path / "interactions/bot/bot1.rules.yml",
+            "text:\n  ignore: true\n",
+        )
+        self.assertListEqual(_names(self.watcher.poll()), ["fragmented"])
+        self.assertIsNot(self.interaction_loader.bot_turn_rules(bot_turn), NO_RULES)
+
+    def test_changed_fragment(self):
+        _write(
+            self.tests_path / "scenario_fragments/conclusion.yml",
+            "- user: user1\n  bot: bot1\n",
+        )
+        self.assertListEqual(_names(self.watcher.poll()), ["fragmented"])
+        self.assertEqual(
+            self.fragment_loader.scenario_fragment("conclusion")[0].user.template,
+            "user1",
+        )
+
+    def test_added_and_removed_scenarios(self):
+        _write(self.tests_path / "scenarios/added.yml", OTHER_SCENARIO)
+        self.assertListEqual(_names(self.watcher.poll()), ["added"])
+        self.assertIn("added", _names(self.watcher.scenarios))
+
+        os.remove(self.tests_path / "scenarios/added.yml")
+        self.assertListEqual(self.watcher.poll(), [])
+        self.assertNotIn("added", _names(self.watcher.scenarios))
+
+    def test_broken_scenario(self):
+        _write(self.tests_path / "scenarios/other.yml", BROKEN_SCENARIO)
+        self.assertListEqual(self.watcher.poll(), [])
+
+        _write(self.tests_path / "scenarios/other.yml", OTHER_SCENARIO)
+        self.assertListEqual(_names(self.watcher.poll()), ["other"])
+
+    def test_changed_data_file(self):
+        _write(self.tests_path / "scenarios/names.csv", "name\nJohn\n")
+        self.assertListEqual(_names(self.watcher.poll()), ["fragmented", "other"])
+
+
+def _names(scenarios):
+    return [scenario.name for scenario in scenarios]
+
+
+def _write(path: Path, content: str) -> None:
+    path.write_text(content)
+    _touch(path)
+
+
+def _touch(path: Path) -> None:
+    # File systems with coarse timestamps wouldn't see changes made right away.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))